@@ -4,4 +4,6 @@ import os
 from django.core.asgi import get_asgi_application  # type: ignore
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Serve the insights endpoints with their async views (see health/views.py).
+os.environ.setdefault("HEALTH_ASYNC_VIEWS", "1")
 application = get_asgi_application()
@@ -2,7 +2,15 @@
 
 from django.contrib import admin
 
-from .models import Country, LifeExpectancy, SuicideMortality, Note
+from .models import (
+    Country,
+    CountryYearFact,
+    LifeExpectancy,
+    LifeExpectancyRank,
+    Note,
+    RegionYearAggregate,
+    SuicideMortality,
+)
 
 
 @admin.register(Country)
@@ -32,3 +40,26 @@ class NoteAdmin(admin.ModelAdmin):
     list_display = ("title", "country", "created_at")
     search_fields = ("title", "body", "country__name")
     ordering = ("-created_at",)
+
+
+@admin.register(CountryYearFact)
+class CountryYearFactAdmin(admin.ModelAdmin):
+    list_display = ("country", "year", "sex", "life_expectancy", "rate")
+    list_filter = ("sex", "year")
+    search_fields = ("country__name",)
+    ordering = ("country__name", "-year")
+
+
+@admin.register(LifeExpectancyRank)
+class LifeExpectancyRankAdmin(admin.ModelAdmin):
+    list_display = ("country", "metric", "year", "value", "year_rank", "percentile")
+    list_filter = ("metric", "year")
+    search_fields = ("country__name",)
+    ordering = ("metric", "-year", "year_rank")
+
+
+@admin.register(RegionYearAggregate)
+class RegionYearAggregateAdmin(admin.ModelAdmin):
+    list_display = ("region_code", "metric", "sex", "year", "countries", "mean", "weighted_mean")
+    list_filter = ("metric", "region_code", "sex")
+    ordering = ("metric", "region_code", "-year")
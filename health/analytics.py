@@ -0,0 +1,337 @@
+"""Vectorised analytics helpers shared by the insights endpoints.
+
+The insights views used to aggregate per country in Python, issuing a pair
+of queries per country. The helpers here push the per-country averaging into
+one grouped query per dataset and do the statistics with NumPy arrays.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import numpy as np
+from django.db import models
+from django.db.models import Avg
+
+from .models import LifeExpectancy, SuicideMortality
+
+# Every numeric indicator on LifeExpectancy (derived from the model so new columns are picked up).
+LIFE_METRICS: tuple[str, ...] = tuple(
+    f.name for f in LifeExpectancy._meta.get_fields() if isinstance(f, models.FloatField)
+)
+SUICIDE_METRICS: tuple[str, ...] = ("rate", "rate_low", "rate_high")
+
+DEFAULT_METRIC_PAIR: tuple[str, str] = ("life_expectancy", "rate")
+
+
+def parse_metric_pairs(raw: Optional[str]) -> list[tuple[str, str]]:
+    """Parse ``pairs=life_expectancy:rate,gdp:rate_high`` into (life, suicide) tuples.
+
+    Raises ValueError for malformed entries or unknown columns.
+    """
+    if not raw or not raw.strip():
+        return [DEFAULT_METRIC_PAIR]
+
+    pairs: list[tuple[str, str]] = []
+    for chunk in raw.split(","):
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        life_metric, sep, suicide_metric = chunk.partition(":")
+        life_metric = life_metric.strip()
+        suicide_metric = suicide_metric.strip() if sep else "rate"
+        if life_metric not in LIFE_METRICS:
+            raise ValueError(f"unknown life expectancy metric: {life_metric}")
+        if suicide_metric not in SUICIDE_METRICS:
+            raise ValueError(f"unknown suicide metric: {suicide_metric}")
+        if (life_metric, suicide_metric) not in pairs:
+            pairs.append((life_metric, suicide_metric))
+
+    return pairs or [DEFAULT_METRIC_PAIR]
+
+
+def parse_matrix_metrics(raw: Optional[str]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Parse ``metrics=gdp,schooling,rate`` into (life metrics, suicide metrics), each in model order.
+
+    Empty means every metric. Raises ValueError for unknown names or fewer than two metrics.
+    """
+    names = {m.strip() for m in (raw or "").split(",") if m.strip()}
+    if not names:
+        return LIFE_METRICS, SUICIDE_METRICS
+    unknown = sorted(names - set(LIFE_METRICS) - set(SUICIDE_METRICS))
+    if unknown:
+        raise ValueError(f"unknown metric: {', '.join(unknown)}")
+    if len(names) < 2:
+        raise ValueError("at least two metrics are required")
+    return tuple(m for m in LIFE_METRICS if m in names), tuple(m for m in SUICIDE_METRICS if m in names)
+
+
+def _grouped_query(qs, columns: list[str]):
+    """``GROUP BY country_id`` values_list of (country_id, avg_<column>...)."""
+    annotations = {f"avg_{c}": Avg(c) for c in columns}
+    return qs.order_by().values("country_id").annotate(**annotations).values_list("country_id", *annotations.keys())
+
+
+def _means_matrix(rows: list[tuple], columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(columns)), dtype=float)
+
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    # None (all-null group) becomes NaN and is masked out per pair later.
+    means = np.array([r[1:] for r in rows], dtype=float)
+    return ids, means
+
+
+def _grouped_means(qs, columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Run one ``GROUP BY country_id`` query and return (ids, means matrix)."""
+    return _means_matrix(list(_grouped_query(qs, columns)), columns)
+
+
+def _mean_querysets(year_min: int, year_max: int, sex: str):
+    return (
+        LifeExpectancy.objects.filter(year__gte=year_min, year__lte=year_max),
+        SuicideMortality.objects.filter(year__gte=year_min, year__lte=year_max, sex__iexact=sex),
+    )
+
+
+def _align(life: tuple[np.ndarray, np.ndarray], suicide: tuple[np.ndarray, np.ndarray]):
+    (life_ids, life_means), (sui_ids, sui_means) = life, suicide
+    common, life_idx, sui_idx = np.intersect1d(life_ids, sui_ids, assume_unique=True, return_indices=True)
+    return common, life_means[life_idx], sui_means[sui_idx]
+
+
+def outer_align(
+    life: tuple[np.ndarray, np.ndarray], suicide: tuple[np.ndarray, np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    """(country ids, [life means | suicide means]) over countries in either dataset; NaN where absent."""
+    (life_ids, life_means), (sui_ids, sui_means) = life, suicide
+    ids = np.union1d(life_ids, sui_ids)
+    matrix = np.full((len(ids), life_means.shape[1] + sui_means.shape[1]), np.nan)
+    matrix[np.searchsorted(ids, life_ids), : life_means.shape[1]] = life_means
+    matrix[np.searchsorted(ids, sui_ids), life_means.shape[1] :] = sui_means
+    return ids, matrix
+
+
+def dataset_means(
+    year_min: int, year_max: int, sex: str, life_columns: list[str], suicide_columns: list[str]
+) -> tuple[tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]:
+    """Unaligned (ids, means) per dataset: one grouped query each."""
+    life_qs, sui_qs = _mean_querysets(year_min, year_max, sex)
+    return _grouped_means(life_qs, life_columns), _grouped_means(sui_qs, suicide_columns)
+
+
+def country_means(
+    year_min: int,
+    year_max: int,
+    sex: str,
+    life_columns: list[str],
+    suicide_columns: list[str],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-country averages for both datasets, aligned on country id.
+
+    Exactly two queries are issued regardless of the number of countries.
+    Returns (country_ids, life_means, suicide_means) where the matrices have
+    one row per country present in both datasets and one column per metric.
+    """
+    return _align(*dataset_means(year_min, year_max, sex, life_columns, suicide_columns))
+
+
+async def acountry_means(
+    year_min: int,
+    year_max: int,
+    sex: str,
+    life_columns: list[str],
+    suicide_columns: list[str],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``country_means`` with both grouped queries awaited concurrently."""
+    life_qs, sui_qs = _mean_querysets(year_min, year_max, sex)
+
+    async def fetch(qs, columns):
+        return _means_matrix([row async for row in _grouped_query(qs, columns)], columns)
+
+    life, suicide = await asyncio.gather(fetch(life_qs, life_columns), fetch(sui_qs, suicide_columns))
+    return _align(life, suicide)
+
+
+def pearson(xs: np.ndarray, ys: np.ndarray, min_n: int = 3) -> tuple[int, Optional[float]]:
+    """Pearson r over the positions where both inputs are finite.
+
+    Returns (n, r); r is None when fewer than ``min_n`` points remain or either
+    side has zero variance.
+    """
+    mask = np.isfinite(xs) & np.isfinite(ys)
+    n = int(mask.sum())
+    if n < min_n:
+        return n, None
+
+    x = xs[mask] - xs[mask].mean()
+    y = ys[mask] - ys[mask].mean()
+    denom = float(np.sqrt((x * x).sum() * (y * y).sum()))
+    if denom == 0.0:
+        return n, None
+    return n, float((x * y).sum() / denom)
+
+
+def correlate_pairs(
+    pairs: list[tuple[str, str]],
+    life_columns: list[str],
+    suicide_columns: list[str],
+    life_means: np.ndarray,
+    suicide_means: np.ndarray,
+) -> list[dict]:
+    """Correlate each requested (life metric, suicide metric) pair across countries."""
+    results = []
+    for life_metric, suicide_metric in pairs:
+        n, r = pearson(
+            life_means[:, life_columns.index(life_metric)],
+            suicide_means[:, suicide_columns.index(suicide_metric)],
+        )
+        results.append(
+            {
+                "life_metric": life_metric,
+                "suicide_metric": suicide_metric,
+                "n": n,
+                "correlation": r,
+            }
+        )
+    return results
+
+
+def _pearson_last_axis(x: np.ndarray, y: np.ndarray, min_n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Pearson r along the last axis, over positions where both are finite; NaN below ``min_n`` or at zero variance."""
+    mask = np.isfinite(x) & np.isfinite(y)
+    n = mask.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx = np.where(mask, x, 0.0).sum(axis=-1, keepdims=True) / n[..., None]
+        my = np.where(mask, y, 0.0).sum(axis=-1, keepdims=True) / n[..., None]
+        dx = np.where(mask, x - mx, 0.0)
+        dy = np.where(mask, y - my, 0.0)
+        denom = np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+        r = (dx * dy).sum(axis=-1) / denom
+    r[(n < min_n) | ~(denom > 0)] = np.nan
+    return n, np.clip(r, -1.0, 1.0)
+
+
+def _average_ranks(values: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """1-based ranks (ties averaged) of each column's finite values among ``rows``; NaN elsewhere."""
+    ranks = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        valid = rows & np.isfinite(column)
+        ordered = np.sort(column[valid])
+        picked = column[valid]
+        lo = np.searchsorted(ordered, picked, side="left")
+        hi = np.searchsorted(ordered, picked, side="right")
+        ranks[valid, j] = (lo + hi + 1) / 2.0
+    return ranks
+
+
+def correlation_matrix(matrix: np.ndarray, min_n: int = 3) -> dict[str, np.ndarray]:
+    """Pairwise Pearson and Spearman correlation of every column pair of ``matrix`` (rows = observations).
+
+    Nulls (NaN) are handled pairwise: each pair uses the rows where both
+    columns are present, and Spearman ranks are recomputed on exactly those
+    rows, so the result matches ``DataFrame.corr(method=..., min_periods=min_n)``.
+    Everything runs as broadcast NumPy operations over a
+    (columns x columns x rows) stack instead of one pass per pair.
+    """
+    k = matrix.shape[1]
+    columns = matrix.T  # (k, rows)
+    n, pearson_r = _pearson_last_axis(columns[:, None, :], columns[None, :, :], min_n)
+
+    # ranks[m][:, c]: ranks of column c among the rows where column m is present.
+    present = np.isfinite(matrix)
+    ranks = np.stack([_average_ranks(matrix, present[:, m]) for m in range(k)]) if k else np.empty((0,) + matrix.shape)
+    # Pair (i, j) correlates column i ranked on j's rows with column j ranked on i's rows.
+    _, spearman_r = _pearson_last_axis(ranks.transpose(2, 0, 1), ranks.transpose(0, 2, 1), min_n)
+    return {"n": n, "pearson": pearson_r, "spearman": spearman_r}
+
+
+# Metrics where a falling value is an improvement (rankings flip their sign).
+LOWER_IS_BETTER: frozenset[str] = frozenset(
+    {
+        "adult_mortality",
+        "infant_deaths",
+        "measles",
+        "under_five_deaths",
+        "hiv_aids",
+        "thinness_1_19_years",
+        "thinness_5_9_years",
+        *SUICIDE_METRICS,
+    }
+)
+
+
+def parse_metric(raw: Optional[str]) -> str:
+    """Validate a single ``metric=`` (any LifeExpectancy indicator or suicide rate column; default ``life_expectancy``)."""
+    metric = (raw or "").strip() or "life_expectancy"
+    if metric not in LIFE_METRICS and metric not in SUICIDE_METRICS:
+        raise ValueError(f"unknown metric: {metric}")
+    return metric
+
+
+def metric_rows(metric: str, year_min: int, year_max: int, sex: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(country ids, years, values) of one metric over a year range: a single query."""
+    if metric in SUICIDE_METRICS:
+        qs = SuicideMortality.objects.filter(sex__iexact=sex)
+    else:
+        qs = LifeExpectancy.objects.all()
+    rows = list(qs.filter(year__gte=year_min, year__lte=year_max).order_by().values_list("country_id", "year", metric))
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    ids, years, values = zip(*rows)
+    return np.array(ids, dtype=np.int64), np.array(years, dtype=np.int64), np.array(values, dtype=float)
+
+
+def year_matrix(
+    ids: np.ndarray, years: np.ndarray, values: np.ndarray, year_min: int, year_max: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Scatter (country, year, value) rows into a (countries x years) matrix; NaN where missing."""
+    country_ids, row = np.unique(ids, return_inverse=True)
+    matrix = np.full((len(country_ids), year_max - year_min + 1), np.nan)
+    matrix[row, years - year_min] = values
+    return country_ids, matrix
+
+
+def trend_stats(matrix: np.ndarray, window: int, min_points: int = 3) -> dict[str, np.ndarray]:
+    """Per-country trends of a (countries x years) matrix, every country at once.
+
+    - ``yoy``: change from the previous year (NaN in the first column or
+      when either year is missing)
+    - ``rolling_mean``: trailing mean over ``window`` years of the values
+      present in the window (NaN when none is)
+    - ``slope``: least-squares change per year over the present values, NaN
+      with fewer than ``min_points`` of them
+    - ``points``: number of present values
+    """
+    countries, span = matrix.shape
+    present = ~np.isnan(matrix)
+    filled = np.where(present, matrix, 0.0)
+
+    yoy = np.full(matrix.shape, np.nan)
+    yoy[:, 1:] = matrix[:, 1:] - matrix[:, :-1]
+
+    # Windowed sums from cumulative sums, with a leading zero column.
+    sums = np.concatenate([np.zeros((countries, 1)), filled.cumsum(axis=1)], axis=1)
+    counts = np.concatenate([np.zeros((countries, 1)), present.cumsum(axis=1)], axis=1)
+    end = np.arange(1, span + 1)
+    start = np.maximum(end - window, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling = (sums[:, end] - sums[:, start]) / (counts[:, end] - counts[:, start])
+
+        x = np.arange(span, dtype=float)
+        n = present.sum(axis=1)
+        mean_x = (present * x).sum(axis=1) / n
+        mean_y = filled.sum(axis=1) / n
+        dx = np.where(present, x - mean_x[:, None], 0.0)
+        slope = (dx * (filled - mean_y[:, None])).sum(axis=1) / (dx * dx).sum(axis=1)
+    slope[n < max(2, min_points)] = np.nan
+    return {"yoy": yoy, "rolling_mean": rolling, "slope": slope, "points": n}
+
+
+def rank_trends(slope: np.ndarray, metric: str, order: str) -> np.ndarray:
+    """Row order by fastest improvement (``order="improving"``) or decline; NaN slopes last."""
+    improvement = -slope if metric in LOWER_IS_BETTER else slope
+    key = -improvement if order == "improving" else improvement
+    return np.lexsort((key, np.isnan(key)))
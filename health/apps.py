@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class HealthConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "health"
+
+    def ready(self) -> None:
+        from . import db, signals  # noqa: F401
+        from .metrics import install_query_recorder, metrics_enabled
+
+        if metrics_enabled():
+            install_query_recorder()
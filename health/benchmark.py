@@ -0,0 +1,233 @@
+"""Benchmark harness behind ``manage.py bench``.
+
+``ROUTES`` lists one representative request for every URL name in
+``health.urls``; ``scale_csvs`` writes synthetic N-times copies of the WHO
+CSVs (each copy renames the countries, so natural keys stay unique and the
+per-country series keep their real shape); ``measure_load`` times
+``load_who_data`` and samples its peak resident memory; ``compare`` diffs
+two result files and lists the metrics that regressed.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from io import StringIO
+from pathlib import Path
+from typing import Any, Iterable
+
+from django.core.management import call_command
+from django.test import Client
+from django.urls import URLPattern, URLResolver
+
+from .models import Country, LifeExpectancy, Note, SuicideMortality
+
+LIFE_CSV = "data/life-expectancy-who.csv"
+SUICIDE_CSV = "data/suicide-rates-who-filtered.csv"
+SUICIDE_COUNTRY_COLUMNS = ("Location", "Location_normalized")
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str  # URL name in health.urls
+    path: str  # formatted with the ids picked by seed_ids()
+
+
+ROUTES = (
+    Route("api-root", "/api/"),
+    Route("countries-list", "/api/countries/?search=an"),
+    Route("countries-detail", "/api/countries/{country_id}/"),
+    Route("life-expectancy-list", "/api/life-expectancy/?year=2010"),
+    Route("life-expectancy-detail", "/api/life-expectancy/{life_id}/"),
+    Route("life-expectancy-top", "/api/life-expectancy/top/?year=2014&n=20"),
+    Route("suicide-mortality-list", "/api/suicide-mortality/?sex=Female"),
+    Route("suicide-mortality-detail", "/api/suicide-mortality/{suicide_id}/"),
+    Route("notes-list", "/api/notes/"),
+    Route("notes-detail", "/api/notes/{note_id}/"),
+    Route("country-summary", "/api/insights/country-summary/?country={country}&year=2014"),
+    Route("country-timeline", "/api/insights/country-timeline/?country={country}&year_min=2000&year_max=2015"),
+    Route("country-timelines", "/api/insights/country-timelines/?countries={countries}"),
+    Route("risk-flags", "/api/insights/risk-flags/?year=2015&min_life=75&min_suicide=8"),
+    Route("correlation", "/api/insights/correlation/?year_min=2005&year_max=2015"),
+    Route("correlation-matrix", "/api/insights/correlation-matrix/?year_min=2005&year_max=2015"),
+    Route("trends", "/api/insights/trends/?metric=life_expectancy&year_min=2000&year_max=2015"),
+    Route("regions", "/api/insights/regions/?metric=rate&year_min=2010&year_max=2015"),
+    Route("metrics", "/api/metrics/"),
+    Route("export", "/api/export/life-expectancy/?year_min=2010"),
+)
+
+
+def route_names(patterns: Iterable[Any] | None = None) -> set[str]:
+    """Every URL name declared in ``health.urls`` (router routes included)."""
+    if patterns is None:
+        from . import urls
+
+        patterns = urls.urlpatterns
+    names: set[str] = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def scale_csvs(factor: int, dest: Path, life: Path | str = LIFE_CSV, suicide: Path | str = SUICIDE_CSV) -> tuple[Path, Path]:
+    """Write ``factor`` copies of both CSVs to ``dest``; copy k > 0 renames every country to "<name> #k"."""
+    dest.mkdir(parents=True, exist_ok=True)
+    out = []
+    for source, columns in ((Path(life), ("country",)), (Path(suicide), SUICIDE_COUNTRY_COLUMNS)):
+        target = dest / f"{source.stem}-x{factor}.csv"
+        with source.open(newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = reader.fieldnames or []
+        with target.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for k in range(factor):
+                for row in rows:
+                    if k:
+                        row = {**row, **{c: f"{row[c].strip()} #{k}" for c in columns if row.get(c, "").strip()}}
+                    writer.writerow(row)
+        out.append(target)
+    return out[0], out[1]
+
+
+def _rss() -> int:
+    """Current resident set size in bytes (Linux); peak RSS so far elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSS:
+    """Samples RSS in a background thread; tracemalloc would slow a pandas-heavy load several-fold."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.start = self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss())
+
+    def __enter__(self) -> "PeakRSS":
+        self.start = self.peak = _rss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss())
+
+
+def measure_load(life: Path | str, suicide: Path | str) -> dict[str, Any]:
+    """Run ``load_who_data`` once; wall time, peak RSS (and growth over the start) and row counts."""
+    with PeakRSS() as rss:
+        started = time.perf_counter()
+        call_command("load_who_data", life=[str(life)], suicide=[str(suicide)], stdout=StringIO(), stderr=StringIO())
+        seconds = time.perf_counter() - started
+    return {
+        "seconds": round(seconds, 4),
+        "peak_rss_mib": round(rss.peak / 2**20, 2),
+        "rss_growth_mib": round((rss.peak - rss.start) / 2**20, 2),
+        "life_rows": LifeExpectancy.objects.count(),
+        "suicide_rows": SuicideMortality.objects.count(),
+        "countries": Country.objects.count(),
+    }
+
+
+def seed_ids() -> dict[str, Any]:
+    """Ids and names substituted into ``ROUTES`` paths (creates one Note if there are none)."""
+    life = LifeExpectancy.objects.select_related("country").filter(country__suicide_rows__isnull=False).order_by("id")
+    first = life.first() or LifeExpectancy.objects.select_related("country").order_by("id").first()
+    country = first.country if first else Country.objects.order_by("id").first()
+    note = Note.objects.order_by("id").first() or Note.objects.create(title="benchmark", country=country)
+    names = list(Country.objects.order_by("id").values_list("name", flat=True)[:20])
+    return {
+        "country": country.name if country else "",
+        "country_id": country.pk if country else 0,
+        "countries": ",".join(names),
+        "life_id": first.pk if first else 0,
+        "suicide_id": SuicideMortality.objects.order_by("id").values_list("id", flat=True).first() or 0,
+        "note_id": note.pk,
+    }
+
+
+def time_route(client: Client, path: str, iterations: int, warmup: int = 0) -> dict[str, Any]:
+    """Sequential latency statistics for ``path`` (streamed bodies are consumed)."""
+    for _ in range(warmup):
+        _fetch(client, path)
+    latencies = []
+    status = 0
+    for _ in range(max(1, iterations)):
+        started = time.perf_counter()
+        status = _fetch(client, path)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "path": path,
+        "status": status,
+        "requests": len(latencies),
+        "mean_ms": round(total / len(latencies) * 1000, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "rps": round(len(latencies) / total, 1) if total else 0.0,
+    }
+
+
+def _fetch(client: Client, path: str) -> int:
+    response = client.get(path)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response.status_code
+
+
+# (path inside a scale's result, absolute change below which differences are noise)
+COMPARED = (
+    (("load", "seconds"), 0.05),
+    (("load", "peak_rss_mib"), 4.0),
+)
+ROUTE_METRIC = ("p50_ms", 0.25)
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[str]:
+    """Metrics that got more than ``threshold`` (relative) worse than ``baseline``."""
+    regressions = []
+    for scale, result in current.get("scales", {}).items():
+        before = baseline.get("scales", {}).get(scale)
+        if not before:
+            continue
+        checks = [(f"x{scale} load.{keys[1]}", _get(before, keys), _get(result, keys), floor) for keys, floor in COMPARED]
+        metric, floor = ROUTE_METRIC
+        for name, stats in result.get("routes", {}).items():
+            old = before.get("routes", {}).get(name, {}).get(metric)
+            checks.append((f"x{scale} {name} {metric}", old, stats.get(metric), floor))
+        for label, old, new, floor in checks:
+            if old is None or new is None:
+                continue
+            if new - old > floor and new > old * (1 + threshold):
+                regressions.append(f"{label}: {old:g} -> {new:g} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+
+def _get(result: dict[str, Any], keys: tuple[str, ...]) -> Any:
+    for key in keys:
+        result = result.get(key) if isinstance(result, dict) else None
+    return result
@@ -0,0 +1,183 @@
+"""Bootstrap and permutation intervals for the cross-country correlations.
+
+``/api/insights/correlation/?ci=0.95&n_boot=2000&seed=0`` adds, per pair,
+a percentile bootstrap interval for Pearson r (countries resampled with
+replacement) and a permutation test of "no association" (suicide values
+shuffled across countries): its p-value and the central interval of r
+under the null.
+
+Resamples are drawn in batches of ``BATCH``: one (BATCH x countries) index
+matrix per batch, gathered and correlated along the last axis in a single
+NumPy pass. Each batch has its own seed derived from (seed, pair, kind,
+batch), so the numbers do not depend on the order batches run in or on
+whether they ran in-process or on the ``HEALTH_BOOTSTRAP_WORKERS`` process
+pool. Batches stop when ``HEALTH_BOOTSTRAP_TIME_BUDGET`` runs out; the
+intervals then use the resamples that finished and ``complete`` is false.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Mapping, Optional
+
+import django
+import numpy as np
+from django.conf import settings
+
+from .analytics import _pearson_last_axis, pearson
+
+BATCH = 500
+BOOTSTRAP, PERMUTATION = 0, 1
+DEFAULT_LEVEL = 0.95
+DEFAULT_RESAMPLES = 2000
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+@dataclass(frozen=True)
+class Resampling:
+    level: float
+    n_boot: int
+    seed: int
+
+
+def parse_resampling(params: Mapping[str, str]) -> Optional[Resampling]:
+    """Read ``ci``, ``n_boot`` and ``seed``; None when neither ``ci`` nor ``n_boot`` is given.
+
+    Raises ValueError for malformed or out-of-range values.
+    """
+    raw_level, raw_n = params.get("ci"), params.get("n_boot")
+    if not raw_level and not raw_n:
+        return None
+    try:
+        level = float(raw_level) if raw_level else DEFAULT_LEVEL
+        n_boot = int(raw_n) if raw_n else DEFAULT_RESAMPLES
+        seed = int(params.get("seed") or 0)
+    except ValueError:
+        raise ValueError("ci must be a number, n_boot and seed integers")
+    if not 0.0 < level < 1.0:
+        raise ValueError("ci must be between 0 and 1 (e.g. 0.95)")
+    limit = settings.HEALTH_BOOTSTRAP_MAX_RESAMPLES
+    if not 1 <= n_boot <= limit:
+        raise ValueError(f"n_boot must be between 1 and {limit}")
+    if seed < 0:
+        raise ValueError("seed must be non-negative")
+    return Resampling(level, n_boot, seed)
+
+
+def resample_batch(kind: int, x: np.ndarray, y: np.ndarray, size: int, seed: tuple[int, ...]) -> np.ndarray:
+    """Pearson r of ``size`` bootstrap resamples or permutations of (x, y), all in one (size, n) matrix."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
+    n = len(x)
+    if kind == BOOTSTRAP:
+        index = rng.integers(0, n, size=(size, n))
+        _, r = _pearson_last_axis(x[index], y[index], min_n=3)
+    else:
+        index = np.argsort(rng.random((size, n)), axis=1)
+        _, r = _pearson_last_axis(np.broadcast_to(x, (size, n)), y[index], min_n=3)
+    return r
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by all requests of this process, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+        return _pool
+
+
+def _round(value: float) -> Optional[float]:
+    return None if value != value else round(float(value), 6)
+
+
+def _interval(values: np.ndarray, level: float) -> tuple[Optional[float], Optional[float]]:
+    if not len(values):
+        return None, None
+    low, high = np.quantile(values, [(1 - level) / 2, (1 + level) / 2])
+    return _round(low), _round(high)
+
+
+def resample_correlations(
+    samples: list[tuple[np.ndarray, np.ndarray]], spec: Resampling
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """Bootstrap interval and permutation test for each (x, y) sample.
+
+    Returns one ``{"ci": ..., "permutation": ...}`` dict per sample and the
+    run's metadata. Pairs without a defined r (too few countries or zero
+    variance) get null bounds and no resamples.
+    """
+    deadline = time.perf_counter() + settings.HEALTH_BOOTSTRAP_TIME_BUDGET
+    batches = -(-spec.n_boot // BATCH)
+
+    observed, data = [], []
+    for x, y in samples:
+        mask = np.isfinite(x) & np.isfinite(y)
+        observed.append(pearson(x, y)[1])
+        data.append((x[mask], y[mask]))
+    live = [i for i, r in enumerate(observed) if r is not None]
+
+    # Batch-major order, so a run cut short by the budget still covers every pair and kind evenly.
+    tasks = [
+        (i, kind, b, min(BATCH, spec.n_boot - b * BATCH))
+        for b in range(batches)
+        for i in live
+        for kind in (BOOTSTRAP, PERMUTATION)
+    ]
+
+    def args(task):
+        i, kind, b, size = task
+        return (kind, *data[i], size, (spec.seed, i, kind, b))
+
+    workers = settings.HEALTH_BOOTSTRAP_WORKERS
+    parallel = workers > 1 and spec.n_boot * len(live) * 2 >= settings.HEALTH_BOOTSTRAP_PARALLEL_MIN
+    done: dict[tuple, np.ndarray] = {}
+    if parallel:
+        pool = _executor(workers)
+        futures = {pool.submit(resample_batch, *args(task)): task for task in tasks}
+        finished, pending = wait(futures, timeout=max(0.0, deadline - time.perf_counter()))
+        for future in pending:
+            future.cancel()
+        done = {futures[f]: f.result() for f in finished}
+    else:
+        for task in tasks:
+            if time.perf_counter() >= deadline:
+                break
+            done[task] = resample_batch(*args(task))
+
+    intervals = []
+    for i, r in enumerate(observed):
+        draws = [
+            np.concatenate([done[t] for t in tasks if t[0] == i and t[1] == kind and t in done] or [np.empty(0)])
+            for kind in (BOOTSTRAP, PERMUTATION)
+        ]
+        boot, perm = (d[np.isfinite(d)] for d in draws)
+        low, high = _interval(boot, spec.level)
+        null_low, null_high = _interval(perm, spec.level)
+        p_value = None
+        if r is not None and len(perm):
+            # Two-sided, counting the observed statistic as one of the permutations.
+            p_value = _round((1 + np.count_nonzero(np.abs(perm) >= abs(r) - 1e-12)) / (1 + len(perm)))
+        intervals.append(
+            {
+                "ci": {"level": spec.level, "low": low, "high": high, "resamples": int(len(boot))},
+                "permutation": {
+                    "p_value": p_value,
+                    "null_low": null_low,
+                    "null_high": null_high,
+                    "permutations": int(len(perm)),
+                },
+            }
+        )
+
+    meta = {
+        "n_boot": spec.n_boot,
+        "seed": spec.seed,
+        "workers": workers if parallel else 1,
+        "complete": len(done) == len(tasks),
+    }
+    return intervals, meta
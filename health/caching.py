@@ -0,0 +1,156 @@
+"""Response cache for the read-only API endpoints.
+
+Responses are cached in the Django cache named by ``HEALTH_RESPONSE_CACHE``
+(local-memory LRU by default; file-based or Redis when configured, see
+``CACHES`` in settings). Keys include the dataset version stamp, so a reload
+invalidates every entry at once without having to enumerate them.
+
+The same key doubles as a strong ETag: the body only depends on the path,
+the normalised query, the Accept header and the dataset version, so a
+matching ``If-None-Match`` can be answered with 304 before any work is done.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+from .versioning import current_dataset_version, dataset_updated_at
+
+CACHEABLE_CONTENT_TYPES = ("application/json",)
+
+
+def response_cache_enabled() -> bool:
+    return bool(getattr(settings, "HEALTH_RESPONSE_CACHE_ENABLED", True))
+
+
+def normalised_query(request: HttpRequest) -> str:
+    """Query string with keys sorted and empty values dropped.
+
+    Values are kept exactly as sent (value order too): the views read the raw
+    values, so ``sex=%20Male`` and ``sex=Male`` are different responses.
+    """
+    pairs = [(key, value) for key in sorted(request.GET.keys()) for value in request.GET.getlist(key) if value != ""]
+    return urlencode(pairs)
+
+
+def response_cache_key(request: HttpRequest, version: str) -> str:
+    # Scheme and host are part of the key: paginated bodies embed absolute next/previous URLs.
+    raw = "\n".join(
+        [
+            version,
+            request.scheme,
+            request.get_host(),
+            request.path,
+            normalised_query(request),
+            request.META.get("HTTP_ACCEPT", ""),
+        ]
+    )
+    return "health:response:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _etag_matches(request: HttpRequest, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not header:
+        return False
+    # No "*": a GET has no current representation to match until the view has produced a 200.
+    tags = [t.strip() for t in header.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def _identity(request: HttpRequest) -> tuple[str, str, Any]:
+    """(cache key, ETag, dataset updated_at) for ``request``; reads the version stamp."""
+    key = response_cache_key(request, current_dataset_version())
+    return key, f'"{key.rsplit(":", 1)[1][:32]}"', dataset_updated_at()
+
+
+def _stamp(response: HttpResponse, etag: str, updated_at: Any) -> HttpResponse:
+    response["ETag"] = etag
+    if updated_at is not None:
+        response["Last-Modified"] = http_date(updated_at.timestamp())
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+def _response_cache():
+    return caches[getattr(settings, "HEALTH_RESPONSE_CACHE", "default")]
+
+
+def _hit(cached: tuple[bytes, str]) -> HttpResponse:
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def _cacheable(response: HttpResponse) -> bool:
+    if response.status_code != 200 or response.streaming:
+        return False
+    if hasattr(response, "render") and not response.is_rendered:
+        response.render()
+    return response.get("Content-Type", "").startswith(CACHEABLE_CONTENT_TYPES)
+
+
+def _timeout() -> int:
+    return getattr(settings, "HEALTH_RESPONSE_CACHE_TIMEOUT", 24 * 3600)
+
+
+class CachedResponseMixin:
+    """Serve GET requests from the response cache and answer conditional requests.
+
+    Mix into DRF views/viewsets before the DRF base class.
+    """
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if request.method not in ("GET", "HEAD") or not response_cache_enabled():
+            return super().dispatch(request, *args, **kwargs)
+
+        key, etag, updated_at = _identity(request)
+        if _etag_matches(request, etag):
+            return _stamp(HttpResponseNotModified(), etag, updated_at)
+
+        cache = _response_cache()
+        cached = cache.get(key) if request.method == "GET" else None
+        if cached is not None:
+            return _stamp(_hit(cached), etag, updated_at)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if not _cacheable(response):
+            return response
+        if request.method == "GET":
+            cache.set(key, (response.content, response["Content-Type"]), _timeout())
+        response["X-Cache"] = "MISS"
+        return _stamp(response, etag, updated_at)
+
+
+class AsyncCachedResponseMixin:
+    """``CachedResponseMixin`` for async Django views (cache reads/writes via ``aget``/``aset``)."""
+
+    async def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if request.method not in ("GET", "HEAD") or not response_cache_enabled():
+            return await super().dispatch(request, *args, **kwargs)
+
+        key, etag, updated_at = await sync_to_async(_identity)(request)
+        if _etag_matches(request, etag):
+            return _stamp(HttpResponseNotModified(), etag, updated_at)
+
+        cache = _response_cache()
+        cached = await cache.aget(key) if request.method == "GET" else None
+        if cached is not None:
+            return _stamp(_hit(cached), etag, updated_at)
+
+        response = await super().dispatch(request, *args, **kwargs)
+        if not _cacheable(response):
+            return response
+        if request.method == "GET":
+            await cache.aset(key, (response.content, response["Content-Type"]), _timeout())
+        response["X-Cache"] = "MISS"
+        return _stamp(response, etag, updated_at)
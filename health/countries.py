@@ -0,0 +1,180 @@
+"""In-process country name resolver.
+
+Country lookups (``?country=`` on the list filters and the insights views)
+used to run ``name__iexact`` / ``country__name__icontains`` queries, which
+SQLite cannot answer from the index on ``Country.name``. The resolver keeps
+every country's name, normalised key (``Country.name_key``) and ISO3 code in
+memory and answers lookups from dicts; it is rebuilt when the dataset version
+stamp changes, like the columnar snapshot.
+
+Names are matched by exact (casefolded) name first, then by normalised key,
+known aliases (WHO renames between releases, common short forms) and ISO3
+code. Rows whose names are aliases of each other (e.g. "Turkey" in the life
+dataset and "Türkiye" in the suicide dataset) form one group, so filtering
+by either name matches both, and the single-country insights read the whole
+group (``lookup()``) and take each value from the first member that has it
+(``group_row`` / ``group_years``).
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Sequence
+
+from .models import Country, country_key
+from .versioning import current_dataset_version
+
+SEARCH_CACHE_SIZE = 1024
+
+# Normalised alias key -> normalised key of the name used in the WHO data.
+ALIASES: dict[str, str] = {
+    "turkey": "turkiye",
+    "swaziland": "eswatini",
+    "netherlands": "netherlandskingdomofthe",
+    "theformeryugoslavrepublicofmacedonia": "northmacedonia",
+    "macedonia": "northmacedonia",
+    "usa": "unitedstatesofamerica",
+    "us": "unitedstatesofamerica",
+    "unitedstates": "unitedstatesofamerica",
+    "uk": "unitedkingdomofgreatbritainandnorthernireland",
+    "unitedkingdom": "unitedkingdomofgreatbritainandnorthernireland",
+    "greatbritain": "unitedkingdomofgreatbritainandnorthernireland",
+    "russia": "russianfederation",
+    "southkorea": "republicofkorea",
+    "korea": "republicofkorea",
+    "northkorea": "democraticpeoplesrepublicofkorea",
+    "iran": "iranislamicrepublicof",
+    "syria": "syrianarabrepublic",
+    "laos": "laopeoplesdemocraticrepublic",
+    "moldova": "republicofmoldova",
+    "tanzania": "unitedrepublicoftanzania",
+    "bolivia": "boliviaplurinationalstateof",
+    "venezuela": "venezuelabolivarianrepublicof",
+    "micronesia": "micronesiafederatedstatesof",
+    "czechrepublic": "czechia",
+    "capeverde": "caboverde",
+    "ivorycoast": "cotedivoire",
+    "drc": "democraticrepublicofthecongo",
+    "palestine": "occupiedpalestinianterritoryincludingeastjerusalem",
+}
+
+
+@dataclass
+class CountryResolver:
+    version: str
+    names: dict[int, str]
+    keys: dict[int, str]
+    iso3: dict[int, str]
+    exact: dict[str, int] = field(init=False)
+    groups: dict[str, list[int]] = field(init=False)
+    by_iso3: dict[str, int] = field(init=False)
+    _searches: dict[str, list[int]] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.exact = {name.casefold(): cid for cid, name in self.names.items()}
+        self.groups = {}
+        for cid in sorted(self.names):
+            self.groups.setdefault(ALIASES.get(self.keys[cid], self.keys[cid]), []).append(cid)
+        self.by_iso3 = {code: cid for cid, code in self.iso3.items() if code}
+
+    def lookup(self, name: str) -> list[int]:
+        """Ids matching ``name`` exactly, by normalised key/alias, or by ISO3 code."""
+        name = name.strip()
+        ids: list[int] = []
+        exact = self.exact.get(name.casefold())
+        if exact is not None:
+            ids.append(exact)
+        key = country_key(name)
+        group_key = ALIASES.get(key, key)
+        by_code = self.by_iso3.get(name.upper()) if len(name) == 3 else None
+        if by_code is not None:
+            ids.append(by_code)
+            key = self.keys[by_code]
+            group_key = ALIASES.get(key, key)
+        group = self.groups.get(group_key, [])
+        # Same normalised key before other members of the alias group.
+        ids.extend(cid for cid in group if self.keys[cid] == key)
+        ids.extend(group)
+        return list(dict.fromkeys(ids))
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Single best id for ``name`` (exact name wins over aliases), or None."""
+        ids = self.lookup(name)
+        return ids[0] if ids else None
+
+    def search(self, term: str) -> list[int]:
+        """``icontains`` equivalent: alias/ISO3 hits plus substring matches on name or key.
+
+        Results are memoised per term (bounded), so repeated filters are a dict hit.
+        """
+        term = term.strip()
+        cached = self._searches.get(term)
+        if cached is not None:
+            return cached
+        hits = set(self.lookup(term))
+        folded, key = term.casefold(), country_key(term)
+        for cid, name in self.names.items():
+            if folded in name.casefold() or (key and key in self.keys[cid]):
+                hits.add(cid)
+        if len(self._searches) >= SEARCH_CACHE_SIZE:
+            self._searches.clear()
+        self._searches[term] = sorted(hits)
+        return self._searches[term]
+
+
+def group_row(ids: Sequence[int], rows: Iterable[tuple]) -> Optional[tuple]:
+    """One row for an alias group from ``(country_id, value, *rest)`` rows, without the country_id.
+
+    The first member (in ``ids`` order) whose value is not null wins; failing
+    that, the first member that has a row at all. None when no member has one.
+    """
+    by_member: dict[int, tuple] = {}
+    for cid, *values in rows:
+        by_member.setdefault(cid, tuple(values))
+    present = [by_member[cid] for cid in ids if cid in by_member]
+    return next((row for row in present if row[0] is not None), present[0] if present else None)
+
+
+def group_years(ids: Sequence[int], rows: Iterable[tuple]) -> dict[int, Optional[float]]:
+    """year -> value from ``(country_id, year, value)`` rows, per year from the first member with a value."""
+    order = {cid: i for i, cid in enumerate(ids)}
+    merged: dict[int, Optional[float]] = {}
+    for _, year, value in sorted(rows, key=lambda row: order[row[0]]):
+        if merged.get(year) is None:
+            merged[year] = value
+    return merged
+
+
+def build_resolver(version: str) -> CountryResolver:
+    names: dict[int, str] = {}
+    keys: dict[int, str] = {}
+    iso3: dict[int, str] = {}
+    for cid, name, name_key, code in Country.objects.values_list("id", "name", "name_key", "iso3"):
+        names[cid] = name
+        keys[cid] = name_key or country_key(name)
+        iso3[cid] = code.upper()
+    return CountryResolver(version=version, names=names, keys=keys, iso3=iso3)
+
+
+_lock = threading.Lock()
+_resolver: Optional[CountryResolver] = None
+
+
+def get_resolver() -> CountryResolver:
+    """Return the current resolver, rebuilding it if the dataset version changed."""
+    global _resolver
+    version = current_dataset_version()
+    resolver = _resolver
+    if resolver is not None and resolver.version == version:
+        return resolver
+    with _lock:
+        if _resolver is None or _resolver.version != version:
+            _resolver = build_resolver(version)
+        return _resolver
+
+
+def clear_resolver() -> None:
+    global _resolver
+    with _lock:
+        _resolver = None
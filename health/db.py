@@ -0,0 +1,68 @@
+"""SQLite connection tuning and read-replica routing.
+
+``apply_sqlite_pragmas`` runs ``settings.HEALTH_SQLITE_PRAGMAS`` on every new
+SQLite connection (``connection_created``). The production profile in
+``config/settings.py`` uses it to switch the file to WAL, so readers keep
+answering from the last committed snapshot while ``load_who_data`` holds its
+write transaction, and to size the page cache and memory map.
+
+``ReadReplicaRouter`` sends reads of the dataset tables to the ``replica``
+alias, a read-only (``mode=ro``) connection to the same file. It reads the
+same committed data as ``default``, so there is no replication lag; reads
+inside a transaction on ``default`` stay there so a writer sees its own rows.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+REPLICA_ALIAS = "replica"
+
+# Tables only written by load_who_data / refresh_facts (and the admin).
+READ_ONLY_MODELS = frozenset({"country", "lifeexpectancy", "suicidemortality", "countryyearfact", "lifeexpectancyrank", "regionyearaggregate"})
+
+# Pragmas that change the database file rather than the connection.
+FILE_PRAGMAS = frozenset({"journal_mode"})
+
+
+def is_read_only(connection) -> bool:
+    return "mode=ro" in str(connection.settings_dict["NAME"])
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs) -> None:
+    if connection.vendor != "sqlite":
+        return
+    pragmas: dict[str, Any] = getattr(settings, "HEALTH_SQLITE_PRAGMAS", {})
+    read_only = is_read_only(connection)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if read_only and name in FILE_PRAGMAS:
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+class ReadReplicaRouter:
+    """Route dataset reads to the read-only replica alias (installed with it by the production profile)."""
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if model._meta.app_label != "health" or model._meta.model_name not in READ_ONLY_MODELS:
+            return None
+        if connections["default"].in_atomic_block:
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        # Both aliases open the same file.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        return db != REPLICA_ALIAS
@@ -0,0 +1,138 @@
+"""Streaming bulk export of the WHO datasets.
+
+Rows are read with ``values_list().iterator(chunk_size=...)`` and encoded one
+chunk at a time, so memory stays flat regardless of how many rows match.
+CSV and NDJSON are always available; Parquet and Arrow IPC need ``pyarrow``.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db import models
+
+from .filters import LifeExpectancyFilter, SuicideMortalityFilter
+from .ingest import LIFE_FIELDS, SUICIDE_FIELDS
+from .models import LifeExpectancy, SuicideMortality
+
+try:  # optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pa = None
+    pq = None
+
+DATASETS = {
+    "life-expectancy": (LifeExpectancy, LifeExpectancyFilter, LIFE_FIELDS, ("country__name", "year", "id")),
+    "suicide-mortality": (SuicideMortality, SuicideMortalityFilter, SUICIDE_FIELDS, ("country__name", "year", "sex", "id")),
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+ARROW_FORMATS = ("parquet", "arrow")
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    it = iter(rows)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def stream_csv(columns: list[str], rows: Iterable[tuple], chunk_size: int) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield buf.getvalue()
+    for chunk in _chunks(rows, chunk_size):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(chunk)
+        yield buf.getvalue()
+
+
+def stream_ndjson(columns: list[str], rows: Iterable[tuple], chunk_size: int) -> Iterator[str]:
+    for chunk in _chunks(rows, chunk_size):
+        yield "".join(json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n" for row in chunk)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting bytes until the generator drains them."""
+
+    def __init__(self) -> None:
+        self.parts: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        out = b"".join(self.parts)
+        self.parts.clear()
+        return out
+
+
+def arrow_schema(model: type[models.Model], fields: tuple[str, ...]):
+    types = [pa.field("country", pa.string())]
+    for name in fields:
+        f = model._meta.get_field(name)
+        if isinstance(f, models.FloatField):
+            types.append(pa.field(name, pa.float64()))
+        elif isinstance(f, models.BooleanField):
+            types.append(pa.field(name, pa.bool_()))
+        elif isinstance(f, models.IntegerField):
+            types.append(pa.field(name, pa.int64()))
+        else:
+            types.append(pa.field(name, pa.string()))
+    return pa.schema(types)
+
+
+def stream_arrow(fmt: str, schema, rows: Iterable[tuple], chunk_size: int) -> Iterator[bytes]:
+    """Parquet (one row group per chunk) or Arrow IPC stream (one batch per chunk)."""
+    sink = _ChunkSink()
+    out = pa.PythonFile(sink, mode="w")
+    writer = pq.ParquetWriter(out, schema) if fmt == "parquet" else pa.ipc.new_stream(out, schema)
+    for chunk in _chunks(rows, chunk_size):
+        columns = list(zip(*chunk))
+        batch = pa.record_batch([pa.array(col, type=f.type) for col, f in zip(columns, schema)], schema=schema)
+        if fmt == "parquet":
+            writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def export_rows(dataset: str, params, chunk_size: int) -> tuple[dict, list[str], Iterator[tuple]]:
+    """Apply the dataset's FilterSet to ``params``; returns (errors, columns, row iterator)."""
+    model, filterset_class, fields, ordering = DATASETS[dataset]
+    filterset = filterset_class(params, queryset=model.objects.order_by(*ordering))
+    if not filterset.is_valid():
+        return dict(filterset.errors), [], iter(())
+    columns = ["country", *fields]
+    rows = filterset.qs.values_list("country__name", *fields).iterator(chunk_size=chunk_size)
+    return {}, columns, rows
+
+
+def stream_export(fmt: str, dataset: str, columns: list[str], rows: Iterator[tuple], chunk_size: int) -> Iterator:
+    if fmt == "csv":
+        return stream_csv(columns, rows, chunk_size)
+    if fmt == "ndjson":
+        return stream_ndjson(columns, rows, chunk_size)
+    model, _, fields, _ = DATASETS[dataset]
+    return stream_arrow(fmt, arrow_schema(model, fields), rows, chunk_size)
@@ -0,0 +1,212 @@
+"""Materialised country-year facts joining both WHO datasets.
+
+``CountryYearFact`` holds one row per (country, year, sex) with the life
+expectancy columns repeated for each sex, so the cross-dataset insights need
+no request-time join: a summary or timeline is one indexed lookup on
+(country, sex, year), risk flags one range query on (year, sex), and the
+correlation means one grouped query.
+
+The table is rebuilt by ``load_who_data`` and ``refresh_facts`` (after an
+``--upsert`` only the countries whose rows changed). Any other edit bumps the
+dataset version, which marks the facts stale; the views then fall back to the
+base tables until the next rebuild.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Collection, Iterator, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg
+
+from .countries import get_resolver, group_row, group_years
+from .models import CountryYearFact, LifeExpectancy, SuicideMortality
+from .versioning import current_dataset_version, derived_current, mark_derived_built
+
+FACT_LIFE_COLUMNS = ("life_expectancy",)
+FACT_SUICIDE_COLUMNS = ("rate", "rate_low", "rate_high")
+DEFAULT_SEX = "Both sexes"
+# Country ids per ``country_id__in`` query when refreshing part of the table.
+ID_CHUNK = 500
+
+
+def facts_enabled() -> bool:
+    """Read from the fact table: enabled in settings and built from the current version."""
+    return bool(getattr(settings, "HEALTH_FACT_TABLE", True)) and derived_current("facts")
+
+
+def _id_chunks(country_ids: Collection[int]) -> Iterator[list[int]]:
+    ids = sorted(country_ids)
+    for start in range(0, len(ids), ID_CHUNK):
+        yield ids[start : start + ID_CHUNK]
+
+
+def _for_countries(qs, country_ids: Optional[Collection[int]]) -> Iterator:
+    if country_ids is None:
+        yield from qs
+        return
+    for chunk in _id_chunks(country_ids):
+        yield from qs.filter(country_id__in=chunk)
+
+
+def _suicide_sexes() -> list[str]:
+    return sorted(set(SuicideMortality.objects.values_list("sex", flat=True).distinct()))
+
+
+def build_fact_rows(country_ids: Optional[Collection[int]] = None) -> list[CountryYearFact]:
+    """Fact rows of every country-year, or only of ``country_ids``."""
+    life = {
+        (cid, year): (value, status)
+        for cid, year, value, status in _for_countries(
+            LifeExpectancy.objects.values_list("country_id", "year", "life_expectancy", "status"), country_ids
+        )
+    }
+    suicide = {
+        (cid, year, sex): rest
+        for cid, year, sex, *rest in _for_countries(
+            SuicideMortality.objects.values_list(
+                "country_id", "year", "sex", "rate", "rate_low", "rate_high", "parent_location"
+            ),
+            country_ids,
+        )
+    }
+    sexes = _suicide_sexes() or [DEFAULT_SEX]
+    country_years = sorted(set(life) | {key[:2] for key in suicide})
+
+    rows = []
+    for cid, year in country_years:
+        life_value, status = life.get((cid, year), (None, ""))
+        for sex in sexes:
+            rate, rate_low, rate_high, parent_location = suicide.get((cid, year, sex), (None, None, None, ""))
+            rows.append(
+                CountryYearFact(
+                    country_id=cid,
+                    year=year,
+                    sex=sex,
+                    life_expectancy=life_value,
+                    status=status,
+                    rate=rate,
+                    rate_low=rate_low,
+                    rate_high=rate_high,
+                    parent_location=parent_location,
+                )
+            )
+    return rows
+
+
+@transaction.atomic
+def refresh_facts(version: str, batch_size: int = 1000, country_ids: Optional[Collection[int]] = None) -> int:
+    """Rebuild the fact table from the base tables and stamp it with ``version``.
+
+    With ``country_ids`` only those countries' rows are replaced (the rest of
+    the table must already match the base tables); a sex label that is new or
+    gone adds or drops a row in every country-year, so that rebuilds it all.
+    """
+    if country_ids is not None:
+        stored = sorted(set(CountryYearFact.objects.values_list("sex", flat=True).distinct()))
+        if stored != (_suicide_sexes() or [DEFAULT_SEX]):
+            country_ids = None
+    rows = build_fact_rows(country_ids)
+    if country_ids is None:
+        CountryYearFact.objects.all().delete()
+    else:
+        for chunk in _id_chunks(country_ids):
+            CountryYearFact.objects.filter(country_id__in=chunk).delete()
+    CountryYearFact.objects.bulk_create(rows, batch_size=batch_size)
+    mark_derived_built("facts", version)
+    return len(rows)
+
+
+@lru_cache(maxsize=4)
+def _sex_labels(version: str) -> dict[str, str]:
+    return {label.casefold(): label for label in CountryYearFact.objects.values_list("sex", flat=True).distinct()}
+
+
+def sex_label(sex: str) -> tuple[Optional[str], bool]:
+    """(stored label to filter on, whether it matches ``sex``) for case-insensitive sex lookups.
+
+    Every country-year has a row per sex, so an unknown sex still reads the
+    life values from some label, just without a suicide rate.
+    """
+    labels = _sex_labels(current_dataset_version())
+    label = labels.get(sex.casefold())
+    if label is not None:
+        return label, True
+    return next(iter(labels.values()), None), False
+
+
+def fact_summary(country_ids: Sequence[int], year: int, sex: str) -> dict[str, Any]:
+    """Summary of one country-year; ``country_ids`` is an alias group, best match first."""
+    label, matched = sex_label(sex)
+    rows = list(
+        CountryYearFact.objects.filter(country_id__in=country_ids, sex=label, year=year).values_list(
+            "country_id", "life_expectancy", "status", "rate", "parent_location"
+        )
+    )
+    life_value, status = group_row(country_ids, [(cid, value, status) for cid, value, status, *_ in rows]) or (None, "")
+    rate, parent_location = group_row(country_ids, [(cid, *rest) for cid, _, _, *rest in rows]) or (None, "")
+    return {
+        "country": get_resolver().names[country_ids[0]],
+        "year": year,
+        "life_expectancy": life_value,
+        "status": status,
+        "suicide_rate": rate if matched else None,
+        "sex": sex,
+        "parent_location": parent_location if matched else "",
+    }
+
+
+def fact_timeline(country_ids: Sequence[int], year_min: int, year_max: int, sex: str) -> tuple[dict, dict]:
+    """(year -> life expectancy, year -> suicide rate) for an alias group; covered by the (country, sex, year) index."""
+    label, matched = sex_label(sex)
+    rows = list(
+        CountryYearFact.objects.filter(
+            country_id__in=country_ids, sex=label, year__gte=year_min, year__lte=year_max
+        ).values_list("country_id", "year", "life_expectancy", "rate")
+    )
+    life_map = group_years(country_ids, [(cid, year, value) for cid, year, value, _ in rows])
+    sui_map = group_years(country_ids, [(cid, year, rate) for cid, year, _, rate in rows]) if matched else {}
+    return life_map, sui_map
+
+
+def fact_risk_flags(year: int, min_life: float, min_suicide: float, sex: str) -> list[dict[str, Any]]:
+    """One range query, covered by the (year, sex, life_expectancy, rate, country) index."""
+    label, matched = sex_label(sex)
+    if not matched:
+        return []
+    names = get_resolver().names
+    rows = (
+        CountryYearFact.objects.filter(year=year, sex=label, life_expectancy__lte=min_life, rate__gte=min_suicide)
+        .order_by("life_expectancy", "-rate", "country_id")
+        .values_list("country_id", "life_expectancy", "rate")
+    )
+    return [
+        {"country": names[cid], "year": year, "life_expectancy": life_value, "suicide_rate": rate}
+        for cid, life_value, rate in rows
+    ]
+
+
+def fact_country_means(
+    year_min: int, year_max: int, sex: str, life_columns: list[str], suicide_columns: list[str]
+) -> Optional[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """``analytics.country_means`` from one grouped query, or None if a column is not materialised."""
+    if not set(life_columns) <= set(FACT_LIFE_COLUMNS) or not set(suicide_columns) <= set(FACT_SUICIDE_COLUMNS):
+        return None
+    label, matched = sex_label(sex)
+    if not matched:
+        empty = np.empty((0, 0))
+        return np.empty(0, dtype=np.int64), empty.reshape(0, len(life_columns)), empty.reshape(0, len(suicide_columns))
+    columns = [*life_columns, *suicide_columns]
+    rows = list(
+        CountryYearFact.objects.filter(year__gte=year_min, year__lte=year_max, sex=label)
+        .values("country_id")
+        .annotate(**{f"avg_{c}": Avg(c) for c in columns})
+        .order_by("country_id")
+        .values_list("country_id", *(f"avg_{c}" for c in columns))
+    )
+    ids = np.array([r[0] for r in rows], dtype=np.int64)
+    means = np.array([[np.nan if v is None else v for v in r[1:]] for r in rows], dtype=float).reshape(len(rows), len(columns))
+    return ids, means[:, : len(life_columns)], means[:, len(life_columns) :]
@@ -2,11 +2,20 @@
 
 import django_filters
 
+from .countries import get_resolver
 from .models import LifeExpectancy, SuicideMortality
 
 
-class LifeExpectancyFilter(django_filters.FilterSet):
-    country = django_filters.CharFilter(field_name="country__name", lookup_expr="icontains")
+class CountryNameFilterSet(django_filters.FilterSet):
+    """``?country=`` substring/alias match, resolved in memory to ``country_id__in`` (no join)."""
+
+    country = django_filters.CharFilter(method="filter_country")
+
+    def filter_country(self, queryset, name, value):
+        return queryset.filter(country_id__in=get_resolver().search(value))
+
+
+class LifeExpectancyFilter(CountryNameFilterSet):
     year_min = django_filters.NumberFilter(field_name="year", lookup_expr="gte")
     year_max = django_filters.NumberFilter(field_name="year", lookup_expr="lte")
 
@@ -15,8 +24,7 @@ class LifeExpectancyFilter(django_filters.FilterSet):
         fields = ["country", "status", "year_min", "year_max"]
 
 
-class SuicideMortalityFilter(django_filters.FilterSet):
-    country = django_filters.CharFilter(field_name="country__name", lookup_expr="icontains")
+class SuicideMortalityFilter(CountryNameFilterSet):
     year_min = django_filters.NumberFilter(field_name="year", lookup_expr="gte")
     year_max = django_filters.NumberFilter(field_name="year", lookup_expr="lte")
 
@@ -0,0 +1,323 @@
+"""CSV parsing and cleaning for the WHO datasets.
+
+The loader streams each CSV in chunks and cleans whole columns at once
+(``pd.to_numeric(errors="coerce")`` and vectorised string ops) instead of
+converting cell by cell, so memory stays proportional to the chunk size.
+"""
+
+from __future__ import annotations
+
+import glob
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from .models import Country, LifeExpectancy, SuicideMortality, country_key
+
+LIFE = "life"
+SUICIDE = "suicide"
+
+LIFE_FLOAT_FIELDS: tuple[str, ...] = (
+    "life_expectancy",
+    "adult_mortality",
+    "infant_deaths",
+    "alcohol",
+    "percentage_expenditure",
+    "hepatitis_b",
+    "measles",
+    "bmi",
+    "under_five_deaths",
+    "polio",
+    "total_expenditure",
+    "diphtheria",
+    "hiv_aids",
+    "gdp",
+    "population",
+    "thinness_1_19_years",
+    "thinness_5_9_years",
+    "income_composition_of_resources",
+    "schooling",
+)
+# The life CSV already uses the model field names.
+LIFE_CSV_COLUMNS: tuple[str, ...] = ("country", "year", "status", *LIFE_FLOAT_FIELDS)
+LIFE_FIELDS: tuple[str, ...] = ("year", "status", *LIFE_FLOAT_FIELDS)
+
+# WHO GHO export column -> model field.
+SUICIDE_CSV_COLUMNS: dict[str, str] = {
+    "IndicatorCode": "indicator_code",
+    "Indicator": "indicator",
+    "ParentLocationCode": "parent_location_code",
+    "ParentLocation": "parent_location",
+    "SpatialDimValueCode": "spatial_dim_value_code",
+    "Location": "country",
+    "Period": "year",
+    "Dim1": "sex",
+    "FactValueNumeric": "rate",
+    "FactValueNumericLow": "rate_low",
+    "FactValueNumericHigh": "rate_high",
+    "Value": "value_text",
+    "IsLatestYear": "is_latest_year",
+    "DateModified": "date_modified",
+}
+SUICIDE_TEXT_FIELDS: tuple[str, ...] = (
+    "indicator_code",
+    "indicator",
+    "parent_location_code",
+    "parent_location",
+    "spatial_dim_value_code",
+    "sex",
+    "value_text",
+    "date_modified",
+)
+SUICIDE_FLOAT_FIELDS: tuple[str, ...] = ("rate", "rate_low", "rate_high")
+SUICIDE_FIELDS: tuple[str, ...] = (
+    "indicator_code",
+    "indicator",
+    "parent_location_code",
+    "parent_location",
+    "spatial_dim_value_code",
+    "year",
+    "sex",
+    "rate",
+    "rate_low",
+    "rate_high",
+    "value_text",
+    "is_latest_year",
+    "date_modified",
+)
+
+TRUE_STRINGS = ("true", "1", "yes")
+
+
+def _text(col: pd.Series) -> pd.Series:
+    return col.fillna("").astype(str).str.strip()
+
+
+def _float(col: pd.Series) -> pd.Series:
+    return pd.to_numeric(col, errors="coerce").astype("float64")
+
+
+def _year(col: pd.Series) -> pd.Series:
+    # Matches the old int(float(v)) behaviour: truncate, NaN when unparsable.
+    return np.trunc(pd.to_numeric(col, errors="coerce"))
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(np.nan, index=df.index, dtype="object")
+
+
+def clean_life_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``country`` + LIFE_FIELDS with coerced dtypes; rows without country/year dropped."""
+    out = pd.DataFrame(index=df.index)
+    out["country"] = _text(_column(df, "country"))
+    out["year"] = _year(_column(df, "year"))
+    out["status"] = _text(_column(df, "status"))
+    for name in LIFE_FLOAT_FIELDS:
+        out[name] = _float(_column(df, name))
+
+    out = out[(out["country"] != "") & out["year"].notna()]
+    return out.astype({"year": "int64"}).reset_index(drop=True)
+
+
+def clean_suicide_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return ``country`` + SUICIDE_FIELDS with coerced dtypes; rows without country/year dropped."""
+    raw = df[[c for c in df.columns if c in SUICIDE_CSV_COLUMNS]].rename(columns=SUICIDE_CSV_COLUMNS)
+    out = pd.DataFrame(index=df.index)
+    out["country"] = _text(_column(raw, "country"))
+    out["year"] = _year(_column(raw, "year"))
+    for name in SUICIDE_TEXT_FIELDS:
+        out[name] = _text(_column(raw, name))
+    for name in SUICIDE_FLOAT_FIELDS:
+        out[name] = _float(_column(raw, name))
+    out["is_latest_year"] = _text(_column(raw, "is_latest_year")).str.lower().isin(TRUE_STRINGS)
+
+    out = out[(out["country"] != "") & out["year"].notna()]
+    return out.astype({"year": "int64"}).reset_index(drop=True)
+
+
+CLEANERS = {LIFE: clean_life_frame, SUICIDE: clean_suicide_frame}
+
+
+def read_clean_chunks(kind: str, path: Path | str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a CSV in ``chunk_size`` row chunks, yielding cleaned frames.
+
+    Everything is read as text so dtype inference cannot differ between chunks;
+    the cleaners do the numeric coercion.
+    """
+    clean = CLEANERS[kind]
+    with pd.read_csv(path, dtype=str, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            cleaned = clean(chunk)
+            if len(cleaned):
+                yield cleaned
+
+
+def parse_shard(kind: str, path: Path | str, chunk_size: int) -> tuple[list[pd.DataFrame], float]:
+    """Parse and clean one CSV shard; returns (cleaned chunks, seconds spent).
+
+    Runs inside worker processes, so it must stay free of database access.
+    """
+    started = time.perf_counter()
+    frames = list(read_clean_chunks(kind, path, chunk_size))
+    return frames, time.perf_counter() - started
+
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def expand_sources(patterns: Iterable[str], base_dir: Path) -> tuple[list[Path], list[str]]:
+    """Expand files, directories (``*.csv`` inside) and glob patterns.
+
+    Returns (sorted unique paths, patterns that matched nothing).
+    """
+    paths: list[Path] = []
+    unmatched: list[str] = []
+    for pattern in patterns:
+        if GLOB_CHARS & set(pattern):
+            found = glob.glob(str(base_dir / pattern), recursive=True)
+            matches = sorted(Path(m).resolve() for m in found if Path(m).is_file())
+        else:
+            target = (base_dir / pattern).resolve()
+            if target.is_dir():
+                matches = sorted(target.glob("*.csv"))
+            else:
+                matches = [target] if target.is_file() else []
+        if not matches:
+            unmatched.append(pattern)
+        for m in matches:
+            if m not in paths:
+                paths.append(m)
+    return paths, unmatched
+
+
+def ensure_countries(names: Iterable[str], country_map: dict[str, int]) -> None:
+    """Create any missing countries and add their ids to ``country_map`` in place."""
+    missing = sorted(set(names) - country_map.keys())
+    if not missing:
+        return
+    existing = dict(Country.objects.filter(name__in=missing).values_list("name", "id"))
+    to_create = [Country(name=n, name_key=country_key(n)) for n in missing if n not in existing]
+    if to_create:
+        Country.objects.bulk_create(to_create, ignore_conflicts=True)
+        existing = dict(Country.objects.filter(name__in=missing).values_list("name", "id"))
+    country_map.update(existing)
+
+
+def stored_iso3() -> dict[int, str]:
+    """Country id -> stored ISO3 code, the ``coded`` map ``assign_iso3`` starts from."""
+    return dict(Country.objects.exclude(iso3="").values_list("id", "iso3"))
+
+
+def assign_iso3(frame: pd.DataFrame, coded: dict[int, str]) -> None:
+    """Fill ``Country.iso3`` from suicide rows' ``spatial_dim_value_code``.
+
+    ``coded`` maps country ids to their stored code and is updated in place;
+    countries whose code is already stored are not written again.
+    """
+    codes = frame.loc[frame["spatial_dim_value_code"].str.len() == 3, ["country_id", "spatial_dim_value_code"]]
+    codes = codes.drop_duplicates("country_id", keep="last")
+    countries = [
+        Country(id=int(cid), iso3=code.upper())
+        for cid, code in codes.itertuples(index=False)
+        if coded.get(int(cid)) != code.upper()
+    ]
+    if not countries:
+        return
+    Country.objects.bulk_update(countries, ["iso3"], batch_size=500)
+    coded.update((c.id, c.iso3) for c in countries)
+
+
+def _records(frame: pd.DataFrame, fields: tuple[str, ...]) -> Iterator[tuple]:
+    """Yield row tuples for ``country_id`` + fields with NaN converted to None."""
+    cols = ["country_id", *fields]
+    values = frame[cols].astype(object)
+    values = values.where(values.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def with_country_ids(frame: pd.DataFrame, country_map: dict[str, int]) -> pd.DataFrame:
+    ids = frame["country"].map(country_map)
+    frame = frame[ids.notna()].copy()
+    frame["country_id"] = ids[ids.notna()].astype("int64")
+    return frame
+
+
+def life_objects(frame: pd.DataFrame) -> list[LifeExpectancy]:
+    names = ("country_id", *LIFE_FIELDS)
+    return [LifeExpectancy(**dict(zip(names, row))) for row in _records(frame, LIFE_FIELDS)]
+
+
+def suicide_objects(frame: pd.DataFrame) -> list[SuicideMortality]:
+    names = ("country_id", *SUICIDE_FIELDS)
+    return [SuicideMortality(**dict(zip(names, row))) for row in _records(frame, SUICIDE_FIELDS)]
+
+
+# -- incremental upserts -----------------------------------------------------
+
+MODELS = {LIFE: LifeExpectancy, SUICIDE: SuicideMortality}
+FIELDS = {LIFE: LIFE_FIELDS, SUICIDE: SUICIDE_FIELDS}
+# Natural keys backing uniq_life_country_year / uniq_suicide_country_year_sex.
+NATURAL_KEYS = {LIFE: ("country_id", "year"), SUICIDE: ("country_id", "year", "sex")}
+FLOAT_FIELDS = {LIFE: LIFE_FLOAT_FIELDS, SUICIDE: SUICIDE_FLOAT_FIELDS}
+
+
+def upsert_options(kind: str) -> dict:
+    """``bulk_create`` kwargs for an ON CONFLICT DO UPDATE on the natural key."""
+    keys = NATURAL_KEYS[kind]
+    return {
+        "update_conflicts": True,
+        "unique_fields": [k.removesuffix("_id") for k in keys],
+        "update_fields": [f for f in FIELDS[kind] if f not in keys],
+    }
+
+
+def _row_hashes(frame: pd.DataFrame, kind: str) -> pd.Series:
+    """Content hash per row over every stored field, with canonical dtypes."""
+    values = frame[list(FIELDS[kind])].copy()
+    for name in FLOAT_FIELDS[kind]:
+        values[name] = values[name].astype("float64")
+    values["year"] = values["year"].astype("int64")
+    return pd.util.hash_pandas_object(values, index=False)
+
+
+def existing_hashes(kind: str, frame: pd.DataFrame) -> pd.DataFrame:
+    """Natural key + row hash for stored rows that may collide with ``frame``."""
+    keys = list(NATURAL_KEYS[kind])
+    columns = ["country_id", *FIELDS[kind]]
+    rows = list(
+        MODELS[kind].objects.filter(
+            country_id__in=frame["country_id"].unique().tolist(),
+            year__in=frame["year"].unique().tolist(),
+        ).values_list(*columns)
+    )
+    stored = pd.DataFrame(rows, columns=columns)
+    for name in FLOAT_FIELDS[kind]:
+        stored[name] = pd.to_numeric(stored[name]).astype("float64")
+    stored["year"] = stored["year"].astype("int64")
+    stored["country_id"] = stored["country_id"].astype("int64")
+    if kind == SUICIDE:
+        stored["is_latest_year"] = stored["is_latest_year"].astype(bool)
+    stored["stored_hash"] = _row_hashes(stored, kind) if len(stored) else pd.Series(dtype="uint64")
+    return stored[[*keys, "stored_hash"]]
+
+
+def diff_chunk(kind: str, frame: pd.DataFrame) -> tuple[pd.DataFrame, int, int, int]:
+    """Split a cleaned chunk (with country ids) into rows that need writing.
+
+    Returns (rows_to_write, inserted, updated, unchanged). Duplicate natural
+    keys within the chunk keep the last occurrence.
+    """
+    keys = list(NATURAL_KEYS[kind])
+    frame = frame.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+    frame["row_hash"] = _row_hashes(frame, kind)
+
+    merged = frame.merge(existing_hashes(kind, frame), on=keys, how="left")
+    is_new = merged["stored_hash"].isna()
+    is_changed = ~is_new & (merged["stored_hash"] != merged["row_hash"])
+    to_write = frame[(is_new | is_changed).to_numpy()]
+    return to_write, int(is_new.sum()), int(is_changed.sum()), int(len(frame) - is_new.sum() - is_changed.sum())
@@ -0,0 +1,151 @@
+"""Reproducible benchmarks for every API route and for ``load_who_data``.
+
+For each ``--scales`` factor (default 1, 10 and 100 times the WHO CSVs, see
+``health.benchmark.scale_csvs``) the command empties a scratch database,
+loads the data (wall time and sampled peak RSS) and times
+``--iterations`` sequential requests against every route in
+``health.urls`` through the test client. The response cache is disabled so
+each request does the real work (``--cache`` keeps it on).
+
+Nothing touches the configured database: the run uses a throwaway test
+database (a temporary file for SQLite), created and destroyed like the test
+runner does.
+
+Results go to ``--output`` as JSON. Pass an earlier file as ``--compare`` to
+fail the command when a load time, peak memory or route p50 got more than
+``--threshold`` worse:
+
+    python manage.py bench --output base.json                # on main
+    python manage.py bench --compare base.json --output new.json
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.utils import timezone
+
+from health.benchmark import LIFE_CSV, ROUTES, SUICIDE_CSV, compare, measure_load, scale_csvs, seed_ids, time_route
+
+
+class Command(BaseCommand):
+    help = "Benchmarks every API route and load_who_data at several data scales; writes JSON results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="1,10,100", help="Comma-separated data scale factors.")
+        parser.add_argument("--iterations", type=int, default=30, help="Timed requests per route.")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per route first.")
+        parser.add_argument("--route", action="append", dest="routes", help="Only this URL name (repeatable).")
+        parser.add_argument("--life", default=LIFE_CSV, help="Life expectancy CSV to scale up.")
+        parser.add_argument("--suicide", default=SUICIDE_CSV, help="Suicide rates CSV to scale up.")
+        parser.add_argument("--cache", action="store_true", help="Keep the response cache enabled.")
+        parser.add_argument("--output", default="bench-results.json", help="Where to write the JSON results.")
+        parser.add_argument("--compare", help="Earlier results file to check for regressions.")
+        parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown counted as a regression.")
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(s) for s in options["scales"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--scales must be comma-separated integers")
+        if not scales or min(scales) < 1:
+            raise CommandError("--scales must be positive integers")
+        unknown = set(options["routes"] or ()) - {route.name for route in ROUTES}
+        if unknown:
+            raise CommandError(f"Unknown route(s): {', '.join(sorted(unknown))}")
+        baseline = json.loads(Path(options["compare"]).read_text()) if options["compare"] else None
+
+        with tempfile.TemporaryDirectory() as tmp:
+            old_config = self.scratch_database(Path(tmp))
+            try:
+                results = self.benchmark(scales, Path(tmp), options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+
+        Path(options["output"]).write_text(json.dumps(results, indent=2) + "\n")
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = compare(baseline, results, options["threshold"])
+            for line in regressions:
+                self.stdout.write(f"REGRESSION {line}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
+            self.stdout.write(f"No regressions against {options['compare']} (threshold {options['threshold']:.0%})")
+
+    def scratch_database(self, tmp: Path) -> list:
+        if connection.vendor == "sqlite":
+            # A file rather than the in-memory default, so pragmas and I/O match a real deployment.
+            connection.settings_dict.setdefault("TEST", {})["NAME"] = str(tmp / "bench.sqlite3")
+        return setup_databases(verbosity=0, interactive=False, aliases={"default"})
+
+    def benchmark(self, scales: list[int], tmp: Path, options: dict[str, Any]) -> dict[str, Any]:
+        """Run every scale against the current database (emptied first); returns the results document."""
+        routes = [r for r in ROUTES if not options.get("routes") or r.name in options["routes"]]
+        results = {"meta": self.meta(options), "scales": {}}
+        for factor in scales:
+            call_command("flush", interactive=False, verbosity=0)
+            caches[settings.HEALTH_RESPONSE_CACHE].clear()
+            if factor == 1:
+                life, suicide = Path(options["life"]), Path(options["suicide"])
+            else:
+                life, suicide = scale_csvs(factor, tmp, options["life"], options["suicide"])
+            load = measure_load(life, suicide)
+            self.stdout.write(
+                f"x{factor}: load_who_data {load['seconds']:.2f}s, peak RSS {load['peak_rss_mib']:.0f} MiB "
+                f"(+{load['rss_growth_mib']:.0f}), {load['life_rows']} life / {load['suicide_rows']} suicide rows"
+            )
+
+            ids = seed_ids()
+            client = Client()
+            timings = {}
+            with override_settings(HEALTH_RESPONSE_CACHE_ENABLED=options.get("cache", False)):
+                for route in routes:
+                    stats = time_route(client, route.path.format(**ids), options["iterations"], options["warmup"])
+                    timings[route.name] = stats
+                    self.stdout.write(
+                        f"  {route.name:<26} {stats['status']}  p50={stats['p50_ms']:8.2f}ms "
+                        f"p95={stats['p95_ms']:8.2f}ms  {stats['rps']:8.1f} req/s"
+                    )
+            results["scales"][str(factor)] = {"load": load, "routes": timings}
+        return results
+
+    def meta(self, options: dict[str, Any]) -> dict[str, Any]:
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = ""
+        return {
+            "commit": commit,
+            "created": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "response_cache": bool(options.get("cache")),
+            "settings": {
+                name: getattr(settings, name, None)
+                for name in (
+                    "HEALTH_COLUMNAR_SNAPSHOT",
+                    "HEALTH_FACT_TABLE",
+                    "HEALTH_RANK_TABLE",
+                    "HEALTH_FAST_SERIALIZATION",
+                    "HEALTH_DB_PROFILE",
+                )
+            },
+        }
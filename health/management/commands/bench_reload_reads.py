@@ -0,0 +1,137 @@
+"""Measure read throughput while ``load_who_data`` reloads the database.
+
+Reader threads (each with its own database connection) request list and
+``top`` pages through the Django test client, first on an idle database and
+then while this thread reloads the data: one write transaction that empties
+the measurement tables and runs a plain ``load_who_data`` of the bundled CSVs
+scaled up ``--scale`` times (see ``health.benchmark.scale_csvs``), so every row
+and derived table is really rewritten. In rollback-journal mode the readers
+stall or fail with "database is locked" while that transaction is open; with
+``HEALTH_DB_PROFILE=production`` (WAL) they keep reading the last committed
+version.
+
+    HEALTH_DB_PROFILE=production python manage.py bench_reload_reads --readers 4 --scale 4
+
+The response cache is disabled for the run so every request reaches SQLite.
+With ``--scale`` above 1 the database keeps the scaled-up data afterwards;
+run ``load_who_data`` into a fresh database to get back to the bundled set.
+"""
+
+from __future__ import annotations
+
+import statistics
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from health.benchmark import scale_csvs
+from health.models import LifeExpectancy, SuicideMortality
+
+URLS = (
+    "/api/life-expectancy/?page={i}",
+    "/api/suicide-mortality/?page={i}",
+    "/api/life-expectancy/top/?year={year}&n=20",
+    "/api/countries/?search={letter}",
+)
+
+
+class Readers:
+    """Reader threads that record per-request latency and failures until stopped."""
+
+    def __init__(self, count: int) -> None:
+        self.stop = threading.Event()
+        self.latencies: list[float] = []
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, args=(n,), daemon=True) for n in range(count)]
+
+    def _run(self, n: int) -> None:
+        client = Client()
+        i = n
+        try:
+            while not self.stop.is_set():
+                url = URLS[i % len(URLS)].format(i=i % 20 + 1, year=2000 + i % 16, letter="aeiou"[i % 5])
+                started = time.perf_counter()
+                try:
+                    ok = client.get(url).status_code == 200
+                except Exception:  # "database is locked" surfaces as OperationalError
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    if ok:
+                        self.latencies.append(elapsed)
+                    else:
+                        self.errors += 1
+                i += 1
+        finally:
+            connections.close_all()
+
+    def __enter__(self) -> "Readers":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop.set()
+        for thread in self._threads:
+            thread.join()
+
+
+class Command(BaseCommand):
+    help = "Benchmarks concurrent API reads on an idle database and during a reload."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads.")
+        parser.add_argument("--idle-seconds", type=float, default=3.0, help="Length of the idle baseline.")
+        parser.add_argument("--scale", type=int, default=1, help="Copies of the bundled CSVs loaded by the reload.")
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        readers = max(1, options["readers"])
+        scale = max(1, options["scale"])
+        self.stdout.write(f"journal_mode={journal_mode} readers={readers} scale={scale}")
+
+        with override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False), tempfile.TemporaryDirectory() as tmp:
+            life, suicide = scale_csvs(scale, Path(tmp))
+            with Readers(readers) as idle:
+                time.sleep(options["idle_seconds"])
+            self.report("idle", idle, options["idle_seconds"])
+
+            with Readers(readers) as during:
+                started = time.perf_counter()
+                write_seconds = self.reload(life, suicide)
+                seconds = time.perf_counter() - started
+            self.report("reload", during, seconds)
+            self.stdout.write(f"write transaction {write_seconds:7.2f}s")
+
+    def reload(self, life: Path, suicide: Path) -> float:
+        """Replace every measurement row in one write transaction; returns how long it stayed open."""
+        started = time.perf_counter()
+        with transaction.atomic():
+            LifeExpectancy.objects.all().delete()
+            SuicideMortality.objects.all().delete()
+            call_command("load_who_data", life=[str(life)], suicide=[str(suicide)], stdout=StringIO())
+        return time.perf_counter() - started
+
+    def report(self, label: str, readers: Readers, seconds: float) -> None:
+        latencies = sorted(readers.latencies)
+        if latencies:
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            worst = latencies[-1] * 1000
+        else:
+            p50 = p99 = worst = 0.0
+        self.stdout.write(
+            f"{label:<7} {seconds:7.2f}s  {len(latencies) / seconds:8.1f} req/s  errors={readers.errors}  "
+            f"p50={p50:.1f}ms p99={p99:.1f}ms max={worst:.1f}ms"
+        )
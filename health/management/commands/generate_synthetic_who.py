@@ -0,0 +1,66 @@
+"""Write synthetic WHO CSVs for scale tests (see ``health.synthetic``).
+
+Distributions, null rates and correlations are fitted from the bundled
+files; the output uses exactly the schemas ``load_who_data`` reads. Millions
+of rows take seconds (pyarrow, when installed, speeds up the CSV encoding):
+
+    python manage.py generate_synthetic_who --countries 5000 --years 40 --sexes 3
+    python manage.py load_who_data --life data/synthetic/life-expectancy-synthetic.csv \\
+        --suicide data/synthetic/suicide-rates-synthetic.csv
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from health.synthetic import SEXES, fit_profile, write_synthetic
+
+
+class Command(BaseCommand):
+    help = "Generates synthetic life expectancy and suicide rate CSVs fitted to the bundled WHO files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--countries", type=int, default=1000, help="Number of countries.")
+        parser.add_argument("--years", type=int, default=16, help="Number of years per country.")
+        parser.add_argument("--end-year", type=int, default=2015, help="Last year generated.")
+        parser.add_argument(
+            "--sexes", type=int, default=3, choices=(1, 2, 3), help="1: Both sexes, 2: +Male, 3: +Female."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (same arguments, same files).")
+        parser.add_argument("--chunk-rows", type=int, default=200_000, help="Suicide rows generated per chunk.")
+        parser.add_argument("--output-dir", default="data/synthetic")
+        parser.add_argument("--life-source", default="data/life-expectancy-who.csv", help="Life CSV to fit.")
+        parser.add_argument(
+            "--suicide-source", default="data/suicide-rates-who-filtered.csv", help="Suicide CSV to fit."
+        )
+
+    def handle(self, *args, **options):
+        if options["countries"] < 1 or options["years"] < 1:
+            raise CommandError("--countries and --years must be positive")
+        for source in (options["life_source"], options["suicide_source"]):
+            if not Path(source).exists():
+                raise CommandError(f"Source CSV not found: {source}")
+
+        started = time.perf_counter()
+        profile = fit_profile(options["life_source"], options["suicide_source"])
+        years = list(range(options["end_year"] - options["years"] + 1, options["end_year"] + 1))
+        out = Path(options["output_dir"])
+        life_path = out / "life-expectancy-synthetic.csv"
+        suicide_path = out / "suicide-rates-synthetic.csv"
+        life_rows, suicide_rows = write_synthetic(
+            profile,
+            life_path,
+            suicide_path,
+            countries=options["countries"],
+            years=years,
+            sexes=SEXES[: options["sexes"]],
+            chunk_rows=max(1, options["chunk_rows"]),
+            seed=options["seed"],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Wrote {life_rows} rows to {life_path}")
+        self.stdout.write(f"Wrote {suicide_rows} rows to {suicide_path}")
+        self.stdout.write(f"{(life_rows + suicide_rows) / elapsed:,.0f} rows/s ({elapsed:.2f}s)")
@@ -3,160 +3,283 @@
 Required deliverable:
 - load and store script (bulk load)
 - performs basic cleaning and type conversion
+
+Both CSVs are streamed in ``--chunk-size`` row chunks; each chunk is cleaned
+with vectorised pandas ops (see ``health.ingest``) and written with batched
+``bulk_create`` calls, so peak memory does not grow with the file size.
+
+By default rows whose natural key already exists are left untouched
+(``ignore_conflicts``). ``--upsert`` instead diffs each chunk against the
+stored rows by content hash and writes only new or changed rows with
+``update_conflicts``, so a corrected WHO release can be applied in place.
+
+On PostgreSQL, ``--copy`` (or ``HEALTH_PG_COPY=1``) writes each chunk with
+``COPY FROM STDIN`` into a staging table and merges it with one
+``INSERT ... ON CONFLICT`` (see ``health.pgcopy``); it is off by default until
+verified against a live server. ``--no-copy`` overrides the setting.
+
+Every load ends by bumping the dataset version and rebuilding the
+CountryYearFact table (see ``health.facts``), the rank table and the region
+rollups in the same transaction. An ``--upsert`` that changes no row keeps
+the version and skips all of that; one that does change rows rebuilds only
+the touched countries' facts and the touched years' region rollups when those
+tables were current before the load. When ``HEALTH_SNAPSHOT_FILE`` is set, the
+memory-mapped snapshot file that the server workers share (see
+``health.snapshot``) is written after that transaction commits.
+
+``--life`` / ``--suicide`` accept several files, directories or glob patterns
+(per-region / per-year shards). With ``--workers N`` shards are parsed and
+cleaned in a process pool while this process stays the single writer, which
+matches SQLite's one-writer-at-a-time model.
 """
 
 from __future__ import annotations
 
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional
+from typing import Iterator, Optional
 
+import django
 import pandas as pd
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
-from health.models import Country, LifeExpectancy, SuicideMortality
+from health.ingest import (
+    LIFE,
+    SUICIDE,
+    assign_iso3,
+    diff_chunk,
+    ensure_countries,
+    expand_sources,
+    life_objects,
+    parse_shard,
+    read_clean_chunks,
+    stored_iso3,
+    suicide_objects,
+    upsert_options,
+    with_country_ids,
+)
+from health.facts import refresh_facts
+from health.pgcopy import copy_chunk, copy_enabled, copy_supported
+from health.ranks import refresh_ranks
+from health.regions import refresh_regions, region_membership
+from health.snapshot import refresh_snapshot_file
+from health.models import LifeExpectancy, SuicideMortality
+from health.versioning import DERIVED_TABLES, bump_dataset_version, current_dataset_version, derived_current
 
 
-def _to_float(v: Any) -> Optional[float]:
-    try:
-        if v is None:
-            return None
-        if isinstance(v, float) and pd.isna(v):
-            return None
-        if isinstance(v, str) and v.strip() == "":
-            return None
-        return float(v)
-    except Exception:
-        return None
+class PhaseTimer:
+    """Accumulates wall time and processed rows per named phase."""
 
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.rows: dict[str, int] = defaultdict(int)
 
-def _to_int(v: Any) -> Optional[int]:
-    try:
-        if v is None:
-            return None
-        if isinstance(v, float) and pd.isna(v):
-            return None
-        if isinstance(v, str) and v.strip() == "":
-            return None
-        return int(float(v))
-    except Exception:
-        return None
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - started
+
+    def add(self, name: str, seconds: float = 0.0, rows: int = 0) -> None:
+        self.seconds[name] += seconds
+        self.rows[name] += rows
 
 
 class Command(BaseCommand):
     help = "Loads WHO life expectancy and suicide mortality CSVs into SQLite."
 
     def add_arguments(self, parser):
-        parser.add_argument("--life", type=str, default="data/life-expectancy-who.csv")
-        parser.add_argument("--suicide", type=str, default="data/suicide-rates-who-filtered.csv")
+        parser.add_argument(
+            "--life", nargs="+", default=["data/life-expectancy-who.csv"], help="Files, directories or globs."
+        )
+        parser.add_argument(
+            "--suicide", nargs="+", default=["data/suicide-rates-who-filtered.csv"], help="Files, directories or globs."
+        )
+        parser.add_argument("--workers", type=int, default=1, help="Processes used to parse CSV shards.")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="CSV rows parsed per chunk.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk_create INSERT batch.")
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Update rows whose values changed instead of ignoring existing keys.",
+        )
+        parser.add_argument(
+            "--copy", action="store_true", help="Write with COPY on PostgreSQL (default: HEALTH_PG_COPY, off)."
+        )
+        parser.add_argument("--no-copy", action="store_true", help="Use bulk_create even if HEALTH_PG_COPY is on.")
 
-    @transaction.atomic
     def handle(self, *args, **options):
         base_dir = Path.cwd()
-        life_path = (base_dir / options["life"]).resolve()
-        suicide_path = (base_dir / options["suicide"]).resolve()
+        # call_command() callers may still pass a single path string.
+        life_sources = [options["life"]] if isinstance(options["life"], str) else options["life"]
+        suicide_sources = [options["suicide"]] if isinstance(options["suicide"], str) else options["suicide"]
+        life_paths, life_missing = expand_sources(life_sources, base_dir)
+        suicide_paths, suicide_missing = expand_sources(suicide_sources, base_dir)
+        chunk_size = max(1, options["chunk_size"])
+        batch_size = max(1, options["batch_size"])
+        workers = max(1, options["workers"])
+        upsert = options["upsert"]
+        use_copy = (copy_enabled() or (options["copy"] and copy_supported())) and not options["no_copy"]
 
-        if not life_path.exists():
-            self.stderr.write(f"Life CSV not found: {life_path}")
+        if options["copy"] and not copy_supported():
+            self.stderr.write("--copy needs PostgreSQL; loading with bulk_create instead.")
+
+        if life_missing:
+            self.stderr.write(f"Life CSV not found: {', '.join(str(base_dir / p) for p in life_missing)}")
             return
-        if not suicide_path.exists():
-            self.stderr.write(f"Suicide CSV not found: {suicide_path}")
+        if suicide_missing:
+            self.stderr.write(f"Suicide CSV not found: {', '.join(str(base_dir / p) for p in suicide_missing)}")
             return
 
-        self.stdout.write(f"Loading life dataset from: {life_path}")
-        life_df = pd.read_csv(life_path)
-        self.stdout.write(f"Loading suicide dataset from: {suicide_path}")
-        sui_df = pd.read_csv(suicide_path)
-
-        # Countries from both datasets
-        countries = set(life_df["country"].dropna().astype(str).str.strip())
-        countries |= set(sui_df["Location"].dropna().astype(str).str.strip())
-
-        existing = set(Country.objects.filter(name__in=list(countries)).values_list("name", flat=True))
-        to_create = [Country(name=name) for name in sorted(countries) if name not in existing]
-        if to_create:
-            Country.objects.bulk_create(to_create, ignore_conflicts=True)
+        timer = PhaseTimer()
+        started = time.perf_counter()
+        with transaction.atomic():
+            version = self._load_all(life_paths, suicide_paths, chunk_size, batch_size, workers, upsert, use_copy, timer)
+            if version is not None:
+                # Only once the rows are committed, so workers never map a version the database does not have yet.
+                transaction.on_commit(lambda: self._write_snapshot(version, timer))
+        if version is None:
+            version = current_dataset_version()
+            self.stdout.write("No rows changed; dataset version and derived tables left as they are.")
+        self.stdout.write(f"Dataset version: {version}")
 
-        country_map = {c.name: c for c in Country.objects.all()}
+        elapsed = time.perf_counter() - started
+        total_rows = sum(n for name, n in timer.rows.items() if name.endswith(" parse"))
+        self.stdout.write("Timing summary:")
+        for name, seconds in timer.seconds.items():
+            rows = timer.rows.get(name, 0)
+            rate = f" {rows:>10} rows {rows / seconds:12.0f} rows/s" if rows and seconds else ""
+            self.stdout.write(f"  {name:<20} {seconds:8.3f}s{rate}")
+        self.stdout.write(f"  {'total':<20} {elapsed:8.3f}s {total_rows:>10} rows {total_rows / elapsed:12.0f} rows/s")
+        self.stdout.write("Done.")
 
-        # LifeExpectancy rows
-        life_rows = []
-        for _, r in life_df.iterrows():
-            name = str(r.get("country", "")).strip()
-            c = country_map.get(name)
-            if not c:
-                continue
+    def _load_all(
+        self, life_paths, suicide_paths, chunk_size, batch_size, workers, upsert, use_copy, timer
+    ) -> Optional[str]:
+        """Write both datasets, bump the dataset version and refresh the derived tables.
 
-            year = _to_int(r.get("year"))
-            if year is None:
-                continue
+        Returns the new version, or None when an ``--upsert`` changed nothing.
+        """
+        country_map: dict[str, int] = {}
+        coded = stored_iso3()
+        # Derived tables that are current now can be patched after an upsert instead of rebuilt.
+        current = {name: derived_current(name) for name in DERIVED_TABLES} if upsert else {}
+        membership = region_membership() if current.get("regions") else None
+        touched: dict[str, set[int]] = {"countries": set(), "years": set()}
+        changed = 0
 
-            life_rows.append(
-                LifeExpectancy(
-                    country=c,
-                    year=year,
-                    status=str(r.get("status", "") or "").strip(),
-                    life_expectancy=_to_float(r.get("life_expectancy")),
-                    adult_mortality=_to_float(r.get("adult_mortality")),
-                    infant_deaths=_to_float(r.get("infant_deaths")),
-                    alcohol=_to_float(r.get("alcohol")),
-                    percentage_expenditure=_to_float(r.get("percentage_expenditure")),
-                    hepatitis_b=_to_float(r.get("hepatitis_b")),
-                    measles=_to_float(r.get("measles")),
-                    bmi=_to_float(r.get("bmi")),
-                    under_five_deaths=_to_float(r.get("under_five_deaths")),
-                    polio=_to_float(r.get("polio")),
-                    total_expenditure=_to_float(r.get("total_expenditure")),
-                    diphtheria=_to_float(r.get("diphtheria")),
-                    hiv_aids=_to_float(r.get("hiv_aids")),
-                    gdp=_to_float(r.get("gdp")),
-                    population=_to_float(r.get("population")),
-                    thinness_1_19_years=_to_float(r.get("thinness_1_19_years")),
-                    thinness_5_9_years=_to_float(r.get("thinness_5_9_years")),
-                    income_composition_of_resources=_to_float(r.get("income_composition_of_resources")),
-                    schooling=_to_float(r.get("schooling")),
-                )
+        datasets = [
+            (LIFE, life_paths, LifeExpectancy, life_objects),
+            (SUICIDE, suicide_paths, SuicideMortality, suicide_objects),
+        ]
+        for kind, paths, model, build in datasets:
+            for path in paths:
+                self.stdout.write(f"Loading {kind} dataset from: {path}")
+            chunks = self._cleaned_chunks(kind, paths, chunk_size, workers, timer)
+            counts = self._load(
+                kind, chunks, model, build, batch_size, upsert, use_copy, country_map, coded, touched, timer
             )
+            name = model.__name__
+            if upsert:
+                changed += counts["inserted"] + counts["updated"]
+                self.stdout.write(
+                    f"{name}: inserted={counts['inserted']} updated={counts['updated']} unchanged={counts['unchanged']}"
+                )
+            else:
+                self.stdout.write(f"Inserted {name} rows: {counts['rows']} (duplicates ignored)")
 
-        if life_rows:
-            LifeExpectancy.objects.bulk_create(life_rows, ignore_conflicts=True)
-        self.stdout.write(f"Inserted LifeExpectancy rows: {len(life_rows)} (duplicates ignored)")
+        if upsert and not changed:
+            return None
+        version = bump_dataset_version()
+        # After an upsert only the touched countries' facts and the touched years' region rollups are
+        # rebuilt (all years if a country changed region). Ranks are always rebuilt: percentiles span every year.
+        countries = touched["countries"] if current.get("facts") else None
+        years = touched["years"] if membership is not None and region_membership() == membership else None
+        with timer.phase("facts"):
+            facts = refresh_facts(version, batch_size, countries)
+        timer.add("facts", rows=facts)
+        with timer.phase("ranks"):
+            ranks = refresh_ranks(version)
+        timer.add("ranks", rows=ranks)
+        with timer.phase("regions"):
+            regions = refresh_regions(version, batch_size, years)
+        timer.add("regions", rows=regions)
+        return version
 
-        # SuicideMortality rows
-        sui_rows = []
-        for _, r in sui_df.iterrows():
-            name = str(r.get("Location", "")).strip()
-            c = country_map.get(name)
-            if not c:
-                continue
+    def _write_snapshot(self, version: str, timer: PhaseTimer) -> None:
+        with timer.phase("snapshot"):
+            path = refresh_snapshot_file(version)
+        if path is not None:
+            self.stdout.write(f"Snapshot file: {path}")
 
-            year = _to_int(r.get("Period"))
-            if year is None:
-                continue
+    def _cleaned_chunks(self, kind, paths, chunk_size, workers, timer) -> Iterator[pd.DataFrame]:
+        """Yield cleaned chunks for every shard, in shard order."""
+        if workers == 1 or len(paths) == 1:
+            for path in paths:
+                chunks = read_clean_chunks(kind, path, chunk_size)
+                while True:
+                    with timer.phase(f"{kind} parse"):
+                        frame = next(chunks, None)
+                    if frame is None:
+                        break
+                    timer.add(f"{kind} parse", rows=len(frame))
+                    yield frame
+            return
 
-            sex = str(r.get("Dim1", "") or "").strip()
-
-            sui_rows.append(
-                SuicideMortality(
-                    country=c,
-                    indicator_code=str(r.get("IndicatorCode", "") or "").strip(),
-                    indicator=str(r.get("Indicator", "") or "").strip(),
-                    parent_location_code=str(r.get("ParentLocationCode", "") or "").strip(),
-                    parent_location=str(r.get("ParentLocation", "") or "").strip(),
-                    spatial_dim_value_code=str(r.get("SpatialDimValueCode", "") or "").strip(),
-                    year=year,
-                    sex=sex,
-                    rate=_to_float(r.get("FactValueNumeric")),
-                    rate_low=_to_float(r.get("FactValueNumericLow")),
-                    rate_high=_to_float(r.get("FactValueNumericHigh")),
-                    value_text=str(r.get("Value", "") or "").strip(),
-                    is_latest_year=str(r.get("IsLatestYear", "") or "").strip().lower() in ("true", "1", "yes"),
-                    date_modified=str(r.get("DateModified", "") or "").strip(),
-                )
-            )
+        # Keep a bounded window of shards in flight so parsed-but-unwritten
+        # frames cannot pile up when the writer is the bottleneck.
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            queue = deque(paths)
+            pending = deque()
+            while queue or pending:
+                while queue and len(pending) < workers * 2:
+                    pending.append(pool.submit(parse_shard, kind, queue.popleft(), chunk_size))
+                with timer.phase(f"{kind} parse wait"):
+                    frames, seconds = pending.popleft().result()
+                # Worker-side seconds are summed across processes (CPU time spent parsing).
+                timer.add(f"{kind} parse", seconds=seconds, rows=sum(len(f) for f in frames))
+                yield from frames
 
-        if sui_rows:
-            SuicideMortality.objects.bulk_create(sui_rows, ignore_conflicts=True)
-        self.stdout.write(f"Inserted SuicideMortality rows: {len(sui_rows)} (duplicates ignored)")
+    def _load(
+        self, kind, chunks, model, build, batch_size, upsert, use_copy, country_map, coded, touched, timer
+    ) -> dict[str, int]:
+        counts = {"rows": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+        for frame in chunks:
+            with timer.phase("countries"):
+                ensure_countries(frame["country"].unique(), country_map)
+                frame = with_country_ids(frame, country_map)
+                if kind == SUICIDE:
+                    assign_iso3(frame, coded)
+            timer.add("countries", rows=len(frame))
+            counts["rows"] += len(frame)
 
-        self.stdout.write("Done.")
+            if not upsert:
+                with timer.phase(f"{kind} insert"):
+                    if use_copy:
+                        copy_chunk(kind, frame)
+                    else:
+                        model.objects.bulk_create(build(frame), batch_size=batch_size, ignore_conflicts=True)
+                timer.add(f"{kind} insert", rows=len(frame))
+                continue
+
+            with timer.phase(f"{kind} diff"):
+                to_write, inserted, updated, unchanged = diff_chunk(kind, frame)
+            with timer.phase(f"{kind} upsert"):
+                if use_copy:
+                    copy_chunk(kind, to_write, update=True)
+                elif len(to_write):
+                    model.objects.bulk_create(build(to_write), batch_size=batch_size, **upsert_options(kind))
+            touched["countries"].update(to_write["country_id"].tolist())
+            touched["years"].update(to_write["year"].tolist())
+            timer.add(f"{kind} diff", rows=len(frame))
+            timer.add(f"{kind} upsert", rows=len(to_write))
+            counts["inserted"] += inserted
+            counts["updated"] += updated
+            counts["unchanged"] += unchanged
+        return counts
@@ -0,0 +1,100 @@
+"""Closed-loop HTTP load test for the insights endpoints.
+
+``--concurrency`` clients each send one request at a time for
+``--duration`` seconds against a running server and the command reports
+throughput and latency percentiles. The client is plain ``asyncio`` streams
+(no extra dependency). Every request carries a unique ``_`` query parameter
+so the response cache does not answer it.
+
+Compare the async views under uvicorn with the sync ones (same server, so
+only the views differ), e.g.:
+
+    export HEALTH_COLUMNAR_SNAPSHOT=0 HEALTH_FACT_TABLE=0   # exercise the query paths
+    uvicorn config.asgi:application --port 8001
+    HEALTH_ASYNC_VIEWS=0 uvicorn config.asgi:application --port 8002
+    python manage.py loadtest --base-url http://127.0.0.1:8001 --concurrency 64
+    python manage.py loadtest --base-url http://127.0.0.1:8002 --concurrency 64
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+PATHS = (
+    "/api/insights/country-summary/?country=Japan&year=2014",
+    "/api/insights/country-timeline/?country=Brazil&year_min=2000&year_max=2015",
+    "/api/insights/risk-flags/?year=2015&min_life=75&min_suicide=8",
+    "/api/insights/correlation/?year_min=2005&year_max=2015",
+)
+
+
+async def fetch(host: str, port: int, path: str) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()  # headers + body until the server closes
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = "Load-tests the insights endpoints of a running server (closed loop, fixed concurrency)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+        parser.add_argument("--path", action="append", dest="paths", help="Path to request (repeatable).")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["base_url"])
+        if url.scheme != "http" or not url.hostname:
+            raise CommandError("--base-url must be http://host[:port]")
+        paths = options["paths"] or list(PATHS)
+        latencies, errors, elapsed = asyncio.run(
+            self.run(url.hostname, url.port or 80, paths, max(1, options["concurrency"]), options["duration"])
+        )
+        if not latencies:
+            raise CommandError(f"No successful requests ({errors} errors)")
+        latencies.sort()
+        pct = lambda q: latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000  # noqa: E731
+        self.stdout.write(
+            f"{options['base_url']} concurrency={options['concurrency']}: {len(latencies)} ok, {errors} errors, "
+            f"{len(latencies) / elapsed:.1f} req/s, p50={statistics.median(latencies) * 1000:.1f}ms "
+            f"p95={pct(0.95):.1f}ms p99={pct(0.99):.1f}ms"
+        )
+
+    async def run(self, host, port, paths, concurrency, duration):
+        latencies: list[float] = []
+        errors = 0
+        counter = itertools.count()
+        deadline = time.perf_counter() + duration
+
+        async def client(n: int) -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                i = next(counter)
+                path = paths[i % len(paths)]
+                path += f"{'&' if '?' in path else '?'}_={i}"
+                started = time.perf_counter()
+                try:
+                    ok = await fetch(host, port, path) == 200
+                except (OSError, ValueError, IndexError):
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(n) for n in range(concurrency)))
+        return latencies, errors, time.perf_counter() - started
@@ -0,0 +1,37 @@
+"""Rebuild the CountryYearFact, LifeExpectancyRank and RegionYearAggregate tables (and the snapshot file).
+
+``load_who_data`` already does this after every load; run it by hand after
+editing rows through the admin or the ORM (edits mark the tables stale and
+the views fall back to the base tables until the next rebuild).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from health.facts import refresh_facts
+from health.ranks import refresh_ranks
+from health.regions import refresh_regions
+from health.snapshot import refresh_snapshot_file
+from health.versioning import INITIAL_VERSION, bump_dataset_version, current_dataset_version, reset_dataset_version_cache
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the denormalised country-year fact table, the life-expectancy rank table and the region rollups."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        reset_dataset_version_cache()
+        version = current_dataset_version()
+        if version == INITIAL_VERSION:
+            version = bump_dataset_version()
+        rows = refresh_facts(version)
+        ranks = refresh_ranks(version)
+        regions = refresh_regions(version)
+        # Immediate under autocommit; deferred to the commit when called inside a transaction.
+        transaction.on_commit(lambda: refresh_snapshot_file(version))
+        self.stdout.write(
+            f"Built {rows} country-year facts, {ranks} ranks and {regions} region rollups for dataset version {version} "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
@@ -0,0 +1,209 @@
+"""Per-request performance instrumentation.
+
+``PerformanceMiddleware`` measures each request's wall time, database query
+count and time (an execute wrapper on every connection), JSON serialization
+time (reported by ``ORJSONRenderer``) and response size. It adds them to the
+response as a ``Server-Timing`` header and aggregates them per URL name
+(``country-summary``, ``life-expectancy-list``, ...) into latency histograms
+that ``/api/metrics/`` exposes in the Prometheus text format.
+
+With ``HEALTH_METRICS_ENABLED`` off at startup the middleware raises
+``MiddlewareNotUsed`` and no query wrapper is installed, so the only cost
+left is one ``ContextVar.get()`` per rendered response.
+
+Metrics are kept per process; scrape every worker.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_enabled() -> bool:
+    return bool(getattr(settings, "HEALTH_METRICS_ENABLED", True))
+
+
+@dataclass
+class RequestStats:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("health_request_stats", default=None)
+
+
+def record_serialization(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+def _record_query(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _wrap_connection(sender: Any = None, connection: Any = None, **kwargs: Any) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_recorder() -> None:
+    """Wrap this thread's open connections and every connection opened later (any thread)."""
+    connection_created.connect(_wrap_connection, dispatch_uid="health_metrics_query_recorder")
+    for conn in connections.all(initialized_only=True):
+        _wrap_connection(connection=conn)
+
+
+class Registry:
+    """Thread-safe per-view aggregates rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: dict[tuple[str, str, str], int] = {}
+            self.buckets: dict[tuple[str, str], list[int]] = {}
+            self.sums: dict[str, dict[tuple[str, str], float]] = {
+                name: {} for name in ("duration", "db", "queries", "serialize", "bytes")
+            }
+
+    def observe(self, view: str, method: str, status: int, seconds: float, stats: RequestStats, size: int) -> None:
+        key = (view, method)
+        with self._lock:
+            self.requests[(view, method, str(status))] = self.requests.get((view, method, str(status)), 0) + 1
+            counts = self.buckets.setdefault(key, [0] * len(BUCKETS))
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    counts[i] += 1
+            for name, value in (
+                ("duration", seconds),
+                ("db", stats.db_seconds),
+                ("queries", stats.queries),
+                ("serialize", stats.serialize_seconds),
+                ("bytes", size),
+            ):
+                self.sums[name][key] = self.sums[name].get(key, 0) + value
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP health_requests_total Requests by URL name, method and status.",
+                "# TYPE health_requests_total counter",
+            ]
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(f'health_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+
+            lines += [
+                "# HELP health_request_duration_seconds Request wall time by URL name.",
+                "# TYPE health_request_duration_seconds histogram",
+            ]
+            for (view, method), counts in sorted(self.buckets.items()):
+                labels = f'view="{view}",method="{method}"'
+                for bound, count in zip(BUCKETS, counts):
+                    lines.append(f'health_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                total = sum(c for (v, m, _), c in self.requests.items() if (v, m) == (view, method))
+                lines.append(f'health_request_duration_seconds_bucket{{{labels},le="+Inf"}} {total}')
+                lines.append(f"health_request_duration_seconds_sum{{{labels}}} {self.sums['duration'][(view, method)]:.6f}")
+                lines.append(f"health_request_duration_seconds_count{{{labels}}} {total}")
+
+            for name, metric, kind, help_text in (
+                ("db", "health_db_duration_seconds_total", "counter", "Time spent executing SQL."),
+                ("queries", "health_db_queries_total", "counter", "SQL statements executed."),
+                ("serialize", "health_serialize_duration_seconds_total", "counter", "Time spent rendering JSON."),
+                ("bytes", "health_response_bytes_total", "counter", "Response body bytes (non-streaming)."),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+                for (view, method), value in sorted(self.sums[name].items()):
+                    lines.append(f'{metric}{{view="{view}",method="{method}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _view_name(request: HttpRequest) -> str:
+    match = getattr(request, "resolver_match", None)
+    return (match.url_name or match.view_name or "unnamed") if match else "unmatched"
+
+
+def _server_timing(total: float, stats: RequestStats) -> str:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+        f"serialize;dur={stats.serialize_seconds * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    )
+
+
+class PerformanceMiddleware:
+    """Server-Timing headers plus per-URL-name aggregates for /api/metrics/ (sync and async)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not metrics_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install_query_recorder()
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.is_async:
+            return self._acall(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    async def _acall(self, request: HttpRequest) -> HttpResponse:
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats)
+
+    def finish(self, request: HttpRequest, response: HttpResponse, stats: RequestStats) -> HttpResponse:
+        total = time.perf_counter() - stats.started
+        size = 0 if response.streaming else len(response.content)
+        response["Server-Timing"] = _server_timing(total, stats)
+        registry.observe(_view_name(request), request.method or "", response.status_code, total, stats, size)
+        return response
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Prometheus text exposition of the aggregates collected by PerformanceMiddleware."""
+    return HttpResponse(registry.render() if metrics_enabled() else "", content_type=CONTENT_TYPE)
@@ -0,0 +1,21 @@
+# Generated manually: adds the dataset version stamp used for cache invalidation.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatasetVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("token", models.CharField(max_length=32)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
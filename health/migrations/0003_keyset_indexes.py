@@ -0,0 +1,21 @@
+# Generated manually: composite indexes backing keyset pagination.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0002_datasetversion"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lifeexpectancy",
+            index=models.Index(fields=["country", "year", "id"], name="life_keyset_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="suicidemortality",
+            index=models.Index(fields=["country", "year", "sex", "id"], name="suicide_keyset_idx"),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated manually: normalised name key and ISO3 code for country lookups.
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _key(name):
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[^0-9a-z]", "", stripped.casefold())
+
+
+def populate(apps, schema_editor):
+    Country = apps.get_model("health", "Country")
+    SuicideMortality = apps.get_model("health", "SuicideMortality")
+    codes = {}
+    # Newest year first, so the first code seen per country is its latest one.
+    for country_id, code in (
+        SuicideMortality.objects.exclude(spatial_dim_value_code="")
+        .order_by("country_id", "-year")
+        .values_list("country_id", "spatial_dim_value_code")
+    ):
+        code = code.strip()
+        if len(code) == 3:
+            codes.setdefault(country_id, code.upper())
+    countries = list(Country.objects.all())
+    for country in countries:
+        country.name_key = _key(country.name)
+        country.iso3 = codes.get(country.id, "")
+    Country.objects.bulk_update(countries, ["name_key", "iso3"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0003_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="country",
+            name="name_key",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=120),
+        ),
+        migrations.AddField(
+            model_name="country",
+            name="iso3",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=3),
+        ),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
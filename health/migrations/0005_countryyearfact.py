@@ -0,0 +1,50 @@
+# Generated manually: denormalised country-year fact table.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0004_country_lookup_keys"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetversion",
+            name="facts_version",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+        migrations.CreateModel(
+            name="CountryYearFact",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("year", models.PositiveIntegerField()),
+                ("sex", models.CharField(blank=True, default="", max_length=40)),
+                ("life_expectancy", models.FloatField(blank=True, null=True)),
+                ("status", models.CharField(blank=True, default="", max_length=32)),
+                ("rate", models.FloatField(blank=True, null=True)),
+                ("rate_low", models.FloatField(blank=True, null=True)),
+                ("rate_high", models.FloatField(blank=True, null=True)),
+                ("parent_location", models.CharField(blank=True, default="", max_length=120)),
+                (
+                    "country",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="facts", to="health.country"
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("country", "year", "sex"), name="uniq_fact_country_year_sex")
+                ],
+                "indexes": [
+                    models.Index(fields=["year", "sex", "life_expectancy", "rate", "country"], name="fact_year_sex_idx"),
+                    models.Index(
+                        fields=["country", "sex", "year", "life_expectancy", "rate"], name="fact_country_sex_year_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated manually: precomputed life-expectancy rankings.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0005_countryyearfact"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetversion",
+            name="ranks_version",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+        migrations.CreateModel(
+            name="LifeExpectancyRank",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("metric", models.CharField(max_length=40)),
+                ("year", models.PositiveIntegerField()),
+                ("status", models.CharField(blank=True, default="", max_length=32)),
+                ("value", models.FloatField()),
+                ("year_rank", models.PositiveIntegerField()),
+                ("year_total", models.PositiveIntegerField()),
+                ("status_rank", models.PositiveIntegerField()),
+                ("status_total", models.PositiveIntegerField()),
+                ("percentile", models.FloatField()),
+                (
+                    "country",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="life_ranks", to="health.country"
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("metric", "year", "country"), name="uniq_rank_metric_year_country")
+                ],
+                "indexes": [
+                    models.Index(fields=["metric", "year", "year_rank"], name="rank_year_idx"),
+                    models.Index(fields=["metric", "year", "status", "status_rank"], name="rank_status_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated manually: PostgreSQL-only BRIN and trigram indexes (no-op on SQLite).
+
+from django.db import migrations
+
+# icontains on Postgres compiles to UPPER("name"::text) LIKE UPPER(%s), so the
+# trigram index is on that expression.
+FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    'CREATE INDEX IF NOT EXISTS country_name_trgm_idx ON "health_country" USING gin (UPPER("name"::text) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS life_year_brin_idx ON "health_lifeexpectancy" USING brin ("year")',
+    'CREATE INDEX IF NOT EXISTS suicide_year_brin_idx ON "health_suicidemortality" USING brin ("year")',
+]
+BACKWARD = [
+    "DROP INDEX IF EXISTS suicide_year_brin_idx",
+    "DROP INDEX IF EXISTS life_year_brin_idx",
+    "DROP INDEX IF EXISTS country_name_trgm_idx",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0006_lifeexpectancyrank"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD), _run(BACKWARD)),
+    ]
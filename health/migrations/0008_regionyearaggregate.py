@@ -0,0 +1,59 @@
+# Generated manually: precomputed WHO region rollups.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("health", "0007_postgres_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetversion",
+            name="regions_version",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+        migrations.CreateModel(
+            name="RegionYearAggregate",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("region_code", models.CharField(max_length=40)),
+                ("region", models.CharField(max_length=120)),
+                ("year", models.PositiveIntegerField()),
+                ("sex", models.CharField(blank=True, default="", max_length=40)),
+                ("metric", models.CharField(max_length=40)),
+                ("countries", models.PositiveIntegerField()),
+                ("mean", models.FloatField()),
+                ("median", models.FloatField()),
+                ("weighted_mean", models.FloatField(blank=True, null=True)),
+                ("weighted_countries", models.PositiveIntegerField()),
+                ("min_value", models.FloatField()),
+                ("max_value", models.FloatField()),
+                (
+                    "min_country",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="health.country"
+                    ),
+                ),
+                (
+                    "max_country",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="+", to="health.country"
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("metric", "sex", "region_code", "year"), name="uniq_region_metric_sex_code_year"
+                    )
+                ],
+                "indexes": [
+                    models.Index(fields=["metric", "sex", "year"], name="region_metric_year_idx"),
+                ],
+            },
+        ),
+    ]
@@ -4,18 +4,41 @@ The data model is intentionally small and relational:
 - Country is shared by both datasets
 - LifeExpectancy and SuicideMortality store the two CSVs
 - Note is a simple CRUD model to demonstrate POST/PUT/PATCH/DELETE
+- DatasetVersion stamps each (re)load so derived caches know when to rebuild
+- CountryYearFact is a denormalised join of both datasets for the insights views
+- LifeExpectancyRank holds precomputed per-year ranks for the top-N endpoint
+- RegionYearAggregate holds precomputed per-region, per-year rollups
 """
 
 from __future__ import annotations
 
+import re
+import unicodedata
+
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 
+def country_key(name: str) -> str:
+    """Normalised lookup key: accents stripped, casefolded, letters/digits only.
+
+    "Côte d'Ivoire" and "Cote d'Ivoire" share a key, as do "Viet Nam" and "Vietnam".
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[^0-9a-z]", "", stripped.casefold())
+
+
 class Country(models.Model):
     """Country/Location dimension used across datasets."""
 
     name = models.CharField(max_length=120, unique=True, db_index=True)
+    name_key = models.CharField(max_length=120, blank=True, default="", db_index=True)
+    iso3 = models.CharField(max_length=3, blank=True, default="", db_index=True)
+
+    def save(self, *args, **kwargs):
+        self.name_key = country_key(self.name)
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:  # pragma: no cover
         return self.name
@@ -55,6 +78,8 @@ class LifeExpectancy(models.Model):
         indexes = [
             models.Index(fields=["year"]),
             models.Index(fields=["status"]),
+            # Keyset pagination walks (country, year, id) in order.
+            models.Index(fields=["country", "year", "id"], name="life_keyset_idx"),
         ]
 
     def __str__(self) -> str:  # pragma: no cover
@@ -91,6 +116,8 @@ class SuicideMortality(models.Model):
         indexes = [
             models.Index(fields=["year"]),
             models.Index(fields=["sex"]),
+            # Keyset pagination walks (country, year, sex, id) in order.
+            models.Index(fields=["country", "year", "sex", "id"], name="suicide_keyset_idx"),
         ]
 
     def __str__(self) -> str:  # pragma: no cover
@@ -107,3 +134,129 @@ class Note(models.Model):
 
     def __str__(self) -> str:  # pragma: no cover
         return self.title
+
+
+class DatasetVersion(models.Model):
+    """Single-row stamp that changes whenever the WHO datasets change.
+
+    ``load_who_data`` writes a fresh token after each load; in-process caches
+    (e.g. the columnar snapshot) compare tokens to decide when to rebuild.
+    ``facts_version`` / ``ranks_version`` / ``regions_version`` are the tokens
+    CountryYearFact, LifeExpectancyRank and RegionYearAggregate were last
+    built from.
+    """
+
+    token = models.CharField(max_length=32)
+    facts_version = models.CharField(max_length=32, blank=True, default="")
+    ranks_version = models.CharField(max_length=32, blank=True, default="")
+    regions_version = models.CharField(max_length=32, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.token
+
+
+class CountryYearFact(models.Model):
+    """One row per (country, year, sex): life expectancy joined with the suicide rate.
+
+    Built by ``refresh_facts`` / ``load_who_data`` from both datasets. Every
+    country-year present in either dataset gets a row for each sex seen in
+    the suicide data, so life values are repeated per sex and missing sides
+    are NULL.
+    """
+
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name="facts")
+    year = models.PositiveIntegerField()
+    sex = models.CharField(max_length=40, blank=True, default="")
+
+    life_expectancy = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=32, blank=True, default="")
+    rate = models.FloatField(null=True, blank=True)
+    rate_low = models.FloatField(null=True, blank=True)
+    rate_high = models.FloatField(null=True, blank=True)
+    parent_location = models.CharField(max_length=120, blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["country", "year", "sex"], name="uniq_fact_country_year_sex")
+        ]
+        indexes = [
+            # Trailing value columns make these covering for risk-flags and timelines.
+            models.Index(fields=["year", "sex", "life_expectancy", "rate", "country"], name="fact_year_sex_idx"),
+            models.Index(fields=["country", "sex", "year", "life_expectancy", "rate"], name="fact_country_sex_year_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.country_id} ({self.year}, {self.sex})"
+
+
+class LifeExpectancyRank(models.Model):
+    """Precomputed rank of one country's value for one LifeExpectancy metric and year.
+
+    Dense ranks are descending (1 = highest value) within the year and within
+    year + status; ``percentile`` is the share of all years' values that are
+    <= this one. NULL values are not ranked.
+    """
+
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name="life_ranks")
+    metric = models.CharField(max_length=40)
+    year = models.PositiveIntegerField()
+    status = models.CharField(max_length=32, blank=True, default="")
+    value = models.FloatField()
+
+    year_rank = models.PositiveIntegerField()
+    year_total = models.PositiveIntegerField()
+    status_rank = models.PositiveIntegerField()
+    status_total = models.PositiveIntegerField()
+    percentile = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["metric", "year", "country"], name="uniq_rank_metric_year_country")
+        ]
+        indexes = [
+            models.Index(fields=["metric", "year", "year_rank"], name="rank_year_idx"),
+            models.Index(fields=["metric", "year", "status", "status_rank"], name="rank_status_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.metric} {self.year} #{self.year_rank}"
+
+
+class RegionYearAggregate(models.Model):
+    """Precomputed aggregate of one metric over the countries of a WHO region in one year.
+
+    Regions are the suicide dataset's parent locations. Life expectancy
+    metrics have ``sex=""``; suicide rate columns have one row per sex.
+    ``weighted_mean`` weights each country by its ``LifeExpectancy.population``
+    for that year (countries without a population are left out of it).
+    """
+
+    region_code = models.CharField(max_length=40)
+    region = models.CharField(max_length=120)
+    year = models.PositiveIntegerField()
+    sex = models.CharField(max_length=40, blank=True, default="")
+    metric = models.CharField(max_length=40)
+
+    countries = models.PositiveIntegerField()
+    mean = models.FloatField()
+    median = models.FloatField()
+    weighted_mean = models.FloatField(null=True, blank=True)
+    weighted_countries = models.PositiveIntegerField()
+    min_value = models.FloatField()
+    min_country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name="+")
+    max_value = models.FloatField()
+    max_country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "sex", "region_code", "year"], name="uniq_region_metric_sex_code_year"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["metric", "sex", "year"], name="region_metric_year_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.region_code} {self.metric} {self.year}"
@@ -0,0 +1,124 @@
+"""Pagination classes.
+
+The default contract stays DRF's page-number pagination (``?page=N`` with
+``count``/``next``/``previous``). Clients paging through a whole table can opt
+into keyset pagination with ``?pagination=keyset``: pages are fetched with a
+``WHERE key > last_key ORDER BY key LIMIT n`` query instead of ``COUNT(*)`` +
+``OFFSET``, so deep pages cost the same as the first one. The key is the
+view's ``keyset_ordering`` (e.g. country id, year, sex, id), which must end
+in a unique column and match a composite index so the cursor predicate is an
+index seek. Keyset pages therefore come in key order, not the page-number
+order (country name), and ``?ordering=`` is rejected with a 400.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Optional, Sequence
+
+from django.db.models import CharField, Model, Q, QuerySet, TextField
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def key_types(model: type[Model], fields: Sequence[str]) -> tuple[type, ...]:
+    """The JSON type each key column round-trips as: ``str`` for text, ``int`` otherwise."""
+    return tuple(str if isinstance(model._meta.get_field(f), (CharField, TextField)) else int for f in fields)
+
+
+def decode_cursor(token: str, types: Sequence[type]) -> list[Any]:
+    """Decode a cursor, checking it has one value of the right type per key column."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise NotFound("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise NotFound("Invalid cursor")
+    # bool is an int subclass; a forged ``true`` is no more a key than ``null`` or ``"abc"``.
+    if any(type(value) is not expected for value, expected in zip(values, types)):
+        raise NotFound("Invalid cursor")
+    return values
+
+
+def keyset_filter(fields: Sequence[str], values: Sequence[Any]) -> Q:
+    """Rows strictly after ``values`` in ascending ``fields`` order (row-value comparison).
+
+    The redundant leading ``>=`` bound lets the planner seek into the index on
+    the first key column instead of scanning from the start.
+    """
+    condition = Q()
+    for i, field in enumerate(fields):
+        step = Q(**{f"{field}__gt": values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev_field: prev_value})
+        condition |= step
+    return Q(**{f"{fields[0]}__gte": values[0]}) & condition
+
+
+def row_key(row: Any, fields: Sequence[str]) -> list[Any]:
+    """Read the key values from a model instance or a ``.values()`` dict."""
+    if isinstance(row, dict):
+        return [row[f] for f in fields]
+    key = []
+    for field in fields:
+        value = row
+        for part in field.split("__"):
+            value = getattr(value, part)
+        key.append(value)
+    return key
+
+
+class KeysetOrPageNumberPagination(PageNumberPagination):
+    """Page-number pagination, or keyset pagination when the client opts in."""
+
+    keyset_query_param = "pagination"
+    keyset_query_value = "keyset"
+    cursor_query_param = "cursor"
+
+    def use_keyset(self, request: Request) -> bool:
+        params = request.query_params
+        return params.get(self.keyset_query_param) == self.keyset_query_value or self.cursor_query_param in params
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> Optional[list]:
+        self.keyset = view is not None and hasattr(view, "keyset_ordering") and self.use_keyset(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        if request.query_params.get("ordering"):
+            raise ValidationError({"ordering": "not supported with keyset pagination (pages follow the key order)"})
+        fields = tuple(view.keyset_ordering)
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*fields)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(keyset_filter(fields, decode_cursor(token, key_types(queryset.model, fields))))
+
+        rows = list(queryset[: page_size + 1])
+        self.next_cursor = encode_cursor(row_key(rows[page_size - 1], fields)) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        url = replace_query_param(url, self.keyset_query_param, self.keyset_query_value)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
@@ -0,0 +1,79 @@
+"""``COPY FROM STDIN`` bulk writes for PostgreSQL.
+
+On Postgres the loader streams each cleaned chunk as CSV into a temporary
+staging table with ``COPY`` and moves it into the real table with one
+``INSERT ... SELECT ... ON CONFLICT``, instead of building model instances
+and parameterised multi-row INSERTs via ``bulk_create``. Conflict handling
+matches the ORM path: ``DO NOTHING`` for plain loads, ``DO UPDATE`` on the
+natural key for ``--upsert``.
+
+Works with psycopg 3 (``cursor.copy``) and psycopg2 (``copy_expert``).
+
+Opt-in (``HEALTH_PG_COPY=1`` or ``load_who_data --copy``) until it has been
+run against a live PostgreSQL server; ``bulk_create`` is the default there too.
+"""
+
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+
+from .ingest import FIELDS, MODELS, NATURAL_KEYS
+
+NULL = r"\N"
+
+
+def copy_supported() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def copy_enabled() -> bool:
+    """Whether loads use COPY without ``--copy``: off unless ``HEALTH_PG_COPY`` is set (PostgreSQL only)."""
+    return copy_supported() and bool(getattr(settings, "HEALTH_PG_COPY", False))
+
+
+def _copy(cursor, sql: str, buffer: io.StringIO) -> None:
+    raw = cursor.cursor
+    if hasattr(raw, "copy"):  # psycopg 3
+        with raw.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+    else:  # psycopg2
+        raw.copy_expert(sql, buffer)
+
+
+def copy_chunk(kind: str, frame: pd.DataFrame, update: bool = False) -> int:
+    """Write a cleaned chunk (with ``country_id``) to its table; returns rows sent."""
+    if not len(frame):
+        return 0
+    qn = connection.ops.quote_name
+    table = qn(MODELS[kind]._meta.db_table)
+    staging = qn(f"{MODELS[kind]._meta.db_table}_staging")
+    keys = NATURAL_KEYS[kind]
+    names = ["country_id", *FIELDS[kind]]
+    columns = ", ".join(qn(name) for name in names)
+
+    buffer = io.StringIO()
+    frame[names].to_csv(buffer, header=False, index=False, na_rep=NULL)
+    buffer.seek(0)
+
+    if update:
+        updates = ", ".join(f"{qn(name)} = EXCLUDED.{qn(name)}" for name in names if name not in keys)
+        conflict = f"DO UPDATE SET {updates}"
+    else:
+        conflict = "DO NOTHING"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Column types only (no id, defaults or constraints); dropped with the load transaction.
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        cursor.execute(f"TRUNCATE {staging}")
+        _copy(cursor, f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", buffer)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+            f"ON CONFLICT ({', '.join(qn(k) for k in keys)}) {conflict}"
+        )
+    return len(frame)
@@ -0,0 +1,223 @@
+"""Precomputed life-expectancy rankings.
+
+``LifeExpectancyRank`` holds one row per (metric, year, country) for every
+float column on ``LifeExpectancy`` with the dense rank within the year, the
+dense rank within year + status and the percentile over all years. It is
+built next to the fact table, so ``/life-expectancy/top/`` answers top-N,
+bottom-N and rank-of-country lookups with one index range scan or one unique
+index probe instead of sorting the year on every request.
+
+Like the facts, the table is stamped with the dataset version it was built
+from; while it is stale the view computes the same answers from
+``LifeExpectancy`` directly.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Optional
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+
+from .analytics import LIFE_METRICS
+from .countries import get_resolver
+from .models import Country, LifeExpectancy, LifeExpectancyRank
+from .versioning import current_dataset_version, derived_current, mark_derived_built
+
+RANK_COLUMNS = ("year_rank", "year_total", "status_rank", "status_total")
+
+
+def ranks_enabled() -> bool:
+    """Read from the rank table: enabled in settings and built from the current version."""
+    return bool(getattr(settings, "HEALTH_RANK_TABLE", True)) and derived_current("ranks")
+
+
+RANK_FIELDS = ("country_id", "metric", "year", "status", "value", *RANK_COLUMNS, "percentile")
+
+
+def _insert_ranks_sql(cursor) -> int:
+    """One ``INSERT ... SELECT`` per metric, ranked by the database's window functions."""
+    qn = connection.ops.quote_name
+    target = qn(LifeExpectancyRank._meta.db_table)
+    source = qn(LifeExpectancy._meta.db_table)
+    columns = ", ".join(qn(name) for name in RANK_FIELDS)
+    rows = 0
+    for metric in LIFE_METRICS:
+        column = qn(LifeExpectancy._meta.get_field(metric).column)
+        cursor.execute(
+            f"INSERT INTO {target} ({columns}) "
+            "SELECT country_id, %s, year, status, value, "
+            "DENSE_RANK() OVER (PARTITION BY year ORDER BY value DESC), "
+            "COUNT(*) OVER (PARTITION BY year), "
+            "DENSE_RANK() OVER (PARTITION BY year, status ORDER BY value DESC), "
+            "COUNT(*) OVER (PARTITION BY year, status), "
+            "CUME_DIST() OVER (ORDER BY value) * 100 "
+            f"FROM (SELECT country_id, year, COALESCE(status, '') AS status, {column} AS value "
+            f"FROM {source} WHERE {column} IS NOT NULL) AS ranked",
+            [metric],
+        )
+        rows += cursor.rowcount
+    return rows
+
+
+def rank_frame() -> pd.DataFrame:
+    """The rank table as a frame (RANK_FIELDS columns), computed with pandas."""
+    frame = pd.DataFrame.from_records(
+        LifeExpectancy.objects.values_list("country_id", "year", "status", *LIFE_METRICS),
+        columns=["country_id", "year", "status", *LIFE_METRICS],
+    )
+    long = frame.melt(id_vars=["country_id", "year", "status"], var_name="metric", value_name="value").dropna(
+        subset=["value"]
+    )
+    long["status"] = long["status"].fillna("")
+    by_year = long.groupby(["metric", "year"])["value"]
+    by_status = long.groupby(["metric", "year", "status"])["value"]
+    long["year_rank"] = by_year.rank(method="dense", ascending=False)
+    long["year_total"] = by_year.transform("size")
+    long["status_rank"] = by_status.rank(method="dense", ascending=False)
+    long["status_total"] = by_status.transform("size")
+    long["percentile"] = long.groupby("metric")["value"].rank(method="max", pct=True) * 100
+    return long[list(RANK_FIELDS)].astype({"value": float, "percentile": float, **{c: int for c in RANK_COLUMNS}})
+
+
+def _insert_ranks_frame(cursor, batch_size: int) -> int:
+    """Rank with pandas and insert plain tuples (for databases without window functions)."""
+    frame = rank_frame()
+    qn = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {qn(LifeExpectancyRank._meta.db_table)} ({', '.join(qn(name) for name in RANK_FIELDS)}) "
+        f"VALUES ({', '.join(['%s'] * len(RANK_FIELDS))})"
+    )
+    rows = frame.astype(object).itertuples(index=False, name=None)
+    while batch := list(islice(rows, batch_size)):
+        cursor.executemany(sql, batch)
+    return len(frame)
+
+
+@transaction.atomic
+def refresh_ranks(version: str, batch_size: int = 1000) -> int:
+    """Rebuild the whole rank table from LifeExpectancy and stamp it with ``version``.
+
+    The ranks are computed and inserted by the database (window functions),
+    so no row passes through Python.
+    """
+    LifeExpectancyRank.objects.all().delete()
+    with connection.cursor() as cursor:
+        if connection.features.supports_over_clause:
+            rows = _insert_ranks_sql(cursor)
+        else:
+            rows = _insert_ranks_frame(cursor, batch_size)
+    mark_derived_built("ranks", version)
+    return rows
+
+
+@lru_cache(maxsize=4)
+def _status_labels(version: str) -> dict[str, str]:
+    return {label.casefold(): label for label in LifeExpectancy.objects.values_list("status", flat=True).distinct()}
+
+
+def status_label(status: str) -> Optional[str]:
+    """Stored spelling of ``status`` (case-insensitive), or None if no row has it."""
+    return _status_labels(current_dataset_version()).get(status.casefold())
+
+
+def _country_name(country_id: int) -> Optional[str]:
+    name = get_resolver().names.get(country_id)
+    if name is None:
+        # A load that just committed new countries is visible before the cached dataset version
+        # (and so the resolver) catches up; read the name instead of failing the request.
+        name = Country.objects.filter(pk=country_id).values_list("name", flat=True).first()
+    return name
+
+
+def _item(country_id: int, year: int, status: str, metric: str, value: float, rank: int) -> dict[str, Any]:
+    return {"country": _country_name(country_id), "year": year, "status": status, metric: value, "rank": rank}
+
+
+def top_n(year: int, metric: str, n: int, status: Optional[str] = None, bottom: bool = False) -> list[dict[str, Any]]:
+    """Highest (or lowest) ``n`` values of ``metric`` in ``year`` with their dense rank.
+
+    With ``status`` the ranking is within that status. Ties are ordered by country id.
+    """
+    if ranks_enabled():
+        return _table_top_n(year, metric, n, status, bottom)
+    return _live_top_n(year, metric, n, status, bottom)
+
+
+def _table_top_n(year, metric, n, status, bottom):
+    qs = LifeExpectancyRank.objects.filter(metric=metric, year=year)
+    rank_column = "year_rank"
+    if status:
+        label = status_label(status)
+        if label is None:
+            return []
+        qs, rank_column = qs.filter(status=label), "status_rank"
+    qs = qs.order_by(f"-{rank_column}" if bottom else rank_column, "country_id")
+    return [
+        _item(cid, year, row_status, metric, value, rank)
+        for cid, row_status, value, rank in qs.values_list("country_id", "status", "value", rank_column)[:n]
+    ]
+
+
+def _live_top_n(year, metric, n, status, bottom):
+    qs = LifeExpectancy.objects.filter(year=year, **{f"{metric}__isnull": False})
+    if status:
+        qs = qs.filter(status__iexact=status)
+    rows = list(qs.order_by(metric if bottom else f"-{metric}", "country_id").values_list("country_id", "status", metric)[:n])
+    # Dense ranks: count distinct values walking down from the top (or up from the bottom).
+    distinct_total = qs.values(metric).distinct().count() if bottom and rows else 0
+    items, seen, previous = [], 0, None
+    for cid, row_status, value in rows:
+        if value != previous:
+            seen, previous = seen + 1, value
+        items.append(_item(cid, year, row_status, metric, value, distinct_total - seen + 1 if bottom else seen))
+    return items
+
+
+def country_rank(country_id: int, year: int, metric: str) -> Optional[dict[str, Any]]:
+    """Ranks of one country-year for ``metric``, or None if it has no value."""
+    if ranks_enabled():
+        row = (
+            LifeExpectancyRank.objects.filter(metric=metric, year=year, country_id=country_id)
+            .values_list("status", "value", *RANK_COLUMNS, "percentile")
+            .first()
+        )
+    else:
+        row = _live_country_rank(country_id, year, metric)
+    if row is None:
+        return None
+    row_status, value, year_rank, year_total, status_rank, status_total, percentile = row
+    return {
+        **_item(country_id, year, row_status, metric, value, year_rank),
+        "total": year_total,
+        "status_rank": status_rank,
+        "status_total": status_total,
+        "percentile": round(percentile, 2),
+    }
+
+
+def _live_country_rank(country_id, year, metric):
+    row = LifeExpectancy.objects.filter(country_id=country_id, year=year).values_list("status", metric).first()
+    if row is None or row[1] is None:
+        return None
+    row_status, value = row
+    ranked = LifeExpectancy.objects.filter(**{f"{metric}__isnull": False})
+    in_year = ranked.filter(year=year)
+    in_status = in_year.filter(status=row_status)
+
+    def dense_rank(qs):
+        return qs.filter(**{f"{metric}__gt": value}).values(metric).distinct().count() + 1
+
+    percentile = ranked.filter(**{f"{metric}__lte": value}).count() / ranked.count() * 100
+    return (
+        row_status,
+        value,
+        dense_rank(in_year),
+        in_year.count(),
+        dense_rank(in_status),
+        in_status.count(),
+        percentile,
+    )
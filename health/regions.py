@@ -0,0 +1,223 @@
+"""Precomputed WHO region rollups.
+
+``RegionYearAggregate`` holds one row per (metric, sex, region, year) for
+every LifeExpectancy indicator and suicide rate column: the number of
+countries, mean, median, population-weighted mean (weights from
+``LifeExpectancy.population`` of the same country-year) and the minimum and
+maximum with the country that holds them. A country belongs to the region
+(``parent_location``) of the latest suicide row of its alias group (see
+``health.countries``), so a country named differently in the two datasets
+gets its region and population weight from the other name; groups without a
+suicide row are not in any region.
+
+The table is built next to the facts and ranks, so ``/insights/regions/``
+reads a few dozen rows with one index range scan instead of grouping both
+datasets per request. Like them it is stamped with the dataset version; while
+it is stale the same aggregates are computed from the base tables for just
+the requested metric.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Collection, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .analytics import LIFE_METRICS, SUICIDE_METRICS
+from .countries import get_resolver
+from .models import LifeExpectancy, RegionYearAggregate, SuicideMortality
+from .versioning import derived_current, mark_derived_built
+
+KEYS = ["region_code", "region", "year", "sex", "metric"]
+AGGREGATE_COLUMNS = (
+    "countries",
+    "mean",
+    "median",
+    "weighted_mean",
+    "weighted_countries",
+    "min_value",
+    "min_country_id",
+    "max_value",
+    "max_country_id",
+)
+
+
+def regions_enabled() -> bool:
+    """Read from the region table: enabled in settings and built from the current version."""
+    return bool(getattr(settings, "HEALTH_REGION_TABLE", True)) and derived_current("regions")
+
+
+def _alias_groups() -> dict[int, int]:
+    """country_id -> first id of its alias group (e.g. "Turkey" and "Türkiye" share one)."""
+    return {cid: ids[0] for ids in get_resolver().groups.values() for cid in ids}
+
+
+def _group_ids(ids: pd.Series, groups: dict[int, int]) -> pd.Series:
+    # Countries the resolver has not seen yet are their own group.
+    return ids.map(groups).fillna(ids).astype("int64")
+
+
+def _region_map(groups: dict[int, int]) -> pd.DataFrame:
+    """Region of every country: that of the latest suicide row of any member of its alias group."""
+    rows = SuicideMortality.objects.exclude(parent_location="").values_list(
+        "country_id", "year", "parent_location_code", "parent_location"
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=["country_id", "year", "region_code", "region"])
+    frame["group"] = _group_ids(frame["country_id"], groups)
+    frame = frame.sort_values(["year", "country_id"], ascending=[False, True]).drop_duplicates("group")
+    members = pd.Series(sorted(set(groups) | set(frame["country_id"])), name="country_id", dtype="int64")
+    members = members.to_frame().assign(group=_group_ids(members, groups))
+    return members.merge(frame[["group", "region_code", "region"]], on="group")[["country_id", "region_code", "region"]]
+
+
+def region_membership() -> dict[int, tuple[str, str]]:
+    """country_id -> (region code, region) as the region table assigns them."""
+    frame = _region_map(_alias_groups())
+    return dict(zip(frame["country_id"], zip(frame["region_code"], frame["region"])))
+
+
+def region_frame(
+    metrics: tuple[str, ...],
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+    sex: Optional[str] = None,
+    years_in: Optional[Collection[int]] = None,
+) -> pd.DataFrame:
+    """Long frame (country_id, year, sex, metric, value, population, region_code, region) of non-null values."""
+    years: dict[str, Any] = {}
+    if year_min is not None:
+        years["year__gte"] = year_min
+    if year_max is not None:
+        years["year__lte"] = year_max
+    if years_in is not None:
+        years["year__in"] = sorted(years_in)
+    life_metrics = [m for m in metrics if m in LIFE_METRICS]
+    suicide_metrics = [m for m in metrics if m in SUICIDE_METRICS]
+
+    # population is both a metric and the weight, so select it once.
+    columns = list(dict.fromkeys(["population", *life_metrics]))
+    life = pd.DataFrame.from_records(
+        list(LifeExpectancy.objects.filter(**years).values_list("country_id", "year", *columns)),
+        columns=["country_id", "year", *columns],
+    )
+    groups = _alias_groups()
+    # Alias groups split across datasets (life rows under "Turkey", suicide rows under "Türkiye") share the population.
+    weights = (
+        life[["country_id", "year", "population"]]
+        .assign(group=_group_ids(life["country_id"], groups))
+        .dropna(subset=["population"])
+        .drop_duplicates(["group", "year"])[["group", "year", "population"]]
+    )
+    frames = []
+    if life_metrics:
+        melted = life.melt(id_vars=["country_id", "year"], value_vars=life_metrics, var_name="metric", value_name="value")
+        # melt stacks the metric columns one after another.
+        frames.append(melted.assign(sex="", population=np.tile(life["population"].to_numpy(), len(life_metrics))))
+    if suicide_metrics:
+        qs = SuicideMortality.objects.filter(**years)
+        if sex is not None:
+            qs = qs.filter(sex__iexact=sex)
+        suicide = pd.DataFrame.from_records(
+            list(qs.values_list("country_id", "year", "sex", *suicide_metrics)),
+            columns=["country_id", "year", "sex", *suicide_metrics],
+        ).melt(id_vars=["country_id", "year", "sex"], var_name="metric", value_name="value")
+        suicide["group"] = _group_ids(suicide["country_id"], groups)
+        frames.append(suicide.merge(weights, on=["group", "year"], how="left").drop(columns="group"))
+
+    long = pd.concat(frames, ignore_index=True)
+    long = long.dropna(subset=["value"]).merge(_region_map(groups), on="country_id")
+    long["value"] = long["value"].astype(float)
+    long["population"] = long["population"].astype(float)
+    return long
+
+
+def aggregate(long: pd.DataFrame) -> pd.DataFrame:
+    """One row per (region, year, sex, metric) with AGGREGATE_COLUMNS, in KEYS order."""
+    if long.empty:
+        return pd.DataFrame(columns=[*KEYS, *AGGREGATE_COLUMNS])
+    # Ties for min/max go to the lowest country id.
+    long = long.sort_values("country_id", kind="stable").reset_index(drop=True)
+    weight = long["population"].where(long["population"] > 0)
+    long = long.assign(weight=weight, weighted=long["value"] * weight)
+
+    grouped = long.groupby(KEYS, sort=True)
+    out = grouped["value"].agg(countries="size", mean="mean", median="median", min_value="min", max_value="max")
+    sums = grouped[["weighted", "weight"]].sum()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["weighted_mean"] = (sums["weighted"] / sums["weight"]).where(sums["weight"] > 0)
+    out["weighted_countries"] = grouped["weight"].count()
+    out["min_country_id"] = long.loc[grouped["value"].idxmin(), "country_id"].to_numpy()
+    out["max_country_id"] = long.loc[grouped["value"].idxmax(), "country_id"].to_numpy()
+    return out.reset_index()[[*KEYS, *AGGREGATE_COLUMNS]]
+
+
+def build_region_rows(years: Optional[Collection[int]] = None) -> list[RegionYearAggregate]:
+    frame = aggregate(region_frame((*LIFE_METRICS, *SUICIDE_METRICS), years_in=years))
+    return [
+        RegionYearAggregate(
+            **{
+                **row,
+                "year": int(row["year"]),
+                "weighted_mean": None if pd.isna(row["weighted_mean"]) else row["weighted_mean"],
+            }
+        )
+        for row in frame.to_dict("records")
+    ]
+
+
+@transaction.atomic
+def refresh_regions(version: str, batch_size: int = 1000, years: Optional[Collection[int]] = None) -> int:
+    """Rebuild the region table from the base tables and stamp it with ``version``.
+
+    With ``years`` only those years' rollups are replaced; the caller must
+    know that no country changed region (see ``region_membership``).
+    """
+    rows = build_region_rows(years)
+    stale = RegionYearAggregate.objects.all() if years is None else RegionYearAggregate.objects.filter(year__in=years)
+    stale.delete()
+    RegionYearAggregate.objects.bulk_create(rows, batch_size=batch_size)
+    mark_derived_built("regions", version)
+    return len(rows)
+
+
+def _item(row: dict[str, Any]) -> dict[str, Any]:
+    names = get_resolver().names
+    return {
+        "region_code": row["region_code"],
+        "region": row["region"],
+        "year": int(row["year"]),
+        "countries": int(row["countries"]),
+        "mean": float(row["mean"]),
+        "median": float(row["median"]),
+        "weighted_mean": None if pd.isna(row["weighted_mean"]) else float(row["weighted_mean"]),
+        "weighted_countries": int(row["weighted_countries"]),
+        "min": {"country": names[int(row["min_country_id"])], "value": float(row["min_value"])},
+        "max": {"country": names[int(row["max_country_id"])], "value": float(row["max_value"])},
+    }
+
+
+def region_aggregates(
+    metric: str, year_min: int, year_max: int, sex: str, region: Optional[str] = None
+) -> list[dict[str, Any]]:
+    """Per-region, per-year aggregates of ``metric`` ordered by region code and year.
+
+    ``sex`` only applies to suicide metrics; ``region`` matches a region code
+    or name (case-insensitive).
+    """
+    if regions_enabled():
+        qs = RegionYearAggregate.objects.filter(metric=metric, year__gte=year_min, year__lte=year_max)
+        qs = qs.filter(sex__iexact=sex) if metric in SUICIDE_METRICS else qs.filter(sex="")
+        if region:
+            qs = qs.filter(Q(region_code__iexact=region) | Q(region__iexact=region))
+        rows = list(qs.order_by("region_code", "year").values("region_code", "region", "year", *AGGREGATE_COLUMNS))
+    else:
+        long = region_frame((metric,), year_min, year_max, sex if metric in SUICIDE_METRICS else None)
+        if region:
+            wanted = region.casefold()
+            long = long[(long["region_code"].str.casefold() == wanted) | (long["region"].str.casefold() == wanted)]
+        rows = aggregate(long).to_dict("records")
+    return [_item(row) for row in rows]
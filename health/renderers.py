@@ -0,0 +1,49 @@
+"""JSON renderer backed by ``orjson`` when it is installed.
+
+Drop-in replacement for ``rest_framework.renderers.JSONRenderer``: compact
+output is encoded with ``orjson`` (several times faster than ``json.dumps``
+on list pages); indented output, non-default JSON settings or a missing
+``orjson`` fall back to DRF's encoder. The only byte-level difference is the
+exponent spelling of very small/large floats (``1e-7`` vs ``1e-07``), which
+decodes to the same value.
+
+Render time is reported to the request metrics (``health.metrics``).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import record_serialization
+
+try:  # optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data: Any, accepted_media_type: Optional[str] = None, renderer_context: Optional[dict] = None) -> bytes:
+        started = time.perf_counter()
+        try:
+            return self._render(data, accepted_media_type, renderer_context)
+        finally:
+            record_serialization(time.perf_counter() - started)
+
+    def _render(self, data: Any, accepted_media_type: Optional[str], renderer_context: Optional[dict]) -> bytes:
+        fast = orjson is not None and self.compact and not self.ensure_ascii
+        if not fast or data is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Dates/times go through DRF's encoder so their format is unchanged.
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        # Same JavaScript-safety escaping as DRF's renderer.
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b"\\u2028").replace(PARAGRAPH_SEPARATOR, b"\\u2029")
+        return ret
@@ -7,14 +7,55 @@ from rest_framework import serializers
 from .models import Country, LifeExpectancy, SuicideMortality, Note
 
 
+def _field_list(raw: str | None) -> list[str]:
+    return [name.strip() for name in (raw or "").split(",") if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """``?fields=a,b`` keeps only those keys; ``?exclude=a,b`` drops keys.
+
+    ``optional_fields`` (e.g. a flat ``country_name``) are only rendered when
+    named in ``?fields=``. A ``fields`` tuple in the serializer context takes
+    precedence over the request. Write-only fields are never trimmed.
+    """
+
+    optional_fields: tuple[str, ...] = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = self.context.get("fields")
+        if names is None:
+            request = self.context.get("request")
+            names = self.select_fields(request.query_params if request is not None else {})
+        for name, field in list(self.fields.items()):
+            if name not in names and not field.write_only:
+                self.fields.pop(name)
+
+    def readable_field_names(self) -> tuple[str, ...]:
+        return tuple(name for name, field in self.fields.items() if not field.write_only)
+
+    def select_fields(self, params) -> tuple[str, ...]:
+        available = self.readable_field_names()
+        requested = _field_list(params.get("fields"))
+        excluded = _field_list(params.get("exclude"))
+        unknown = [name for name in (*requested, *excluded) if name not in available]
+        if unknown:
+            raise serializers.ValidationError({"fields": f"Unknown field(s): {', '.join(unknown)}"})
+        if requested:
+            return tuple(name for name in available if name in requested and name not in excluded)
+        return tuple(name for name in available if name not in self.optional_fields and name not in excluded)
+
+
 class CountrySerializer(serializers.ModelSerializer):
     class Meta:
         model = Country
         fields = ["id", "name"]
 
 
-class LifeExpectancySerializer(serializers.ModelSerializer):
+class LifeExpectancySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     country = CountrySerializer(read_only=True)
+    country_name = serializers.CharField(source="country.name", read_only=True)
+    optional_fields = ("country_name",)
     country_id = serializers.PrimaryKeyRelatedField(
         source="country", queryset=Country.objects.all(), write_only=True, required=False
     )
@@ -24,6 +65,7 @@ class LifeExpectancySerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "country",
+            "country_name",
             "country_id",
             "year",
             "status",
@@ -54,8 +96,10 @@ class LifeExpectancySerializer(serializers.ModelSerializer):
         return value
 
 
-class SuicideMortalitySerializer(serializers.ModelSerializer):
+class SuicideMortalitySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     country = CountrySerializer(read_only=True)
+    country_name = serializers.CharField(source="country.name", read_only=True)
+    optional_fields = ("country_name",)
     country_id = serializers.PrimaryKeyRelatedField(
         source="country", queryset=Country.objects.all(), write_only=True, required=False
     )
@@ -65,6 +109,7 @@ class SuicideMortalitySerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "country",
+            "country_name",
             "country_id",
             "indicator_code",
             "indicator",
@@ -116,6 +161,41 @@ class CountryTimelineResponseSerializer(serializers.Serializer):
     results = CountryTimelinePointSerializer(many=True)
 
 
+class StrictCharField(serializers.CharField):
+    """CharField that rejects numbers and booleans instead of converting them to text."""
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail("invalid")
+        return super().to_internal_value(data)
+
+
+class CountryTimelineBatchRequestSerializer(serializers.Serializer):
+    countries = serializers.ListField(
+        child=StrictCharField(allow_blank=True),
+        required=False,
+        default=list,
+        help_text="Country names, aliases or ISO3 codes (GET: comma-separated).",
+    )
+    year_min = serializers.IntegerField(required=False, default=2000)
+    year_max = serializers.IntegerField(required=False, default=2015)
+    sex = StrictCharField(required=False, allow_blank=True, default="Both sexes")
+
+    def validate(self, attrs):
+        if attrs["year_max"] < attrs["year_min"] or attrs["year_max"] - attrs["year_min"] > 200:
+            raise serializers.ValidationError("invalid year range")
+        return attrs
+
+
+class CountryTimelineBatchResponseSerializer(serializers.Serializer):
+    year_min = serializers.IntegerField()
+    year_max = serializers.IntegerField()
+    sex = serializers.CharField()
+    count = serializers.IntegerField()
+    not_found = serializers.ListField(child=serializers.CharField())
+    results = CountryTimelineResponseSerializer(many=True)
+
+
 class RiskFlagItemSerializer(serializers.Serializer):
     country = serializers.CharField()
     year = serializers.IntegerField()
@@ -130,9 +210,104 @@ class RiskFlagsResponseSerializer(serializers.Serializer):
     results = RiskFlagItemSerializer(many=True)
 
 
+class CorrelationIntervalSerializer(serializers.Serializer):
+    level = serializers.FloatField()
+    low = serializers.FloatField(allow_null=True)
+    high = serializers.FloatField(allow_null=True)
+    resamples = serializers.IntegerField()
+
+
+class PermutationTestSerializer(serializers.Serializer):
+    p_value = serializers.FloatField(allow_null=True)
+    null_low = serializers.FloatField(allow_null=True)
+    null_high = serializers.FloatField(allow_null=True)
+    permutations = serializers.IntegerField()
+
+
+class ResamplingSerializer(serializers.Serializer):
+    n_boot = serializers.IntegerField()
+    seed = serializers.IntegerField()
+    workers = serializers.IntegerField()
+    complete = serializers.BooleanField()
+
+
+class CorrelationPairSerializer(serializers.Serializer):
+    life_metric = serializers.CharField()
+    suicide_metric = serializers.CharField()
+    n = serializers.IntegerField()
+    correlation = serializers.FloatField(allow_null=True)
+    ci = CorrelationIntervalSerializer(required=False)
+    permutation = PermutationTestSerializer(required=False)
+
+
 class CorrelationResponseSerializer(serializers.Serializer):
     year_min = serializers.IntegerField()
     year_max = serializers.IntegerField()
     sex = serializers.CharField()
     n = serializers.IntegerField()
     correlation = serializers.FloatField(allow_null=True)
+    ci = CorrelationIntervalSerializer(required=False)
+    permutation = PermutationTestSerializer(required=False)
+    resampling = ResamplingSerializer(required=False)
+    results = CorrelationPairSerializer(many=True)
+
+
+class CorrelationMatrixResponseSerializer(serializers.Serializer):
+    year_min = serializers.IntegerField()
+    year_max = serializers.IntegerField()
+    sex = serializers.CharField()
+    countries = serializers.IntegerField()
+    metrics = serializers.ListField(child=serializers.CharField())
+    pearson = serializers.ListField(child=serializers.ListField(child=serializers.FloatField(allow_null=True)))
+    spearman = serializers.ListField(child=serializers.ListField(child=serializers.FloatField(allow_null=True)))
+    n = serializers.ListField(child=serializers.ListField(child=serializers.IntegerField()))
+
+
+class TrendItemSerializer(serializers.Serializer):
+    country = serializers.CharField()
+    rank = serializers.IntegerField(allow_null=True)
+    slope = serializers.FloatField(allow_null=True)
+    points = serializers.IntegerField()
+    values = serializers.ListField(child=serializers.FloatField(allow_null=True))
+    yoy = serializers.ListField(child=serializers.FloatField(allow_null=True))
+    rolling_mean = serializers.ListField(child=serializers.FloatField(allow_null=True))
+
+
+class TrendsResponseSerializer(serializers.Serializer):
+    metric = serializers.CharField()
+    sex = serializers.CharField()
+    year_min = serializers.IntegerField()
+    year_max = serializers.IntegerField()
+    window = serializers.IntegerField()
+    order = serializers.CharField()
+    lower_is_better = serializers.BooleanField()
+    years = serializers.ListField(child=serializers.IntegerField())
+    count = serializers.IntegerField()
+    results = TrendItemSerializer(many=True)
+
+
+class RegionExtremeSerializer(serializers.Serializer):
+    country = serializers.CharField()
+    value = serializers.FloatField()
+
+
+class RegionYearSerializer(serializers.Serializer):
+    region_code = serializers.CharField()
+    region = serializers.CharField()
+    year = serializers.IntegerField()
+    countries = serializers.IntegerField()
+    mean = serializers.FloatField()
+    median = serializers.FloatField()
+    weighted_mean = serializers.FloatField(allow_null=True)
+    weighted_countries = serializers.IntegerField()
+    min = RegionExtremeSerializer()
+    max = RegionExtremeSerializer()
+
+
+class RegionsResponseSerializer(serializers.Serializer):
+    metric = serializers.CharField()
+    sex = serializers.CharField(allow_null=True)
+    year_min = serializers.IntegerField()
+    year_max = serializers.IntegerField()
+    count = serializers.IntegerField()
+    results = RegionYearSerializer(many=True)
@@ -0,0 +1,21 @@
+"""Signal handlers keeping the dataset version stamp in sync with row edits.
+
+Bulk loads go through ``bulk_create`` (no signals) and bump the version once
+at the end; these handlers cover one-off edits via the admin or the ORM.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Country, LifeExpectancy, SuicideMortality
+from .versioning import bump_dataset_version
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=LifeExpectancy)
+@receiver(post_save, sender=SuicideMortality)
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=LifeExpectancy)
+@receiver(post_delete, sender=SuicideMortality)
+def dataset_row_changed(sender, **kwargs) -> None:
+    bump_dataset_version()
@@ -0,0 +1,384 @@
+"""Process-wide columnar snapshot of the WHO datasets.
+
+The whole dataset is a few thousand rows and only changes on reload, so the
+insights endpoints answer from NumPy column arrays instead of building ORM
+instances per request. The snapshot is built lazily on first use and rebuilt
+when the dataset version stamp changes.
+
+Layout:
+- ``life``: rows sorted by (country_id, year); one array per column
+- ``suicide``: rows sorted by (country_id, sex, year)
+- string columns are dictionary-encoded as int32 codes into ``labels[column]``
+- floats use NaN for NULL
+
+With ``HEALTH_SNAPSHOT_FILE`` set, ``load_who_data`` (and ``refresh_facts``)
+also write the snapshot to that path as one binary file: a JSON header
+(version, labels, country names, array offsets) followed by the raw,
+64-byte-aligned column arrays. Workers ``mmap`` the file and wrap the arrays
+with ``np.frombuffer`` instead of querying the database, so every process
+shares one read-only copy in the page cache. The file is written next to
+its target and swapped in with ``os.replace``: a reader sees either the old
+or the new file, never a partial one, and mappings of the old file stay
+valid. A file whose version is not the current one is ignored.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+from .analytics import LIFE_METRICS, SUICIDE_METRICS
+from .countries import get_resolver, group_row, group_years
+from .models import Country, LifeExpectancy, SuicideMortality
+from .versioning import current_dataset_version
+
+LIFE_LABEL_COLUMNS = ("status",)
+SUICIDE_LABEL_COLUMNS = ("sex", "parent_location")
+
+
+def _encode(values: list[str]) -> tuple[np.ndarray, list[str]]:
+    """Dictionary-encode a list of strings into (codes, labels)."""
+    index: dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+@dataclass
+class DatasetSnapshot:
+    version: str
+    country_names: dict[int, str]
+    life: dict[str, np.ndarray]
+    suicide: dict[str, np.ndarray]
+    labels: dict[str, list[str]]
+
+    # -- lookups ---------------------------------------------------------
+
+    def resolve_country(self, name: str) -> Optional[int]:
+        """Country name, alias or ISO3 code -> id (see ``health.countries``)."""
+        return get_resolver().resolve(name)
+
+    def lookup_country(self, name: str) -> list[int]:
+        """Ids of the whole alias group for ``name``, best match first (see ``health.countries``)."""
+        return get_resolver().lookup(name)
+
+    def label_code(self, column: str, value: str) -> Optional[int]:
+        """Case-insensitive label -> code for a dictionary-encoded column."""
+        wanted = value.casefold()
+        for code, label in enumerate(self.labels[column]):
+            if label.casefold() == wanted:
+                return code
+        return None
+
+    def _country_slice(self, table: dict[str, np.ndarray], country_id: int) -> slice:
+        ids = table["country_id"]
+        return slice(
+            int(np.searchsorted(ids, country_id, side="left")),
+            int(np.searchsorted(ids, country_id, side="right")),
+        )
+
+    def _suicide_rows(self, country_id: int, sex: str, year_min: int, year_max: int) -> np.ndarray:
+        sex_code = self.label_code("sex", sex)
+        if sex_code is None:
+            return np.empty(0, dtype=np.intp)
+        sl = self._country_slice(self.suicide, country_id)
+        years = self.suicide["year"][sl]
+        mask = (self.suicide["sex"][sl] == sex_code) & (years >= year_min) & (years <= year_max)
+        return np.flatnonzero(mask) + sl.start
+
+    def _life_rows(self, country_id: int, year_min: int, year_max: int) -> np.ndarray:
+        sl = self._country_slice(self.life, country_id)
+        years = self.life["year"][sl]
+        return np.flatnonzero((years >= year_min) & (years <= year_max)) + sl.start
+
+    # -- insights --------------------------------------------------------
+
+    def country_summary(self, country_ids: Sequence[int], year: int, sex: str) -> dict[str, Any]:
+        """Summary of one country-year; ``country_ids`` is an alias group, best match first."""
+        life_rows, sui_rows = [], []
+        for cid in country_ids:
+            for i in self._life_rows(cid, year, year)[:1]:
+                status = self.labels["status"][self.life["status"][i]]
+                life_rows.append((cid, _optional(self.life["life_expectancy"][i]), status))
+            for i in self._suicide_rows(cid, sex, year, year)[:1]:
+                parent_location = self.labels["parent_location"][self.suicide["parent_location"][i]]
+                sui_rows.append((cid, _optional(self.suicide["rate"][i]), parent_location))
+        life_value, status = group_row(country_ids, life_rows) or (None, "")
+        rate, parent_location = group_row(country_ids, sui_rows) or (None, "")
+        return {
+            "country": self.country_names[country_ids[0]],
+            "year": year,
+            "life_expectancy": life_value,
+            "status": status,
+            "suicide_rate": rate,
+            "sex": sex,
+            "parent_location": parent_location,
+        }
+
+    def timeline(self, country_ids: Sequence[int], year_min: int, year_max: int, sex: str) -> list[dict[str, Any]]:
+        """Year series of one country; ``country_ids`` is an alias group, best match first."""
+        life_rows, sui_rows = [], []
+        for cid in country_ids:
+            rows = self._life_rows(cid, year_min, year_max)
+            years, values = self.life["year"][rows].tolist(), self.life["life_expectancy"][rows].tolist()
+            life_rows += [(cid, y, _optional(v)) for y, v in zip(years, values)]
+            rows = self._suicide_rows(cid, sex, year_min, year_max)
+            years, values = self.suicide["year"][rows].tolist(), self.suicide["rate"][rows].tolist()
+            sui_rows += [(cid, y, _optional(v)) for y, v in zip(years, values)]
+        life_map = group_years(country_ids, life_rows)
+        sui_map = group_years(country_ids, sui_rows)
+        return [
+            {"year": y, "life_expectancy": life_map.get(y), "suicide_rate": sui_map.get(y)}
+            for y in range(year_min, year_max + 1)
+        ]
+
+    def risk_flags(self, year: int, min_life: float, min_suicide: float, sex: str) -> list[dict[str, Any]]:
+        sex_code = self.label_code("sex", sex)
+        if sex_code is None:
+            return []
+
+        life_val = self.life["life_expectancy"]
+        life_mask = (self.life["year"] == year) & (life_val <= min_life)  # NaN compares False
+        rate = self.suicide["rate"]
+        sui_mask = (self.suicide["year"] == year) & (self.suicide["sex"] == sex_code) & (rate >= min_suicide)
+
+        life_idx = np.flatnonzero(life_mask)
+        sui_idx = np.flatnonzero(sui_mask)
+        _, li, si = np.intersect1d(
+            self.life["country_id"][life_idx], self.suicide["country_id"][sui_idx], return_indices=True
+        )
+        life_idx, sui_idx = life_idx[li], sui_idx[si]
+
+        lv, sv = life_val[life_idx], rate[sui_idx]
+        order = np.lexsort((-sv, lv))
+        ids = self.life["country_id"][life_idx]
+        return [
+            {
+                "country": self.country_names[int(ids[i])],
+                "year": year,
+                "life_expectancy": float(lv[i]),
+                "suicide_rate": float(sv[i]),
+            }
+            for i in order
+        ]
+
+    def _grouped_means(
+        self, table: dict[str, np.ndarray], mask: np.ndarray, columns: list[str]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        ids, inverse = np.unique(table["country_id"][mask], return_inverse=True)
+        means = np.full((len(ids), len(columns)), np.nan)
+        for j, col in enumerate(columns):
+            vals = table[col][mask]
+            valid = ~np.isnan(vals)
+            sums = np.bincount(inverse, weights=np.where(valid, vals, 0.0), minlength=len(ids))
+            counts = np.bincount(inverse, weights=valid, minlength=len(ids))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means[:, j] = sums / counts
+        return ids, means
+
+    def dataset_means(
+        self, year_min: int, year_max: int, sex: str, life_columns: list[str], suicide_columns: list[str]
+    ) -> tuple[tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray]]:
+        """Columnar equivalent of ``analytics.dataset_means`` (no database access)."""
+        life_mask = (self.life["year"] >= year_min) & (self.life["year"] <= year_max)
+        sex_code = self.label_code("sex", sex)
+        sui_mask = (self.suicide["year"] >= year_min) & (self.suicide["year"] <= year_max)
+        sui_mask &= self.suicide["sex"] == (-1 if sex_code is None else sex_code)
+        return (
+            self._grouped_means(self.life, life_mask, life_columns),
+            self._grouped_means(self.suicide, sui_mask, suicide_columns),
+        )
+
+    def metric_rows(
+        self, metric: str, year_min: int, year_max: int, sex: str
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Columnar equivalent of ``analytics.metric_rows`` (no database access)."""
+        table = self.suicide if metric in SUICIDE_METRICS else self.life
+        mask = (table["year"] >= year_min) & (table["year"] <= year_max)
+        if table is self.suicide:
+            sex_code = self.label_code("sex", sex)
+            mask &= table["sex"] == (-1 if sex_code is None else sex_code)
+        return table["country_id"][mask], table["year"][mask].astype(np.int64), table[metric][mask]
+
+    def country_means(
+        self, year_min: int, year_max: int, sex: str, life_columns: list[str], suicide_columns: list[str]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Columnar equivalent of ``analytics.country_means`` (no database access)."""
+        (life_ids, life_means), (sui_ids, sui_means) = self.dataset_means(
+            year_min, year_max, sex, life_columns, suicide_columns
+        )
+        common, li, si = np.intersect1d(life_ids, sui_ids, assume_unique=True, return_indices=True)
+        return common, life_means[li], sui_means[si]
+
+
+def _columns(rows: list[tuple], names: tuple[str, ...], labels: dict[str, list[str]], label_columns: tuple[str, ...]) -> dict[str, np.ndarray]:
+    raw = dict(zip(names, zip(*rows))) if rows else {n: () for n in names}
+    out: dict[str, np.ndarray] = {
+        "id": np.array(raw["id"], dtype=np.int64),
+        "country_id": np.array(raw["country_id"], dtype=np.int64),
+        "year": np.array(raw["year"], dtype=np.int32),
+    }
+    for name in names:
+        if name in out:
+            continue
+        if name in label_columns:
+            out[name], labels[name] = _encode(list(raw[name]))
+        else:
+            out[name] = np.array(raw[name], dtype=float)
+    return out
+
+
+def build_snapshot(version: str) -> DatasetSnapshot:
+    """Read both datasets (three queries) into a columnar snapshot."""
+    labels: dict[str, list[str]] = {}
+
+    life_names = ("id", "country_id", "year", *LIFE_LABEL_COLUMNS, *LIFE_METRICS)
+    life_rows = list(LifeExpectancy.objects.order_by("country_id", "year", "id").values_list(*life_names))
+    life = _columns(life_rows, life_names, labels, LIFE_LABEL_COLUMNS)
+
+    sui_names = ("id", "country_id", "year", *SUICIDE_LABEL_COLUMNS, *SUICIDE_METRICS)
+    sui_rows = list(SuicideMortality.objects.order_by("country_id", "sex", "year", "id").values_list(*sui_names))
+    suicide = _columns(sui_rows, sui_names, labels, SUICIDE_LABEL_COLUMNS)
+
+    country_names = dict(Country.objects.values_list("id", "name"))
+    return DatasetSnapshot(version=version, country_names=country_names, life=life, suicide=suicide, labels=labels)
+
+
+MAGIC = b"WHOSNAP1"
+ALIGN = 64
+_HEADER_SIZE = struct.Struct("<Q")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def write_snapshot_file(snapshot: DatasetSnapshot, path: Path | str) -> Path:
+    """Write ``snapshot`` to ``path`` atomically (temp file in the same directory, then ``os.replace``)."""
+    path = Path(path)
+    arrays = {
+        f"{table}.{name}": np.ascontiguousarray(array)
+        for table in ("life", "suicide")
+        for name, array in getattr(snapshot, table).items()
+    }
+    layout, offset = {}, 0
+    for key, array in arrays.items():
+        layout[key] = {"dtype": array.dtype.str, "length": len(array), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps(
+        {
+            "version": snapshot.version,
+            "labels": snapshot.labels,
+            "country_names": sorted(snapshot.country_names.items()),
+            "arrays": layout,
+        }
+    ).encode()
+    data_start = _aligned(len(MAGIC) + _HEADER_SIZE.size + len(header))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(MAGIC + _HEADER_SIZE.pack(len(header)) + header)
+            for key, array in arrays.items():
+                f.seek(data_start + layout[key]["offset"])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+
+def open_snapshot_file(path: Path | str, version: Optional[str] = None) -> Optional[DatasetSnapshot]:
+    """Map a snapshot file; None if it is missing, not a snapshot file, or not ``version``."""
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # missing, or empty (mmap of length 0)
+        return None
+    start = len(MAGIC) + _HEADER_SIZE.size
+    if len(buffer) < start or buffer[: len(MAGIC)] != MAGIC:
+        buffer.close()
+        return None
+    (size,) = _HEADER_SIZE.unpack(buffer[len(MAGIC) : start])
+    header = json.loads(buffer[start : start + size])
+    if version is not None and header["version"] != version:
+        buffer.close()
+        return None
+
+    data_start = _aligned(start + size)
+    tables: dict[str, dict[str, np.ndarray]] = {"life": {}, "suicide": {}}
+    for key, spec in header["arrays"].items():
+        table, name = key.split(".", 1)
+        tables[table][name] = np.frombuffer(
+            buffer, dtype=np.dtype(spec["dtype"]), count=spec["length"], offset=data_start + spec["offset"]
+        )
+    return DatasetSnapshot(
+        version=header["version"],
+        country_names={int(cid): name for cid, name in header["country_names"]},
+        life=tables["life"],
+        suicide=tables["suicide"],
+        labels=header["labels"],
+    )
+
+
+def snapshot_file() -> Optional[Path]:
+    path = getattr(settings, "HEALTH_SNAPSHOT_FILE", "")
+    return Path(path) if path else None
+
+
+def refresh_snapshot_file(version: str) -> Optional[Path]:
+    """Rebuild the shared snapshot file for ``version`` (no-op unless HEALTH_SNAPSHOT_FILE is set)."""
+    path = snapshot_file()
+    if path is None:
+        return None
+    return write_snapshot_file(build_snapshot(version), path)
+
+
+def load_snapshot(version: str) -> DatasetSnapshot:
+    """The shared snapshot file when it holds ``version``, else a fresh build from the database."""
+    path = snapshot_file()
+    snapshot = open_snapshot_file(path, version) if path is not None else None
+    return snapshot if snapshot is not None else build_snapshot(version)
+
+
+_lock = threading.Lock()
+_snapshot: Optional[DatasetSnapshot] = None
+
+
+def snapshot_enabled() -> bool:
+    return bool(getattr(settings, "HEALTH_COLUMNAR_SNAPSHOT", True))
+
+
+def get_snapshot() -> DatasetSnapshot:
+    """Return the current snapshot, (re)building it if the dataset version changed."""
+    global _snapshot
+    version = current_dataset_version()
+    snap = _snapshot
+    if snap is not None and snap.version == version:
+        return snap
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = load_snapshot(version)
+        return _snapshot
+
+
+def clear_snapshot() -> None:
+    global _snapshot
+    with _lock:
+        _snapshot = None
@@ -0,0 +1,272 @@
+"""Synthetic WHO-shaped CSVs for scale tests.
+
+``fit_profile`` reads the bundled CSVs through the loader's own cleaners and
+keeps, per numeric column, the null rate, 201 quantiles of the observed
+values and its rank correlation with life expectancy. ``write_synthetic``
+then draws countries in blocks: every row gets a latent normal score made
+of a persistent per-country part plus yearly noise, each column is mixed
+from that score with its fitted correlation (a Gaussian copula) and mapped
+back through its quantiles, and nulls are dropped in at the fitted rates.
+The result has the real marginals, cross-column structure and
+country-to-country spread, at any size, in vectorised chunks.
+
+Country names, regions and ISO3 codes come from the real suicide file; past
+its ~185 locations names get a numeric suffix ("Japan 2") and no ISO3 code.
+The bundled suicide file only has "Both sexes" rows, so the Male/Female
+rates use fixed ratios to the both-sexes rate (``SEX_RATIOS``) with a
+per-country spread instead of fitted ones.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+try:  # optional dependency: several times faster CSV encoding
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - depends on environment
+    pa = None
+    pa_csv = None
+
+from .ingest import LIFE_FLOAT_FIELDS, clean_life_frame, clean_suicide_frame
+
+# Header of the WHO GHO export read by load_who_data (the life CSV uses LIFE_CSV_COLUMNS).
+SUICIDE_COLUMNS = (
+    "IndicatorCode",
+    "Indicator",
+    "ParentLocationCode",
+    "ParentLocation",
+    "SpatialDimValueCode",
+    "Location",
+    "Location_normalized",
+    "Period",
+    "Dim1",
+    "FactValueNumeric",
+    "FactValueNumericLow",
+    "FactValueNumericHigh",
+    "Value",
+    "IsLatestYear",
+    "DateModified",
+)
+SEXES = ("Both sexes", "Male", "Female")
+# Typical WHO ratio of the sex-specific crude rate to the both-sexes rate, and its log-normal spread.
+SEX_RATIOS = {"Both sexes": (1.0, 0.0), "Male": (1.55, 0.15), "Female": (0.45, 0.3)}
+QUANTILES = np.linspace(0.0, 1.0, 201)
+# Share of a column's latent variance that is fixed per country (the rest varies by year).
+PERSISTENCE = 0.85
+
+
+def _norm_cdf(z: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (Abramowitz & Stegun 7.1.26 erf, |error| < 1.5e-7)."""
+    x = np.abs(z) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return 0.5 * (1.0 + np.sign(z) * erf)
+
+
+@dataclass
+class Marginal:
+    """Fitted distribution of one numeric column."""
+
+    quantiles: np.ndarray
+    null_rate: float
+    rho: float  # latent correlation with the driver column
+    decimals: int  # fewest decimals (up to 3) that 95% of the observed values are written with
+
+    @classmethod
+    def fit(cls, values: pd.Series, driver: pd.Series | None = None) -> "Marginal":
+        observed = values.dropna()
+        rho = 1.0
+        if driver is not None:
+            spearman = pd.concat([values, driver], axis=1).corr(method="spearman").iloc[0, 1]
+            # Spearman -> Pearson correlation of the underlying Gaussian copula.
+            rho = 0.0 if pd.isna(spearman) else 2.0 * math.sin(math.pi * spearman / 6.0)
+        return cls(
+            quantiles=np.quantile(observed, QUANTILES) if len(observed) else np.zeros(len(QUANTILES)),
+            null_rate=float(values.isna().mean()),
+            rho=float(rho),
+            decimals=next((d for d in range(3) if len(observed) and (observed == observed.round(d)).mean() >= 0.95), 3),
+        )
+
+    def sample(self, z: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        values = np.interp(_norm_cdf(z), QUANTILES, self.quantiles)
+        values = np.round(values, self.decimals)
+        if self.null_rate:
+            values[rng.random(len(values)) < self.null_rate] = np.nan
+        return values
+
+
+@dataclass
+class Profile:
+    life: dict[str, Marginal]
+    developed_share: float
+    rate: Marginal  # both-sexes rate, rho = correlation with life expectancy
+    low_ratio: np.ndarray  # quantiles of rate_low / rate
+    high_ratio: np.ndarray  # quantiles of rate_high / rate
+    locations: pd.DataFrame  # name, code, region_code, region
+    indicator_code: str
+    indicator: str
+    date_modified: str
+
+
+def fit_profile(life_csv: Path | str, suicide_csv: Path | str) -> Profile:
+    """Fit marginals, null rates and correlations from the real WHO CSVs."""
+    raw_suicide = pd.read_csv(suicide_csv, dtype=str)
+    life = clean_life_frame(pd.read_csv(life_csv, dtype=str))
+    suicide = clean_suicide_frame(raw_suicide)
+    both = suicide[suicide["sex"].str.lower() == "both sexes"]
+    if not len(both):
+        both = suicide
+
+    driver = life["life_expectancy"]
+    marginals = {
+        name: Marginal.fit(life[name], None if name == "life_expectancy" else driver) for name in LIFE_FLOAT_FIELDS
+    }
+    joined = both.merge(life[["country", "year", "life_expectancy"]], on=["country", "year"], how="left")
+    rates = joined["rate"].where(joined["rate"] > 0)
+
+    locations = both.drop_duplicates("country").rename(
+        columns={
+            "country": "name",
+            "spatial_dim_value_code": "code",
+            "parent_location_code": "region_code",
+            "parent_location": "region",
+        }
+    )[["name", "code", "region_code", "region"]].reset_index(drop=True)
+    first = raw_suicide.iloc[0] if len(raw_suicide) else {}
+    return Profile(
+        life=marginals,
+        developed_share=float((life["status"] == "Developed").mean()),
+        rate=Marginal.fit(joined["rate"], joined["life_expectancy"]),
+        low_ratio=np.quantile((joined["rate_low"] / rates).dropna(), QUANTILES),
+        high_ratio=np.quantile((joined["rate_high"] / rates).dropna(), QUANTILES),
+        locations=locations,
+        indicator_code=str(first.get("IndicatorCode", "SDGSUICIDE")),
+        indicator=str(first.get("Indicator", "Crude suicide rates (per 100 000 population)")),
+        date_modified=str(first.get("DateModified", "")),
+    )
+
+
+def _latent(country_part: np.ndarray, years: int, rng: np.random.Generator) -> np.ndarray:
+    """Per-row scores: persistent per-country part (repeated over years) plus yearly noise, unit variance."""
+    noise = rng.standard_normal(len(country_part) * years)
+    return math.sqrt(PERSISTENCE) * np.repeat(country_part, years) + math.sqrt(1 - PERSISTENCE) * noise
+
+
+def _mix(driver: np.ndarray, rho: float, years: int, rng: np.random.Generator) -> np.ndarray:
+    own = _latent(rng.standard_normal(len(driver) // years), years, rng)
+    return rho * driver + math.sqrt(max(0.0, 1 - rho * rho)) * own
+
+
+def _ratio(quantiles: np.ndarray, n: int, rng: np.random.Generator) -> np.ndarray:
+    return np.interp(rng.random(n), QUANTILES, quantiles)
+
+
+def _fmt(values: np.ndarray) -> pd.Series:
+    return pd.Series(values).map("{:.1f}".format)
+
+
+def generate_chunks(
+    profile: Profile,
+    countries: int,
+    years: list[int],
+    sexes: tuple[str, ...],
+    chunk_rows: int,
+    seed: int,
+) -> Iterator[tuple[pd.DataFrame, pd.DataFrame]]:
+    """Yield (life, suicide) frames in the CSV schemas, a block of whole countries at a time."""
+    rng = np.random.default_rng(seed)
+    n_years = len(years)
+    block = max(1, chunk_rows // max(1, n_years * len(sexes)))
+    pool = profile.locations
+    developed_cut = np.quantile(rng.standard_normal(100_000), 1 - profile.developed_share)
+
+    for start in range(0, countries, block):
+        index = np.arange(start, min(countries, start + block))
+        base = {k: v.to_numpy() for k, v in pool.iloc[index % len(pool)].items()}
+        copy = index // len(pool)
+        names = np.where(copy == 0, base["name"], base["name"] + " " + (copy + 1).astype(str).astype(object))
+        codes = np.where(copy == 0, base["code"], "")
+
+        wealth = rng.standard_normal(len(index))
+        z_life = _latent(wealth, n_years, rng)
+        life = pd.DataFrame(
+            {
+                "country": np.repeat(names, n_years),
+                "year": np.tile(np.asarray(years), len(index)),
+                "status": np.repeat(np.where(wealth > developed_cut, "Developed", "Developing"), n_years),
+            }
+        )
+        for name, marginal in profile.life.items():
+            z = z_life if name == "life_expectancy" else _mix(z_life, marginal.rho, n_years, rng)
+            life[name] = marginal.sample(z, rng)
+
+        both = profile.rate.sample(_mix(z_life, profile.rate.rho, n_years, rng), rng)
+        frames = []
+        for sex in sexes:
+            ratio, spread = SEX_RATIOS[sex]
+            per_country = ratio * np.exp(spread * rng.standard_normal(len(index)) - spread * spread / 2)
+            rate = np.round(both * np.repeat(per_country, n_years), 2)
+            low = np.round(rate * _ratio(profile.low_ratio, len(rate), rng), 2)
+            high = np.round(rate * _ratio(profile.high_ratio, len(rate), rng), 2)
+            value = (_fmt(rate) + " [" + _fmt(low) + "-" + _fmt(high) + "]").where(~np.isnan(rate), "")
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "IndicatorCode": profile.indicator_code,
+                        "Indicator": profile.indicator,
+                        "ParentLocationCode": np.repeat(base["region_code"], n_years),
+                        "ParentLocation": np.repeat(base["region"], n_years),
+                        "SpatialDimValueCode": np.repeat(codes, n_years),
+                        "Location": life["country"],
+                        "Location_normalized": life["country"],
+                        "Period": life["year"],
+                        "Dim1": sex,
+                        "FactValueNumeric": rate,
+                        "FactValueNumericLow": low,
+                        "FactValueNumericHigh": high,
+                        "Value": value,
+                        "IsLatestYear": np.where(life["year"] == max(years), "True", "False"),
+                        "DateModified": profile.date_modified,
+                    }
+                )
+            )
+        yield life, pd.concat(frames, ignore_index=True)
+
+
+def write_synthetic(
+    profile: Profile,
+    life_path: Path,
+    suicide_path: Path,
+    countries: int,
+    years: list[int],
+    sexes: tuple[str, ...],
+    chunk_rows: int = 200_000,
+    seed: int = 0,
+) -> tuple[int, int]:
+    """Write both CSVs chunk by chunk; returns (life rows, suicide rows)."""
+    counts = [0, 0]
+    paths = (life_path, suicide_path)
+    for path in paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    with life_path.open("wb") as life_file, suicide_path.open("wb") as suicide_file:
+        for i, frames in enumerate(generate_chunks(profile, countries, years, sexes, chunk_rows, seed)):
+            for n, (f, frame) in enumerate(zip((life_file, suicide_file), frames)):
+                _write_csv(frame, f, header=i == 0)
+                counts[n] += len(frame)
+    return counts[0], counts[1]
+
+
+def _write_csv(frame: pd.DataFrame, f, header: bool) -> None:
+    if pa_csv is not None:
+        options = pa_csv.WriteOptions(include_header=header, quoting_style="needed")
+        pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), f, write_options=options)
+    else:
+        f.write(frame.to_csv(header=header, index=False).encode())
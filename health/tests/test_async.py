@@ -0,0 +1,89 @@
+"""Async insights views: same bodies as the DRF views on every data path."""
+
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from health.models import Country, LifeExpectancy, SuicideMortality
+from health.views import AsyncCorrelation, AsyncCountrySummary, AsyncCountryTimeline, AsyncRiskFlags
+
+VIEWS = {
+    "country-summary": AsyncCountrySummary.as_view(),
+    "country-timeline": AsyncCountryTimeline.as_view(),
+    "risk-flags": AsyncRiskFlags.as_view(),
+    "correlation": AsyncCorrelation.as_view(),
+}
+QUERIES = (
+    ("country-summary", "country=thailand&year=2014"),
+    ("country-summary", "country=Laos&year=2015&sex=male"),
+    ("country-summary", "country=Atlantis"),
+    ("country-summary", ""),
+    ("country-timeline", "country=Brunei&year_min=2009&year_max=2015&sex=MALE"),
+    ("country-timeline", "country=Singapore"),
+    ("risk-flags", "year=2014&min_life=70&min_suicide=5"),
+    ("risk-flags", "year=2015&min_life=80&min_suicide=0&sex=male"),
+    ("correlation", "year_min=2010&year_max=2015"),
+    ("correlation", "pairs=gdp:rate,life_expectancy:rate_low"),
+    ("correlation", "pairs=nope"),
+    ("correlation", "pairs=gdp:rate,life_expectancy:rate&ci=0.9&n_boot=700&seed=3"),
+    ("correlation", "ci=2"),
+)
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_DATASET_VERSION_TTL=60)
+class AsyncInsightsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.factory = AsyncRequestFactory()
+        for i, name in enumerate(["Singapore", "Malaysia", "Thailand", "Laos", "Brunei"]):
+            country = Country.objects.create(name=name)
+            for year in range(2010, 2016):
+                LifeExpectancy.objects.create(
+                    country=country,
+                    year=year,
+                    status="Developing",
+                    life_expectancy=60.0 + 3 * i - (year % 4),
+                    gdp=100.0 * i + year,
+                )
+                SuicideMortality.objects.create(
+                    country=country, year=year, sex="Both sexes", rate=4.0 + 2.5 * i + (year % 3), rate_low=1.0 + i
+                )
+                SuicideMortality.objects.create(country=country, year=year, sex="Male", rate=9.0 + i * 1.7 + year % 2)
+        call_command("refresh_facts", stdout=StringIO())
+
+    def call_async(self, name, query):
+        return async_to_sync(VIEWS[name])(self.factory.get(f"/api/insights/{name}/?{query}"))
+
+    def assert_parity(self):
+        for name, query in QUERIES:
+            with self.subTest(name=name, query=query):
+                expected = self.client.get(f"/api/insights/{name}/?{query}")
+                actual = self.call_async(name, query)
+                self.assertEqual(actual.status_code, expected.status_code)
+                self.assertEqual(actual["Content-Type"], "application/json")
+                self.assertEqual(actual.content, expected.content)
+
+    def test_snapshot_path(self):
+        self.assert_parity()
+
+    @override_settings(HEALTH_COLUMNAR_SNAPSHOT=False)
+    def test_fact_table_path(self):
+        self.assert_parity()
+
+    @override_settings(HEALTH_COLUMNAR_SNAPSHOT=False, HEALTH_FACT_TABLE=False)
+    def test_base_table_path(self):
+        self.assert_parity()
+
+    @override_settings(HEALTH_RESPONSE_CACHE_ENABLED=True)
+    def test_response_cache_and_etag(self):
+        first = self.call_async("risk-flags", "year=2014&min_life=70&min_suicide=5")
+        second = self.call_async("risk-flags", "year=2014&min_life=70&min_suicide=5")
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(first.content, second.content)
+        request = self.factory.get(
+            "/api/insights/risk-flags/?year=2014&min_life=70&min_suicide=5", headers={"If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(async_to_sync(VIEWS["risk-flags"])(request).status_code, 304)
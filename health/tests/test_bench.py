@@ -0,0 +1,86 @@
+"""Benchmark harness tests (route coverage, scale-ups, regression check, one tiny run)."""
+
+import csv
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from health.benchmark import ROUTES, compare, route_names, scale_csvs
+from health.management.commands.bench import Command
+from health.models import LifeExpectancy, SuicideMortality
+
+from .test_loader import LIFE_CSV, SUICIDE_CSV
+
+
+class BenchHarnessTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "life.csv").write_text(LIFE_CSV)
+        (self.dir / "suicide.csv").write_text(SUICIDE_CSV)
+
+    def test_every_route_is_benchmarked(self):
+        self.assertEqual(route_names() - {route.name for route in ROUTES}, set())
+
+    def test_scale_up_renames_countries_per_copy(self):
+        life, suicide = scale_csvs(3, self.dir / "x3", self.dir / "life.csv", self.dir / "suicide.csv")
+        with life.open() as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 3 * 5)
+        self.assertEqual(
+            [r["country"] for r in rows if r["year"] == "2015" and "Singapore" in r["country"]],
+            ["Singapore", "Singapore #1", "Singapore #2"],
+        )
+        self.assertEqual([r["country"] for r in rows].count(""), 3)  # blank names stay blank (dropped on load)
+        with suicide.open() as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(
+            {r["Location_normalized"] for r in rows if r["SpatialDimValueCode"] == "SGP"},
+            {"Singapore", "Singapore #1", "Singapore #2"},
+        )
+
+    def test_compare_flags_relative_regressions_above_noise(self):
+        def result(load, p50):
+            load = {"seconds": load, "peak_rss_mib": 100}
+            return {"scales": {"1": {"load": load, "routes": {"risk-flags": {"p50_ms": p50}}}}}
+
+        self.assertEqual(compare(result(1.0, 2.0), result(1.1, 2.2), threshold=0.25), [])
+        self.assertEqual(compare(result(1.0, 0.1), result(1.0, 0.3), threshold=0.25), [])  # sub-noise change
+        regressions = compare(result(1.0, 2.0), result(2.0, 4.0), threshold=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("x1 load.seconds: 1 -> 2"))
+        self.assertEqual(compare({"scales": {}}, result(2.0, 4.0), threshold=0.25), [])
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaisesMessage(CommandError, "--scales"):
+            call_command("bench", scales="1,x", stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, "Unknown route"):
+            call_command("bench", routes=["nope"], stdout=StringIO())
+
+
+class BenchRunTests(TestCase):
+    def test_benchmark_at_two_scales(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            (tmp / "life.csv").write_text(LIFE_CSV)
+            (tmp / "suicide.csv").write_text(SUICIDE_CSV)
+            options = {"life": tmp / "life.csv", "suicide": tmp / "suicide.csv", "iterations": 2, "warmup": 0}
+            results = Command(stdout=StringIO()).benchmark([1, 2], tmp, options)
+
+        json.dumps(results)
+        self.assertEqual(list(results["scales"]), ["1", "2"])
+        self.assertEqual(results["scales"]["2"]["load"]["life_rows"], 2 * results["scales"]["1"]["load"]["life_rows"])
+        self.assertEqual(LifeExpectancy.objects.count(), results["scales"]["2"]["load"]["life_rows"])
+        self.assertEqual(SuicideMortality.objects.count(), results["scales"]["2"]["load"]["suicide_rows"])
+        for scale in results["scales"].values():
+            self.assertGreater(scale["load"]["peak_rss_mib"], 0)
+            self.assertEqual({r.name for r in ROUTES}, set(scale["routes"]))
+            for name, stats in scale["routes"].items():
+                self.assertEqual(stats["status"], 200, name)
+                self.assertEqual(stats["requests"], 2)
@@ -0,0 +1,87 @@
+"""Response cache tests: hits, conditional requests and version invalidation."""
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from health.caching import normalised_query, response_cache_key
+from health.models import Country, LifeExpectancy, SuicideMortality
+from health.versioning import bump_dataset_version
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        sg = Country.objects.create(name="Singapore")
+        LifeExpectancy.objects.create(country=sg, year=2015, status="Developed", life_expectancy=83.0)
+        SuicideMortality.objects.create(country=sg, year=2015, sex="Both sexes", rate=5.0)
+
+    def test_second_request_is_a_hit_with_same_body(self):
+        first = self.client.get("/api/life-expectancy/?country=Singapore&year_min=2015")
+        second = self.client.get("/api/life-expectancy/?year_min=2015&country=Singapore")
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("Last-Modified", second)
+
+    def test_entries_are_per_scheme_and_host(self):
+        # Paginated bodies embed absolute next/previous links.
+        url = "/api/life-expectancy/"
+        sg = Country.objects.get(name="Singapore")
+        LifeExpectancy.objects.bulk_create(LifeExpectancy(country=sg, year=1900 + i) for i in range(100))
+        a = self.client.get(url, HTTP_HOST="a.example.com")
+        b = self.client.get(url, HTTP_HOST="b.example.com")
+        secure = self.client.get(url, HTTP_HOST="a.example.com", secure=True)
+        self.assertEqual([r["X-Cache"] for r in (a, b, secure)], ["MISS", "MISS", "MISS"])
+        self.assertTrue(b.json()["next"].startswith("http://b.example.com/"))
+        self.assertTrue(secure.json()["next"].startswith("https://a.example.com/"))
+        self.assertNotEqual(a["ETag"], b["ETag"])
+        self.assertEqual(self.client.get(url, HTTP_HOST="b.example.com")["X-Cache"], "HIT")
+
+    @override_settings(HEALTH_DATASET_VERSION_TTL=60)
+    def test_if_none_match_returns_304(self):
+        first = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015")
+        with self.assertNumQueries(0):
+            r = self.client.get(
+                "/api/insights/country-summary/?country=Singapore&year=2015",
+                HTTP_IF_NONE_MATCH=first["ETag"],
+            )
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r.content, b"")
+
+    def test_padded_values_get_their_own_entry(self):
+        factory = RequestFactory()
+        keys = {
+            response_cache_key(factory.get(f"/api/insights/country-summary/?country=Singapore&year=2015&sex={sex}"), "v")
+            for sex in ("Male", "%20Male", "Male%20")
+        }
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(normalised_query(factory.get("/x/?b=2&a=%201&c=&a=0")), "a=+1&a=0&b=2")
+        padded = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015&sex=%20Both%20sexes")
+        plain = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015&sex=Both%20sexes")
+        self.assertEqual((padded["X-Cache"], plain["X-Cache"]), ("MISS", "MISS"))
+        self.assertEqual(plain.json()["suicide_rate"], 5.0)
+
+    def test_wildcard_if_none_match_runs_the_view(self):
+        r = self.client.get("/api/insights/country-summary/?country=Atlantis", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(r.status_code, 404)
+        r = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015", HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(r.status_code, 200)
+
+    def test_reload_invalidates_entries(self):
+        first = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015")
+        LifeExpectancy.objects.filter(country__name="Singapore").update(life_expectancy=84.0)
+        bump_dataset_version()
+
+        r = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["X-Cache"], "MISS")
+        self.assertEqual(r.json()["life_expectancy"], 84.0)
+
+    def test_errors_are_not_cached(self):
+        self.client.get("/api/insights/country-summary/")
+        r = self.client.get("/api/insights/country-summary/")
+        self.assertEqual(r.status_code, 400)
+        self.assertNotIn("X-Cache", r)
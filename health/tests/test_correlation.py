@@ -0,0 +1,212 @@
+"""Correlation endpoint tests (results + query-count regression)."""
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from health.analytics import LIFE_METRICS, SUICIDE_METRICS
+from health.models import Country, LifeExpectancy, SuicideMortality
+
+
+def _seed(n_countries: int) -> None:
+    for i in range(n_countries):
+        c = Country.objects.create(name=f"Country {i:03d}")
+        for year in (2014, 2015):
+            LifeExpectancy.objects.create(
+                country=c, year=year, life_expectancy=60.0 + i + year % 2, gdp=1000.0 * (i % 7) + year
+            )
+            SuicideMortality.objects.create(
+                country=c, year=year, sex="Both sexes", rate=20.0 - i * 0.5, rate_high=25.0 - (i % 5)
+            )
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False)
+class CorrelationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_matches_numpy_corrcoef(self):
+        _seed(6)
+        r = self.client.get("/api/insights/correlation/?year_min=2014&year_max=2015")
+        self.assertEqual(r.status_code, 200)
+        data = r.json()
+
+        xs = np.array([60.5 + i for i in range(6)])
+        ys = np.array([20.0 - i * 0.5 for i in range(6)])
+        self.assertEqual(data["n"], 6)
+        self.assertAlmostEqual(data["correlation"], float(np.corrcoef(xs, ys)[0, 1]))
+
+    def test_multiple_pairs(self):
+        _seed(6)
+        r = self.client.get("/api/insights/correlation/?year_min=2014&year_max=2015&pairs=life_expectancy:rate,gdp:rate_high")
+        self.assertEqual(r.status_code, 200)
+        results = r.json()["results"]
+        self.assertEqual([(p["life_metric"], p["suicide_metric"]) for p in results], [("life_expectancy", "rate"), ("gdp", "rate_high")])
+        self.assertTrue(all(p["n"] == 6 for p in results))
+
+    def test_unknown_metric_rejected(self):
+        r = self.client.get("/api/insights/correlation/?pairs=year:rate")
+        self.assertEqual(r.status_code, 400)
+
+    @override_settings(HEALTH_COLUMNAR_SNAPSHOT=False)
+    def test_query_count_independent_of_country_count(self):
+        _seed(3)
+        with self.assertNumQueries(2):
+            self.client.get("/api/insights/correlation/?year_min=2014&year_max=2015")
+
+        extra = [Country.objects.create(name=f"Extra {i}") for i in range(20)]
+        for c in extra:
+            LifeExpectancy.objects.create(country=c, year=2015, life_expectancy=70.0)
+            SuicideMortality.objects.create(country=c, year=2015, sex="Both sexes", rate=8.0)
+        with self.assertNumQueries(2):
+            self.client.get("/api/insights/correlation/?year_min=2014&year_max=2015&pairs=life_expectancy:rate,gdp:rate_low")
+
+    def test_snapshot_path_matches_database_path(self):
+        _seed(8)
+        url = "/api/insights/correlation/?year_min=2014&year_max=2015&pairs=life_expectancy:rate,gdp:rate_high"
+        with override_settings(HEALTH_COLUMNAR_SNAPSHOT=False):
+            expected = self.client.get(url).json()
+        actual = self.client.get(url).json()
+        for want, got in zip(expected["results"], actual["results"]):
+            self.assertEqual(want["n"], got["n"])
+            self.assertAlmostEqual(want["correlation"], got["correlation"])
+
+    @override_settings(HEALTH_DATASET_VERSION_TTL=60)
+    def test_snapshot_path_skips_database_once_warm(self):
+        _seed(3)
+        self.client.get("/api/insights/correlation/?year_min=2014&year_max=2015")
+        with self.assertNumQueries(0):
+            self.client.get("/api/insights/correlation/?year_min=2014&year_max=2015")
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_DATASET_VERSION_TTL=60)
+class CorrelationMatrixTests(TestCase):
+    url = "/api/insights/correlation-matrix/?year_min=2014&year_max=2015"
+
+    def setUp(self):
+        self.client = APIClient()
+        _seed(8)
+        # Life data only (no suicide rows): still counts for life-vs-life pairs.
+        lone = Country.objects.create(name="Lonely")
+        LifeExpectancy.objects.create(country=lone, year=2015, life_expectancy=50.0, gdp=9000.0, schooling=3.0)
+
+    def frame(self):
+        life = pd.DataFrame.from_records(
+            LifeExpectancy.objects.filter(year__range=(2014, 2015)).values("country_id", *LIFE_METRICS)
+        ).groupby("country_id").mean()
+        suicide = pd.DataFrame.from_records(
+            SuicideMortality.objects.filter(year__range=(2014, 2015), sex="Both sexes").values("country_id", *SUICIDE_METRICS)
+        ).groupby("country_id").mean()
+        return life.join(suicide, how="outer")[[*LIFE_METRICS, *SUICIDE_METRICS]].astype(float)
+
+    def assertMatchesPandas(self, data):
+        frame = self.frame()
+        self.assertEqual(data["metrics"], [*LIFE_METRICS, *SUICIDE_METRICS])
+        self.assertEqual(data["countries"], 9)
+        for method in ("pearson", "spearman"):
+            with self.subTest(method=method):
+                expected = frame.corr(method=method, min_periods=3).to_numpy()
+                actual = np.array(data[method], dtype=float)
+                np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+                np.testing.assert_allclose(actual, expected, atol=1e-6, equal_nan=True)
+        np.testing.assert_array_equal(np.array(data["n"]), frame.notna().astype(int).T.dot(frame.notna().astype(int)))
+
+    def test_matches_pandas_pairwise_on_both_paths(self):
+        r = self.client.get(self.url)
+        self.assertEqual(r.status_code, 200)
+        self.assertMatchesPandas(r.json())
+        self.assertEqual(r.json()["n"][LIFE_METRICS.index("life_expectancy")][LIFE_METRICS.index("gdp")], 9)
+        with override_settings(HEALTH_COLUMNAR_SNAPSHOT=False):
+            self.assertMatchesPandas(self.client.get(self.url).json())
+
+    def test_metric_subset_and_validation(self):
+        data = self.client.get(self.url + "&metrics=rate,gdp,life_expectancy").json()
+        self.assertEqual(data["metrics"], ["life_expectancy", "gdp", "rate"])
+        self.assertEqual(np.array(data["pearson"]).shape, (3, 3))
+        self.assertEqual(data["pearson"][0][0], 1.0)
+        self.assertEqual(self.client.get(self.url + "&metrics=gdp,nope").status_code, 400)
+        self.assertEqual(self.client.get(self.url + "&metrics=gdp").status_code, 400)
+        self.assertEqual(self.client.get("/api/insights/correlation-matrix/?year_min=abc").status_code, 400)
+        self.assertEqual(self.client.get("/api/insights/correlation-matrix/?year_max=2015.5").status_code, 400)
+
+    @override_settings(HEALTH_COLUMNAR_SNAPSHOT=False)
+    def test_memoised_per_version(self):
+        first = self.client.get(self.url).json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).json(), first)
+        with self.assertNumQueries(2):
+            self.client.get(self.url + "&sex=Male")
+
+        SuicideMortality.objects.filter(country__name="Country 000").delete()  # bumps the dataset version
+        with self.assertNumQueries(2):  # the bump refreshed the local version token: only the recompute
+            self.assertNotEqual(self.client.get(self.url).json(), first)
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False)
+class BootstrapTests(TestCase):
+    url = "/api/insights/correlation/?year_min=2014&year_max=2015&pairs=gdp:rate,life_expectancy:rate"
+
+    def setUp(self):
+        self.client = APIClient()
+        _seed(12)
+
+    def get(self, query):
+        r = self.client.get(f"{self.url}&{query}")
+        self.assertEqual(r.status_code, 200, r.content)
+        return r.json()
+
+    def test_intervals_per_pair(self):
+        data = self.get("ci=0.9&n_boot=1200&seed=5")
+        self.assertEqual(data["resampling"], {"n_boot": 1200, "seed": 5, "workers": 1, "complete": True})
+        self.assertEqual(data["ci"], data["results"][0]["ci"])
+        gdp, life = data["results"]
+        self.assertEqual(gdp["ci"]["level"], 0.9)
+        self.assertEqual(gdp["permutation"]["permutations"], 1200)
+        self.assertLessEqual(gdp["ci"]["low"], gdp["correlation"])
+        self.assertGreaterEqual(gdp["ci"]["high"], gdp["correlation"])
+        self.assertLess(gdp["permutation"]["null_low"], 0)
+        self.assertGreater(gdp["permutation"]["null_high"], 0)
+        # Life expectancy and rate are exactly linear: every resample agrees, no permutation gets as far.
+        self.assertEqual((life["ci"]["low"], life["ci"]["high"]), (-1.0, -1.0))
+        self.assertEqual(life["permutation"]["p_value"], round(1 / 1201, 6))
+
+    def test_seeded_and_matches_a_plain_loop(self):
+        first = self.get("n_boot=300&seed=1")
+        self.assertEqual(first, self.get("n_boot=300&seed=1"))
+        self.assertNotEqual(first["ci"], self.get("n_boot=300&seed=2")["ci"])
+        self.assertEqual(first["ci"]["level"], 0.95)
+
+        # Same draws as the batched version, one resample at a time.
+        xs = np.array([1000.0 * (i % 7) + 2014.5 for i in range(12)])
+        ys = np.array([20.0 - i * 0.5 for i in range(12)])
+        rng = np.random.default_rng(np.random.SeedSequence((1, 0, 0, 0)))
+        index = rng.integers(0, 12, size=(300, 12))
+        loop = [np.corrcoef(xs[row], ys[row])[0, 1] for row in index]
+        low, high = np.quantile([r for r in loop if np.isfinite(r)], [0.025, 0.975])
+        self.assertAlmostEqual(first["ci"]["low"], low, places=6)
+        self.assertAlmostEqual(first["ci"]["high"], high, places=6)
+
+    @override_settings(HEALTH_BOOTSTRAP_WORKERS=2, HEALTH_BOOTSTRAP_PARALLEL_MIN=1)
+    def test_process_pool_gives_the_same_numbers(self):
+        parallel = self.get("n_boot=1100&seed=4")
+        self.assertEqual(parallel["resampling"]["workers"], 2)
+        with override_settings(HEALTH_BOOTSTRAP_WORKERS=0):
+            serial = self.get("n_boot=1100&seed=4")
+        self.assertEqual(parallel["results"], serial["results"])
+
+    @override_settings(HEALTH_BOOTSTRAP_TIME_BUDGET=0)
+    def test_time_budget_cuts_the_run_short(self):
+        data = self.get("n_boot=5000")
+        self.assertFalse(data["resampling"]["complete"])
+        self.assertEqual(data["ci"]["resamples"], 0)
+        self.assertIsNone(data["ci"]["low"])
+        self.assertIsNone(data["permutation"]["p_value"])
+        self.assertIsNotNone(data["correlation"])
+
+    @override_settings(HEALTH_BOOTSTRAP_MAX_RESAMPLES=1000)
+    def test_rejects_bad_parameters(self):
+        for query in ("ci=1.5", "ci=x", "n_boot=0", "n_boot=1001", "n_boot=10&seed=-1"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"{self.url}&{query}").status_code, 400)
+        self.assertNotIn("ci", self.client.get(self.url).json())
@@ -0,0 +1,108 @@
+"""Country resolver tests: normalised keys, aliases, ISO3 and list filtering."""
+
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from health.countries import get_resolver
+from health.models import Country, LifeExpectancy, SuicideMortality, country_key
+from health.views import AsyncCountrySummary, AsyncCountryTimeline
+
+
+class CountryKeyTests(TestCase):
+    def test_normalisation(self):
+        self.assertEqual(country_key("Côte d'Ivoire"), country_key("cote d’ivoire"))
+        self.assertEqual(country_key("Viet Nam"), country_key("Vietnam"))
+        self.assertEqual(country_key("Türkiye"), "turkiye")
+
+    def test_save_sets_key(self):
+        self.assertEqual(Country.objects.create(name="Viet Nam").name_key, "vietnam")
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_DATASET_VERSION_TTL=60)
+class CountryResolverTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.turkey = Country.objects.create(name="Turkey")
+        self.turkiye = Country.objects.create(name="Türkiye", iso3="TUR")
+        self.viet = Country.objects.create(name="Viet Nam", iso3="VNM")
+        self.niger = Country.objects.create(name="Niger")
+        self.nigeria = Country.objects.create(name="Nigeria")
+        LifeExpectancy.objects.create(country=self.turkey, year=2015, life_expectancy=75.5)
+        LifeExpectancy.objects.create(country=self.viet, year=2015, life_expectancy=76.0)
+        SuicideMortality.objects.create(country=self.turkiye, year=2015, sex="Both sexes", rate=2.6)
+        SuicideMortality.objects.create(country=self.nigeria, year=2015, sex="Both sexes", rate=3.5)
+
+    def test_lookup_by_name_alias_and_iso3(self):
+        resolver = get_resolver()
+        self.assertEqual(resolver.resolve("  VIETNAM "), self.viet.id)
+        self.assertEqual(resolver.resolve("vnm"), self.viet.id)
+        self.assertEqual(resolver.resolve("Turkey"), self.turkey.id)
+        self.assertEqual(resolver.resolve("turkiye"), self.turkiye.id)
+        self.assertEqual(resolver.lookup("TUR"), [self.turkiye.id, self.turkey.id])
+        self.assertIsNone(resolver.resolve("Atlantis"))
+
+    def test_search_keeps_substring_semantics(self):
+        self.assertEqual(get_resolver().search("niger"), [self.niger.id, self.nigeria.id])
+
+    def test_rebuilt_after_country_change(self):
+        self.assertIsNone(get_resolver().resolve("Laos"))
+        Country.objects.create(name="Lao People's Democratic Republic")
+        self.assertIsNotNone(get_resolver().resolve("Laos"))
+
+    def test_list_filter_matches_alias_group_by_id(self):
+        get_resolver()  # warm
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get("/api/suicide-mortality/?country=Turkey")
+        self.assertEqual([row["country"]["name"] for row in r.json()["results"]], ["Türkiye"])
+        count_sql = ctx.captured_queries[0]["sql"]
+        self.assertIn('"country_id" IN', count_sql)
+        self.assertNotIn('"health_country"."name"', count_sql)
+
+    def test_insights_accept_aliases_on_both_paths(self):
+        for snapshot in (True, False):
+            with self.subTest(snapshot=snapshot), override_settings(HEALTH_COLUMNAR_SNAPSHOT=snapshot):
+                body = self.client.get("/api/insights/country-summary/?country=vietnam&year=2015").json()
+                self.assertEqual((body["country"], body["life_expectancy"]), ("Viet Nam", 76.0))
+                body = self.client.get("/api/insights/country-timeline/?country=VNM&year_min=2015").json()
+                self.assertEqual(body["country"], "Viet Nam")
+
+    def test_insights_merge_the_alias_group_on_every_path(self):
+        # Life rows are stored under "Turkey", suicide rows under "Türkiye".
+        call_command("refresh_facts", stdout=StringIO())
+        paths = {
+            "snapshot": {},
+            "facts": {"HEALTH_COLUMNAR_SNAPSHOT": False},
+            "base": {"HEALTH_COLUMNAR_SNAPSHOT": False, "HEALTH_FACT_TABLE": False},
+        }
+        factory = AsyncRequestFactory()
+        for path, options in paths.items():
+            for name in ("Turkey", "Türkiye", "TUR"):
+                with self.subTest(path=path, name=name), override_settings(**options):
+                    summary = f"/api/insights/country-summary/?country={name}&year=2015"
+                    timeline = f"/api/insights/country-timeline/?country={name}&year_min=2015&year_max=2015"
+                    body = self.client.get(summary).json()
+                    self.assertEqual((body["life_expectancy"], body["suicide_rate"]), (75.5, 2.6))
+                    results = self.client.get(timeline).json()["results"]
+                    self.assertEqual(results, [{"year": 2015, "life_expectancy": 75.5, "suicide_rate": 2.6}])
+                    batch = self.client.get(
+                        f"/api/insights/country-timelines/?countries={name}&year_min=2015&year_max=2015"
+                    )
+                    self.assertEqual(batch.json()["results"][0]["results"], results)
+                    self.assertEqual(
+                        async_to_sync(AsyncCountrySummary.as_view())(factory.get(summary)).content,
+                        self.client.get(summary).content,
+                    )
+                    self.assertEqual(
+                        async_to_sync(AsyncCountryTimeline.as_view())(factory.get(timeline)).content,
+                        self.client.get(timeline).content,
+                    )
+        body = self.client.get("/api/insights/country-summary/?country=Türkiye&year=2015").json()
+        self.assertEqual(body["country"], "Türkiye")
+        rank = self.client.get("/api/life-expectancy/top/?year=2015&country=Türkiye").json()
+        self.assertEqual((rank["country"], rank["life_expectancy"]), ("Turkey", 75.5))
@@ -0,0 +1,70 @@
+"""SQLite pragma and read-replica router tests."""
+
+import tempfile
+from pathlib import Path
+
+from django.db import transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from health.db import ReadReplicaRouter
+from health.models import CountryYearFact, LifeExpectancy, Note
+
+PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -8192, "temp_store": "MEMORY"}
+
+
+@override_settings(HEALTH_SQLITE_PRAGMAS=PRAGMAS)
+class SqlitePragmaTests(SimpleTestCase):
+    def open(self, name):
+        handler = ConnectionHandler({"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": name}})
+        conn = DatabaseWrapper(handler.settings["default"], alias="pragma_test")
+        self.addCleanup(conn.close)
+        return conn
+
+    def pragma(self, conn, name):
+        with conn.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = self.open(str(Path(tmp) / "db.sqlite3"))
+            self.assertEqual(self.pragma(conn, "journal_mode"), "wal")
+            self.assertEqual(self.pragma(conn, "synchronous"), 1)
+            self.assertEqual(self.pragma(conn, "cache_size"), -8192)
+            self.assertEqual(self.pragma(conn, "temp_store"), 2)
+            conn.close()
+
+    def test_read_only_connection_skips_file_pragmas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "db.sqlite3"
+            with override_settings(HEALTH_SQLITE_PRAGMAS={}):
+                writer = self.open(str(path))
+                with writer.cursor() as cursor:
+                    cursor.execute("CREATE TABLE t (x)")
+                writer.close()
+            reader = self.open(f"file:{path}?mode=ro")
+            self.assertEqual(self.pragma(reader, "journal_mode"), "delete")
+            self.assertEqual(self.pragma(reader, "cache_size"), -8192)
+            reader.close()
+
+
+class ReadReplicaRouterTests(SimpleTestCase):
+    router = ReadReplicaRouter()
+
+    def test_dataset_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(LifeExpectancy), "replica")
+        self.assertEqual(self.router.db_for_read(CountryYearFact), "replica")
+        self.assertIsNone(self.router.db_for_read(Note))
+        self.assertEqual(self.router.db_for_write(LifeExpectancy), "default")
+
+    def test_replica_is_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica", "health"))
+        self.assertTrue(self.router.allow_migrate("default", "health"))
+
+
+class ReadReplicaRouterTransactionTests(TestCase):
+    def test_reads_inside_a_write_transaction_stay_on_default(self):
+        with transaction.atomic():
+            self.assertIsNone(ReadReplicaRouter().db_for_read(LifeExpectancy))
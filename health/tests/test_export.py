@@ -0,0 +1,84 @@
+"""Streaming export endpoint tests."""
+
+import csv
+import io
+import json
+import unittest
+
+from django.test import TestCase, override_settings
+
+from health.export import arrow_available
+from health.models import Country, LifeExpectancy, SuicideMortality
+from health.versioning import bump_dataset_version
+
+
+@override_settings(HEALTH_EXPORT_CHUNK_SIZE=7)
+class ExportTests(TestCase):
+    def setUp(self):
+        countries = Country.objects.bulk_create([Country(name=f"Country {i:02d}") for i in range(4)])
+        LifeExpectancy.objects.bulk_create(
+            [
+                LifeExpectancy(country=c, year=2000 + y, status="Developing", life_expectancy=60.0 + y)
+                for c in countries
+                for y in range(5)
+            ]
+        )
+        SuicideMortality.objects.bulk_create(
+            [SuicideMortality(country=c, year=2000 + y, sex="Both sexes", rate=float(y)) for c in countries for y in range(3)]
+        )
+        bump_dataset_version()  # bulk_create skips the signals, as in load_who_data
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_csv_streams_every_row_in_order(self):
+        r = self.client.get("/api/export/life-expectancy/")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.streaming)
+        self.assertTrue(r["Content-Type"].startswith("text/csv"))
+        self.assertIn('filename="life-expectancy.csv"', r["Content-Disposition"])
+
+        rows = list(csv.DictReader(io.StringIO(self.body(r).decode("utf-8"))))
+        self.assertEqual(len(rows), 20)
+        self.assertEqual((rows[0]["country"], rows[0]["year"]), ("Country 00", "2000"))
+        self.assertEqual((rows[-1]["country"], rows[-1]["year"]), ("Country 03", "2004"))
+        self.assertEqual(float(rows[6]["life_expectancy"]), 61.0)
+
+    def test_ndjson_applies_list_filters(self):
+        r = self.client.get("/api/export/suicide-mortality/?format=ndjson&country=Country 02&year_min=2001")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in self.body(r).decode("utf-8").splitlines()]
+        self.assertEqual([(row["country"], row["year"]) for row in rows], [("Country 02", 2001), ("Country 02", 2002)])
+        self.assertEqual(rows[0]["rate"], 1.0)
+        self.assertIs(rows[0]["is_latest_year"], False)
+
+    def test_unknown_dataset_and_format(self):
+        self.assertEqual(self.client.get("/api/export/nope/").status_code, 404)
+        self.assertEqual(self.client.get("/api/export/life-expectancy/?format=xlsx").status_code, 400)
+
+    def test_invalid_filter_returns_errors(self):
+        r = self.client.get("/api/export/life-expectancy/?year_min=abc")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("year_min", r.json()["error"])
+
+    @unittest.skipUnless(arrow_available(), "pyarrow not installed")
+    def test_parquet_round_trip(self):
+        import pyarrow.parquet as pq
+
+        r = self.client.get("/api/export/life-expectancy/?format=parquet&year_min=2003&year_max=2003")
+        self.assertEqual(r.status_code, 200)
+        table = pq.read_table(io.BytesIO(self.body(r)))
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(table.column("life_expectancy").to_pylist(), [63.0] * 4)
+
+    @unittest.skipUnless(arrow_available(), "pyarrow not installed")
+    def test_arrow_stream_round_trip(self):
+        import pyarrow as pa
+
+        r = self.client.get("/api/export/suicide-mortality/?format=arrow")
+        self.assertEqual(r.status_code, 200)
+        table = pa.ipc.open_stream(io.BytesIO(self.body(r))).read_all()
+        self.assertEqual(table.num_rows, 12)
+        self.assertEqual(table.schema.field("rate").type, pa.float64())
@@ -0,0 +1,87 @@
+"""CountryYearFact tests: parity with the base-table paths and staleness."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from health.countries import get_resolver
+from health.facts import facts_enabled, sex_label
+from health.models import Country, CountryYearFact, LifeExpectancy, SuicideMortality
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_COLUMNAR_SNAPSHOT=False, HEALTH_DATASET_VERSION_TTL=60)
+class FactTableTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i, name in enumerate(["Singapore", "Malaysia", "Thailand", "Laos", "Brunei"]):
+            country = Country.objects.create(name=name)
+            for year in range(2010, 2016):
+                if not (i == 2 and year == 2012):
+                    LifeExpectancy.objects.create(
+                        country=country, year=year, status="Developing", life_expectancy=55.0 + 3 * i + 0.1 * year % 7
+                    )
+                if i != 4:
+                    SuicideMortality.objects.create(
+                        country=country, year=year, sex="Both sexes", rate=4.0 + 2.5 * i + (year % 3), rate_low=1.0 + i,
+                        parent_location="Western Pacific",
+                    )
+                    if year > 2013:
+                        SuicideMortality.objects.create(country=country, year=year, sex="Male", rate=9.0 + i * 1.7 + year % 2)
+        out = StringIO()
+        call_command("refresh_facts", stdout=out)
+        self.assertIn("Built 60 country-year facts", out.getvalue())
+
+    def assertSamePaths(self, url):
+        self.assertTrue(facts_enabled())
+        with override_settings(HEALTH_FACT_TABLE=False):
+            expected = self.client.get(url)
+        actual = self.client.get(url)
+        self.assertEqual(expected.status_code, actual.status_code)
+        self.assertEqual(expected.json(), actual.json())
+
+    def test_insights_parity(self):
+        for url in (
+            "/api/insights/country-summary/?country=Thailand&year=2012",
+            "/api/insights/country-summary/?country=brunei&year=2015",
+            "/api/insights/country-summary/?country=Laos&year=2014&sex=male",
+            "/api/insights/country-summary/?country=Laos&year=2014&sex=Other",
+            "/api/insights/country-timeline/?country=Thailand&year_min=2009&year_max=2015&sex=MALE",
+            "/api/insights/country-timeline/?country=Brunei",
+            "/api/insights/risk-flags/?year=2014&min_life=70&min_suicide=5",
+            "/api/insights/risk-flags/?year=2015&min_life=80&min_suicide=0&sex=male",
+            "/api/insights/risk-flags/?year=2015&sex=nobody",
+            "/api/insights/correlation/?year_min=2010&year_max=2015",
+            "/api/insights/correlation/?year_min=2014&year_max=2015&sex=Male&pairs=life_expectancy:rate,life_expectancy:rate_low",
+            "/api/insights/correlation/?pairs=gdp:rate",
+        ):
+            with self.subTest(url=url):
+                self.assertSamePaths(url)
+
+    def test_risk_flags_is_one_query(self):
+        get_resolver(), sex_label("Both sexes")  # per-version lookups, built once
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get("/api/insights/risk-flags/?year=2014&min_life=70&min_suicide=5")
+        self.assertEqual(r.status_code, 200)
+        self.assertGreater(r.json()["count"], 0)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn("health_countryyearfact", ctx.captured_queries[0]["sql"])
+
+    def test_dense_rows_per_sex(self):
+        self.assertEqual(CountryYearFact.objects.filter(country__name="Brunei").count(), 12)
+        fact = CountryYearFact.objects.get(country__name="Brunei", year=2015, sex="Male")
+        self.assertIsNotNone(fact.life_expectancy)
+        self.assertIsNone(fact.rate)
+
+    def test_edits_make_facts_stale(self):
+        row = LifeExpectancy.objects.get(country__name="Singapore", year=2015)
+        row.life_expectancy = 99.0
+        row.save()
+        self.assertFalse(facts_enabled())
+        body = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015").json()
+        self.assertEqual(body["life_expectancy"], 99.0)
+        call_command("refresh_facts", stdout=StringIO())
+        self.assertTrue(facts_enabled())
@@ -0,0 +1,220 @@
+"""load_who_data command tests (chunked, vectorised ingestion)."""
+
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import unittest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from health.facts import build_fact_rows
+from health.models import Country, CountryYearFact, LifeExpectancy, RegionYearAggregate, SuicideMortality
+from health.pgcopy import copy_supported
+from health.regions import build_region_rows
+from health.versioning import DERIVED_TABLES, current_dataset_version, derived_current
+
+LIFE_CSV = """country,year,status,life_expectancy,adult_mortality,infant_deaths,alcohol,percentage_expenditure,hepatitis_b,measles,bmi,under_five_deaths,polio,total_expenditure,diphtheria,hiv_aids,gdp,population,thinness_1_19_years,thinness_5_9_years,income_composition_of_resources,schooling
+Singapore,2015,Developed,83.1,55,0,2.0,,,0,,0,96,,96,0.1,55000.5,,2.1,2.0,0.91,15.4
+Singapore,2014,Developed,n/a,56,0,2.0,,,0,,0,96,,96,0.1,54000,,2.1,2.0,0.91,15.4
+ Malaysia ,2015.0,Developing,75.0,120,3,1.0,,,0,,0,98,,98,0.1,9000,30000000,8.0,8.1,0.78,13.1
+,2015,Developing,70,,,,,,,,,,,,,,,,,,
+Brunei,,Developing,77,,,,,,,,,,,,,,,,,,
+"""
+
+SUICIDE_CSV = """IndicatorCode,Indicator,ParentLocationCode,ParentLocation,SpatialDimValueCode,Location,Location_normalized,Period,Dim1,FactValueNumeric,FactValueNumericLow,FactValueNumericHigh,Value,IsLatestYear,DateModified
+SDGSUICIDE,Crude suicide rates,WPR,Western Pacific,SGP,Singapore,Singapore,2015,Both sexes,8.72,8.03,10.24,8.7 [8.0-10.2],False,2025-01-09
+SDGSUICIDE,Crude suicide rates,WPR,Western Pacific,MYS,Malaysia,Malaysia,2015,Both sexes,5.5,,,5.5,True,2025-01-09
+SDGSUICIDE,Crude suicide rates,WPR,Western Pacific,BRN,Brunei,Brunei,2015,Both sexes,x,,,,,
+"""
+
+
+class LoadWhoDataTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.life = Path(self.tmp.name) / "life.csv"
+        self.suicide = Path(self.tmp.name) / "suicide.csv"
+        self.life.write_text(LIFE_CSV)
+        self.suicide.write_text(SUICIDE_CSV)
+
+    def load(self, **options):
+        out = StringIO()
+        call_command("load_who_data", life=str(self.life), suicide=str(self.suicide), stdout=out, **options)
+        return out.getvalue()
+
+    def test_cleans_and_loads_in_small_chunks(self):
+        output = self.load(chunk_size=2, batch_size=1)
+
+        self.assertEqual(sorted(Country.objects.values_list("name", flat=True)), ["Brunei", "Malaysia", "Singapore"])
+        self.assertEqual(LifeExpectancy.objects.count(), 3)
+        self.assertEqual(SuicideMortality.objects.count(), 3)
+
+        sg = LifeExpectancy.objects.get(country__name="Singapore", year=2015)
+        self.assertEqual(sg.gdp, 55000.5)
+        self.assertIsNone(sg.population)
+        self.assertIsNone(LifeExpectancy.objects.get(country__name="Singapore", year=2014).life_expectancy)
+        self.assertEqual(LifeExpectancy.objects.get(country__name="Malaysia").year, 2015)
+
+        brunei = SuicideMortality.objects.get(country__name="Brunei")
+        self.assertIsNone(brunei.rate)
+        self.assertFalse(brunei.is_latest_year)
+        self.assertTrue(SuicideMortality.objects.get(country__name="Malaysia").is_latest_year)
+        self.assertIn("Timing summary:", output)
+
+    def test_sets_country_keys_and_iso3(self):
+        self.load()
+        self.assertEqual(
+            dict(Country.objects.values_list("name", "iso3")), {"Brunei": "BRN", "Malaysia": "MYS", "Singapore": "SGP"}
+        )
+        self.assertEqual(Country.objects.get(name="Singapore").name_key, "singapore")
+
+    def test_reload_writes_only_changed_iso3_codes(self):
+        def country_updates():
+            with CaptureQueriesContext(connection) as ctx:
+                self.load()
+            return [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('UPDATE "health_country"')]
+
+        self.load()
+        self.assertEqual(country_updates(), [])
+        Country.objects.filter(name="Malaysia").update(iso3="XXX")
+        (update,) = country_updates()
+        self.assertEqual(update.count(" WHEN "), 1)
+        self.assertEqual(Country.objects.get(name="Malaysia").iso3, "MYS")
+
+    def test_copy_flag_warns_without_postgres(self):
+        if copy_supported():
+            self.skipTest("COPY is available on this database")
+        err = StringIO()
+        call_command(
+            "load_who_data", life=str(self.life), suicide=str(self.suicide), copy=True, stdout=StringIO(), stderr=err
+        )
+        self.assertIn("--copy needs PostgreSQL", err.getvalue())
+        self.assertEqual(LifeExpectancy.objects.count(), 3)
+
+    def test_reload_is_idempotent(self):
+        self.load()
+        self.load(chunk_size=1)
+        self.assertEqual(LifeExpectancy.objects.count(), 3)
+        self.assertEqual(SuicideMortality.objects.count(), 3)
+
+    def test_upsert_updates_only_changed_rows(self):
+        self.load()
+        stale = LifeExpectancy.objects.get(country__name="Singapore", year=2015)
+
+        self.life.write_text(LIFE_CSV.replace("Singapore,2015,Developed,83.1", "Singapore,2015,Developed,83.6"))
+        self.suicide.write_text(SUICIDE_CSV + "SDGSUICIDE,Crude suicide rates,WPR,Western Pacific,SGP,Singapore,Singapore,2015,Male,11.0,,,11.0,False,2025-01-09\n")
+        output = self.load(upsert=True, chunk_size=2)
+
+        self.assertIn("LifeExpectancy: inserted=0 updated=1 unchanged=2", output)
+        self.assertIn("SuicideMortality: inserted=1 updated=0 unchanged=3", output)
+        fresh = LifeExpectancy.objects.get(country__name="Singapore", year=2015)
+        self.assertEqual(fresh.pk, stale.pk)
+        self.assertEqual(fresh.life_expectancy, 83.6)
+        self.assertEqual(SuicideMortality.objects.count(), 4)
+
+    def test_unchanged_upsert_keeps_version_and_derived_tables(self):
+        self.load()
+        version = current_dataset_version()
+        facts = list(CountryYearFact.objects.values_list("id", flat=True))
+
+        output = self.load(upsert=True)
+
+        self.assertIn("No rows changed", output)
+        self.assertNotIn("ranks", output.split("Timing summary:")[1])
+        self.assertEqual(current_dataset_version(), version)
+        self.assertEqual(list(CountryYearFact.objects.values_list("id", flat=True)), facts)
+        self.assertTrue(all(derived_current(name) for name in DERIVED_TABLES))
+
+    def test_upsert_refreshes_touched_countries_and_years(self):
+        self.load()
+        untouched = list(CountryYearFact.objects.filter(country__name="Malaysia").values_list("id", flat=True))
+        other_year = list(RegionYearAggregate.objects.filter(year=2014).values_list("id", flat=True))
+        self.assertTrue(untouched and other_year)
+
+        self.life.write_text(LIFE_CSV.replace("Singapore,2015,Developed,83.1", "Singapore,2015,Developed,83.6"))
+        self.load(upsert=True)
+
+        self.assertTrue(all(derived_current(name) for name in DERIVED_TABLES))
+        malaysia = CountryYearFact.objects.filter(country__name="Malaysia")
+        self.assertEqual(list(malaysia.values_list("id", flat=True)), untouched)
+        self.assertEqual(list(RegionYearAggregate.objects.filter(year=2014).values_list("id", flat=True)), other_year)
+        fact_fields = ["country_id", "year", "sex", "life_expectancy", "status", "rate", "parent_location"]
+        self.assertEqual(
+            sorted(CountryYearFact.objects.values_list(*fact_fields)),
+            sorted(tuple(getattr(row, f) for f in fact_fields) for row in build_fact_rows()),
+        )
+        region_fields = ["region_code", "year", "metric", "countries", "mean", "max_country_id"]
+        self.assertEqual(
+            sorted(RegionYearAggregate.objects.values_list(*region_fields)),
+            sorted(tuple(getattr(row, f) for f in region_fields) for row in build_region_rows()),
+        )
+        self.assertEqual(CountryYearFact.objects.get(country__name="Singapore", year=2015).life_expectancy, 83.6)
+
+    def test_plain_reload_keeps_stale_values(self):
+        self.load()
+        self.life.write_text(LIFE_CSV.replace("Singapore,2015,Developed,83.1", "Singapore,2015,Developed,83.6"))
+        self.load()
+        self.assertEqual(LifeExpectancy.objects.get(country__name="Singapore", year=2015).life_expectancy, 83.1)
+
+    def test_directory_and_glob_shards_with_workers(self):
+        shards = Path(self.tmp.name) / "shards"
+        shards.mkdir()
+        header, *rows = LIFE_CSV.splitlines()
+        for i, row in enumerate(rows):
+            (shards / f"life-{i}.csv").write_text(f"{header}\n{row}\n")
+        regions = Path(self.tmp.name) / "regions"
+        regions.mkdir()
+        (regions / "suicide-a.csv").write_text(SUICIDE_CSV)
+
+        out = StringIO()
+        call_command(
+            "load_who_data",
+            life=[str(shards / "life-*.csv")],
+            suicide=[str(regions)],
+            workers=2,
+            stdout=out,
+        )
+        self.assertEqual(LifeExpectancy.objects.count(), 3)
+        self.assertEqual(SuicideMortality.objects.count(), 3)
+        self.assertIn("rows/s", out.getvalue())
+
+    def test_missing_shard_pattern_reports_error(self):
+        err = StringIO()
+        call_command("load_who_data", life=[str(Path(self.tmp.name) / "nope-*.csv")], suicide=[str(self.suicide)], stderr=err)
+        self.assertIn("Life CSV not found", err.getvalue())
+        self.assertEqual(LifeExpectancy.objects.count(), 0)
+
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "COPY path needs PostgreSQL (set HEALTH_TEST_DATABASE_URL)")
+@override_settings(HEALTH_PG_COPY=True)
+class CopyLoadTests(LoadWhoDataTests):
+    """Re-runs the loader tests above through COPY and checks it matches bulk_create."""
+
+    def rows(self):
+        life = LifeExpectancy.objects.order_by("country__name", "year").values_list(
+            "country__name", "year", "status", "life_expectancy", "gdp", "population"
+        )
+        suicide = SuicideMortality.objects.order_by("country__name", "sex").values_list(
+            "country__name", "sex", "rate", "value_text", "is_latest_year", "date_modified"
+        )
+        return list(life), list(suicide)
+
+    def test_copy_matches_bulk_create(self):
+        self.load(no_copy=True)
+        expected = self.rows()
+        LifeExpectancy.objects.all().delete()
+        SuicideMortality.objects.all().delete()
+        self.load()
+        self.assertEqual(self.rows(), expected)
+
+    def test_postgres_indexes_exist(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE indexname LIKE %s", ["%_brin_idx"])
+            self.assertEqual(sorted(r[0] for r in cursor.fetchall()), ["life_year_brin_idx", "suicide_year_brin_idx"])
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", ["country_name_trgm_idx"])
+            self.assertIn("gin_trgm_ops", cursor.fetchone()[0])
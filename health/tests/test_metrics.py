@@ -0,0 +1,69 @@
+"""PerformanceMiddleware / Prometheus metrics tests."""
+
+import re
+
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from health.metrics import registry
+from health.models import Country, LifeExpectancy, SuicideMortality
+
+SERVER_TIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=([\d.]+), total;dur=([\d.]+)')
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_COLUMNAR_SNAPSHOT=False, HEALTH_FACT_TABLE=False)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        country = Country.objects.create(name="Japan")
+        LifeExpectancy.objects.create(country=country, year=2015, life_expectancy=83.7)
+        SuicideMortality.objects.create(country=country, year=2015, sex="Both sexes", rate=15.3)
+
+    def timing(self, response):
+        match = SERVER_TIMING.fullmatch(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        return int(match.group(1)), float(match.group(2)), float(match.group(3))
+
+    def test_server_timing_counts_queries_and_serialization(self):
+        self.client.get("/api/insights/country-summary/?country=Japan&year=2015")  # warm the resolver
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get("/api/insights/country-summary/?country=Japan&year=2015")
+        queries, serialize, total = self.timing(r)
+        self.assertEqual(queries, len(ctx.captured_queries))
+        self.assertGreater(serialize, 0)
+        self.assertGreaterEqual(total, serialize)
+
+    def test_prometheus_exposition(self):
+        for _ in range(3):
+            self.client.get("/api/insights/country-summary/?country=Japan&year=2015")
+        self.client.get("/api/insights/country-summary/")
+        body = self.client.get("/api/metrics/")
+        self.assertTrue(body["Content-Type"].startswith("text/plain; version=0.0.4"))
+        text = body.content.decode()
+        self.assertIn('health_requests_total{view="country-summary",method="GET",status="200"} 3', text)
+        self.assertIn('health_requests_total{view="country-summary",method="GET",status="400"} 1', text)
+        self.assertIn('health_request_duration_seconds_bucket{view="country-summary",method="GET",le="+Inf"} 4', text)
+        self.assertIn('health_request_duration_seconds_count{view="country-summary",method="GET"} 4', text)
+        self.assertRegex(text, r'health_db_queries_total\{view="country-summary",method="GET"\} [1-9]')
+        self.assertRegex(text, r'health_response_bytes_total\{view="country-summary",method="GET"\} [1-9]')
+
+    def test_histogram_buckets_are_cumulative(self):
+        self.client.get("/api/countries/")
+        text = self.client.get("/api/metrics/").content.decode()
+        counts = [int(c) for c in re.findall(r'health_request_duration_seconds_bucket\{view="countries-list".*\} (\d+)', text)]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], 1)
+
+    async def test_async_stack(self):
+        r = await AsyncClient().get("/api/insights/country-timeline/?country=Japan&year_min=2015")
+        queries, _, _ = self.timing(r)
+        self.assertGreater(queries, 0)
+
+    @override_settings(HEALTH_METRICS_ENABLED=False)
+    def test_disabled_removes_middleware(self):
+        r = APIClient().get("/api/countries/")
+        self.assertNotIn("Server-Timing", r)
+        self.assertEqual(APIClient().get("/api/metrics/").content, b"")
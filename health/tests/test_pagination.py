@@ -0,0 +1,112 @@
+"""Keyset pagination tests."""
+
+import base64
+import json
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from health.models import Country, LifeExpectancy, SuicideMortality
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False)
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        # Created in reverse name order so the key order (country id) differs from the name order.
+        countries = Country.objects.bulk_create([Country(name=f"Country {22 - i:02d}") for i in range(23)])
+        LifeExpectancy.objects.bulk_create(
+            [LifeExpectancy(country=c, year=2000 + y, life_expectancy=60.0 + y) for c in countries for y in range(10)]
+        )
+        SuicideMortality.objects.bulk_create(
+            [
+                SuicideMortality(country=c, year=2000 + y, sex=sex, rate=float(y))
+                for c in countries
+                for y in range(5)
+                for sex in ("Both sexes", "Female", "Male")
+            ]
+        )
+
+    def walk(self, url):
+        rows, pages = [], 0
+        while url:
+            r = self.client.get(url)
+            self.assertEqual(r.status_code, 200)
+            body = r.json()
+            self.assertNotIn("count", body)
+            rows.extend(body["results"])
+            url = body["next"]
+            pages += 1
+        return rows, pages
+
+    def test_keyset_walk_follows_key_order(self):
+        rows, pages = self.walk("/api/life-expectancy/?pagination=keyset")
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(rows), 230)
+        keys = [(r["country"]["id"], r["year"], r["id"]) for r in rows]
+        self.assertEqual(keys, sorted(keys))
+        self.assertNotEqual([r["country"]["name"] for r in rows], sorted(r["country"]["name"] for r in rows))
+
+    def test_keyset_walk_returns_the_page_number_rows(self):
+        rows, _ = self.walk("/api/life-expectancy/?pagination=keyset")
+        numbered = []
+        for page in (1, 2, 3):
+            numbered.extend(self.client.get(f"/api/life-expectancy/?page={page}").json()["results"])
+        self.assertEqual(len(numbered), 230)
+        self.assertEqual({r["id"] for r in rows}, {r["id"] for r in numbered})
+
+    def test_keyset_respects_filters_and_sex_in_key(self):
+        rows, _ = self.walk("/api/suicide-mortality/?pagination=keyset&year_min=2003")
+        self.assertEqual(len(rows), 23 * 2 * 3)
+        keys = [(r["country"]["id"], r["year"], r["sex"], r["id"]) for r in rows]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual({r["year"] for r in rows}, {2003, 2004})
+
+    def test_ordering_is_rejected(self):
+        r = self.client.get("/api/life-expectancy/?pagination=keyset&ordering=-year")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("ordering", r.json())
+
+    def test_cursor_seeks_the_keyset_index(self):
+        cursor = self.client.get("/api/suicide-mortality/?pagination=keyset").json()["next"]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(cursor)
+        sql = queries.captured_queries[-1]["sql"]
+        if connection.vendor != "sqlite":
+            self.skipTest("query plan check is SQLite-specific")
+        with connection.cursor() as c:
+            c.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plan = " ".join(str(row[-1]) for row in c.fetchall())
+        # A range seek on the key's first column, not a walk over countries in name order.
+        self.assertIn("suicide_keyset_idx (country_id>?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_page_number_contract_unchanged(self):
+        body = self.client.get("/api/life-expectancy/").json()
+        self.assertEqual(body["count"], 230)
+        self.assertIn("previous", body)
+
+    def test_invalid_cursor(self):
+        r = self.client.get("/api/life-expectancy/?cursor=not-a-cursor")
+        self.assertEqual(r.status_code, 404)
+
+    def test_cursor_values_must_match_the_key_types(self):
+        def cursor(values):
+            return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+        cases = [
+            ("/api/life-expectancy/", ["abc", 1, 2]),
+            ("/api/life-expectancy/", [None, 1, 2]),
+            ("/api/life-expectancy/", [True, 1, 2]),
+            ("/api/suicide-mortality/", [1, 2000, 1, 2]),
+            ("/api/suicide-mortality/", [1, 2000, "Male", "2"]),
+        ]
+        for url, values in cases:
+            with self.subTest(values=values):
+                r = self.client.get(f"{url}?cursor={cursor(values)}")
+                self.assertEqual(r.status_code, 404)
+                self.assertEqual(r.json()["detail"], "Invalid cursor")
+        r = self.client.get(f"/api/suicide-mortality/?cursor={cursor([0, 2000, 'Male', 0])}")
+        self.assertEqual(r.status_code, 200)
@@ -0,0 +1,131 @@
+"""LifeExpectancyRank tests: parity between the precomputed and live /top/ paths."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from health.countries import get_resolver
+from health.models import Country, LifeExpectancy, LifeExpectancyRank
+from health.ranks import RANK_FIELDS, _insert_ranks_frame, rank_frame, ranks_enabled, status_label
+
+URL = "/api/life-expectancy/top/"
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_DATASET_VERSION_TTL=60)
+class RankTableTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i, name in enumerate(["Japan", "Chad", "Peru", "Fiji", "Oman", "Niger"]):
+            country = Country.objects.create(name=name)
+            for year in (2014, 2015):
+                LifeExpectancy.objects.create(
+                    country=country,
+                    year=year,
+                    status="Developed" if i < 2 else "Developing",
+                    # Three pairs of tied values per year; Niger has no schooling value.
+                    life_expectancy=60.0 + 4 * (i % 3) + (year == 2015),
+                    schooling=None if name == "Niger" else 10.0 + i,
+                )
+        call_command("refresh_facts", stdout=StringIO())
+
+    def assertSamePaths(self, url):
+        self.assertTrue(ranks_enabled())
+        with override_settings(HEALTH_RANK_TABLE=False):
+            expected = self.client.get(url)
+        actual = self.client.get(url)
+        self.assertEqual(expected.status_code, actual.status_code)
+        self.assertEqual(expected.json(), actual.json())
+        return actual
+
+    def test_table_matches_live_ranking(self):
+        for query in (
+            "year=2015&n=10",
+            "year=2015&n=3&order=bottom",
+            "year=2014&status=developing",
+            "year=2014&status=Developing&order=bottom&n=2",
+            "year=2015&metric=schooling",
+            "year=2015&metric=schooling&order=bottom",
+            "year=2015&status=nobody",
+            "year=1990",
+        ):
+            with self.subTest(query=query):
+                self.assertSamePaths(f"{URL}?{query}")
+
+    def test_dense_ranks(self):
+        body = self.assertSamePaths(f"{URL}?year=2015&n=6").json()
+        self.assertEqual(body["metric"], "life_expectancy")
+        ranked = [(r["country"], r["rank"]) for r in body["results"]]
+        self.assertEqual(ranked[:4], [("Peru", 1), ("Niger", 1), ("Chad", 2), ("Oman", 2)])
+        self.assertEqual(body["results"][-1]["rank"], 3)
+        bottom = self.client.get(f"{URL}?year=2015&n=2&order=bottom").json()
+        self.assertEqual([r["rank"] for r in bottom["results"]], [3, 3])
+
+    def test_country_rank(self):
+        for query in ("country=peru&year=2015", "country=Oman&year=2014&metric=schooling"):
+            with self.subTest(query=query):
+                self.assertSamePaths(f"{URL}?{query}")
+        body = self.client.get(f"{URL}?country=Peru&year=2015").json()
+        self.assertEqual(
+            {k: body[k] for k in ("rank", "total", "status", "status_rank", "status_total", "percentile")},
+            {"rank": 1, "total": 6, "status": "Developing", "status_rank": 1, "status_total": 4, "percentile": 100.0},
+        )
+
+    def test_country_rank_is_one_query(self):
+        get_resolver()
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(f"{URL}?country=Fiji&year=2015&metric=schooling")
+        self.assertEqual(r.json()["schooling"], 13.0)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn("health_lifeexpectancyrank", ctx.captured_queries[0]["sql"])
+
+    def test_top_n_with_status_is_one_query(self):
+        status_label("developed")
+        get_resolver()
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(f"{URL}?year=2015&status=developed")
+        self.assertEqual([row["country"] for row in r.json()["results"]], ["Chad", "Japan"])
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_country_newer_than_the_cached_resolver(self):
+        # bulk_create sends no signals, like another process's load seen before the version TTL runs out.
+        get_resolver()
+        (country,) = Country.objects.bulk_create([Country(name="Tuvalu")])
+        LifeExpectancy.objects.bulk_create(
+            [LifeExpectancy(country=country, year=2015, status="Developing", life_expectancy=99.0)]
+        )
+        self.assertNotIn(country.id, get_resolver().names)
+        with override_settings(HEALTH_RANK_TABLE=False):
+            r = self.client.get(f"{URL}?year=2015&n=1")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["results"][0]["country"], "Tuvalu")
+
+    def test_database_ranks_match_pandas(self):
+        stored = sorted(LifeExpectancyRank.objects.values_list(*RANK_FIELDS))
+        self.assertEqual(len(stored), 12 + 10)
+        self.assertEqual(stored, sorted(rank_frame().astype(object).itertuples(index=False, name=None)))
+        # The fallback for databases without window functions writes the same table.
+        LifeExpectancyRank.objects.all().delete()
+        with connection.cursor() as cursor:
+            self.assertEqual(_insert_ranks_frame(cursor, batch_size=5), len(stored))
+        self.assertEqual(sorted(LifeExpectancyRank.objects.values_list(*RANK_FIELDS)), stored)
+
+    def test_bad_params(self):
+        self.assertEqual(self.client.get(f"{URL}?metric=country").status_code, 400)
+        self.assertEqual(self.client.get(f"{URL}?order=sideways").status_code, 400)
+        self.assertEqual(self.client.get(f"{URL}?country=Atlantis").status_code, 404)
+        self.assertEqual(self.client.get(f"{URL}?country=Niger&metric=schooling").status_code, 404)
+
+    def test_edit_marks_ranks_stale(self):
+        row = LifeExpectancy.objects.get(country__name="Oman", year=2015)
+        row.life_expectancy = 99.0
+        row.save()
+        self.assertFalse(ranks_enabled())
+        body = self.client.get(f"{URL}?year=2015&n=1").json()
+        self.assertEqual(body["results"][0]["country"], "Oman")
+        call_command("refresh_facts", stdout=StringIO())
+        self.assertTrue(ranks_enabled())
+        self.assertEqual(LifeExpectancyRank.objects.get(metric="life_expectancy", year=2015, year_rank=1).country.name, "Oman")
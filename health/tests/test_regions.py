@@ -0,0 +1,121 @@
+"""RegionYearAggregate tests: aggregates, and parity between the precomputed and live paths."""
+
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from health.models import Country, LifeExpectancy, RegionYearAggregate, SuicideMortality
+from health.regions import regions_enabled
+
+URL = "/api/insights/regions/"
+# name: (region code, region, population, life expectancy 2015, Both sexes rate 2015)
+COUNTRIES = {
+    "Japan": ("WPR", "Western Pacific", 100.0, 84.0, 15.0),
+    "Fiji": ("WPR", "Western Pacific", 1.0, 70.0, 6.0),
+    "Laos": ("WPR", "Western Pacific", None, 66.0, 8.0),
+    "Chad": ("AFR", "Africa", 10.0, 54.0, 7.0),
+    "Niger": ("AFR", "Africa", 20.0, 62.0, 4.0),
+}
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_DATASET_VERSION_TTL=60)
+class RegionTableTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for name, (code, region, population, life, rate) in COUNTRIES.items():
+            country = Country.objects.create(name=name)
+            for year in (2014, 2015):
+                LifeExpectancy.objects.create(
+                    country=country, year=year, population=population, life_expectancy=life - (year == 2014)
+                )
+                for sex, factor in (("Both sexes", 1.0), ("Male", 1.5)):
+                    SuicideMortality.objects.create(
+                        country=country,
+                        year=year,
+                        sex=sex,
+                        rate=rate * factor,
+                        parent_location_code=code,
+                        parent_location=region,
+                    )
+        # Life data but no suicide rows: not in any region.
+        nowhere = Country.objects.create(name="Atlantis")
+        LifeExpectancy.objects.create(country=nowhere, year=2015, population=5.0, life_expectancy=99.0)
+        call_command("refresh_facts", stdout=StringIO())
+
+    def assertSamePaths(self, url):
+        self.assertTrue(regions_enabled())
+        with override_settings(HEALTH_REGION_TABLE=False):
+            expected = self.client.get(url)
+        actual = self.client.get(url)
+        self.assertEqual(expected.status_code, actual.status_code)
+        self.assertEqual(expected.json(), actual.json())
+        return actual.json()
+
+    def test_aggregates(self):
+        body = self.assertSamePaths(f"{URL}?metric=life_expectancy&year_min=2015&year_max=2015")
+        self.assertIsNone(body["sex"])
+        self.assertEqual([(r["region_code"], r["year"]) for r in body["results"]], [("AFR", 2015), ("WPR", 2015)])
+        afr, wpr = body["results"]
+        self.assertEqual(wpr["countries"], 3)
+        self.assertAlmostEqual(wpr["mean"], (84 + 70 + 66) / 3)
+        self.assertEqual(wpr["median"], 70.0)
+        # Laos has no population: left out of the weighted mean only.
+        self.assertAlmostEqual(wpr["weighted_mean"], (84 * 100 + 70 * 1) / 101)
+        self.assertEqual(wpr["weighted_countries"], 2)
+        self.assertEqual(wpr["min"], {"country": "Laos", "value": 66.0})
+        self.assertEqual(wpr["max"], {"country": "Japan", "value": 84.0})
+        self.assertEqual(afr["median"], 58.0)
+
+    def test_suicide_rates_by_sex(self):
+        body = self.assertSamePaths(f"{URL}?metric=rate&sex=male&year_min=2014&year_max=2015")
+        self.assertEqual(body["count"], 4)
+        wpr_2015 = body["results"][-1]
+        self.assertEqual((wpr_2015["region_code"], wpr_2015["year"]), ("WPR", 2015))
+        self.assertAlmostEqual(wpr_2015["weighted_mean"], 1.5 * (15 * 100 + 6 * 1) / 101)
+        self.assertAlmostEqual(wpr_2015["median"], np.median([22.5, 9.0, 12.0]))
+        for query in ("metric=rate&region=afr", "metric=rate&region=Western%20Pacific&year_min=2015", "sex=Female"):
+            with self.subTest(query=query):
+                self.assertSamePaths(f"{URL}?{query}")
+        self.assertEqual(self.client.get(f"{URL}?metric=rate&sex=Female").json()["count"], 0)
+        self.assertEqual({r["region_code"] for r in self.client.get(f"{URL}?region=afr").json()["results"]}, {"AFR"})
+
+    def test_table_covers_every_metric_and_is_one_query(self):
+        self.assertEqual(RegionYearAggregate.objects.filter(metric="rate").count(), 2 * 2 * 2)
+        self.assertEqual(RegionYearAggregate.objects.filter(metric="gdp").count(), 0)  # no values
+        self.assertEqual(RegionYearAggregate.objects.filter(metric="life_expectancy", sex="").count(), 4)
+        self.client.get(URL)  # warm the country name resolver
+        with self.assertNumQueries(1):
+            self.client.get(f"{URL}?metric=rate")
+
+    def test_edit_marks_regions_stale(self):
+        row = LifeExpectancy.objects.get(country__name="Fiji", year=2015)
+        row.life_expectancy = 90.0
+        row.save()
+        self.assertFalse(regions_enabled())
+        wpr = self.client.get(f"{URL}?year_min=2015&region=WPR").json()["results"][0]
+        self.assertEqual(wpr["max"], {"country": "Fiji", "value": 90.0})
+        call_command("refresh_facts", stdout=StringIO())
+        self.assertTrue(regions_enabled())
+        self.assertEqual(self.client.get(f"{URL}?year_min=2015&region=WPR").json()["results"][0], wpr)
+
+    def test_alias_groups_share_region_and_population(self):
+        # WHO names the country "Turkey" in the life dataset and "Türkiye" in the suicide one.
+        turkey = Country.objects.create(name="Turkey")
+        turkiye = Country.objects.create(name="Türkiye")
+        LifeExpectancy.objects.create(country=turkey, year=2015, population=80.0, life_expectancy=76.0)
+        SuicideMortality.objects.create(
+            country=turkiye, year=2015, sex="Both sexes", rate=2.0, parent_location_code="EUR", parent_location="Europe"
+        )
+        call_command("refresh_facts", stdout=StringIO())
+        query = "year_min=2015&year_max=2015&region=EUR"
+        life = self.assertSamePaths(f"{URL}?metric=life_expectancy&{query}")["results"]
+        self.assertEqual([(r["countries"], r["weighted_mean"]) for r in life], [(1, 76.0)])
+        rate = self.assertSamePaths(f"{URL}?metric=rate&{query}")["results"]
+        self.assertEqual([(r["countries"], r["weighted_countries"], r["max"]) for r in rate], [(1, 1, {"country": "Türkiye", "value": 2.0})])
+
+    def test_bad_params(self):
+        self.assertEqual(self.client.get(f"{URL}?metric=nope").status_code, 400)
+        self.assertEqual(self.client.get(f"{URL}?year_min=x").status_code, 400)
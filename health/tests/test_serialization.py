@@ -0,0 +1,180 @@
+"""Parity tests for the fast list serialization path and the orjson renderer."""
+
+import datetime
+import decimal
+import json
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from health.fastpath import row_plan
+from health.models import Country, LifeExpectancy, SuicideMortality
+from health.renderers import ORJSONRenderer
+from health.serializers import LifeExpectancySerializer, SuicideMortalitySerializer
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False)
+class FastListParityTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        names = ["Côte d'Ivoire", "Albania", "Türkiye", "Zimbabwe"]
+        countries = Country.objects.bulk_create([Country(name=n) for n in names])
+        LifeExpectancy.objects.bulk_create(
+            [
+                LifeExpectancy(
+                    country=c,
+                    year=2000 + y,
+                    status="Developing" if y % 2 else "Developed",
+                    life_expectancy=60.5 + y if y != 3 else None,
+                    gdp=1234.5678 * (y + 1),
+                    population=None,
+                )
+                for c in countries
+                for y in range(30)
+            ]
+        )
+        SuicideMortality.objects.bulk_create(
+            [
+                SuicideMortality(
+                    country=c,
+                    year=2000 + y,
+                    sex=sex,
+                    parent_location="Europe",
+                    rate=y / 3 if y != 2 else None,
+                    value_text=f"{y} [0-{y + 1}]",
+                    is_latest_year=y == 29,
+                )
+                for c in countries
+                for y in range(30)
+                for sex in ("Both sexes", "Female")
+            ]
+        )
+
+    def assert_same_bytes(self, url):
+        with override_settings(HEALTH_FAST_SERIALIZATION=False):
+            slow = self.client.get(url)
+        fast = self.client.get(url)
+        self.assertEqual(slow.status_code, 200)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_life_expectancy_pages_are_byte_equal(self):
+        for url in (
+            "/api/life-expectancy/",
+            "/api/life-expectancy/?page=2",
+            "/api/life-expectancy/?ordering=-life_expectancy&status=Developing",
+            "/api/life-expectancy/?search=ivoire&year_min=2010",
+            "/api/life-expectancy/?pagination=keyset",
+        ):
+            with self.subTest(url=url):
+                self.assert_same_bytes(url)
+
+    def test_suicide_mortality_pages_are_byte_equal(self):
+        for url in (
+            "/api/suicide-mortality/",
+            "/api/suicide-mortality/?page=3",
+            "/api/suicide-mortality/?ordering=rate&sex=Female",
+            "/api/suicide-mortality/?pagination=keyset",
+        ):
+            with self.subTest(url=url):
+                self.assert_same_bytes(url)
+
+    def test_keyset_cursor_pages_are_byte_equal(self):
+        url = self.client.get("/api/suicide-mortality/?pagination=keyset").json()["next"]
+        self.assert_same_bytes(url)
+
+    def test_nested_country_shape(self):
+        row = self.assert_same_bytes("/api/life-expectancy/").json()["results"][0]
+        self.assertEqual(list(row["country"]), ["id", "name"])
+        self.assertNotIn("country_id", row)
+
+    def test_plan_reads_only_serializer_columns(self):
+        _, columns = row_plan(LifeExpectancySerializer)
+        self.assertEqual(columns[:3], ("id", "country__id", "country__name"))
+        _, columns = row_plan(SuicideMortalitySerializer)
+        self.assertIn("is_latest_year", columns)
+        self.assertNotIn("country_id", columns)
+
+
+class ORJSONRendererTests(TestCase):
+    def test_matches_drf_renderer(self):
+        data = {
+            "name": "Côte d'Ivoire \u2028",
+            "rate": 0.1 + 0.2,
+            "none": None,
+            "flag": True,
+            "nested": [{"id": 1, "values": [1.5, -2.0, 1234.5678]}],
+            "when": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            "amount": decimal.Decimal("12.50"),
+        }
+        expected = JSONRenderer().render(data)
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+
+    def test_exponent_floats_decode_equal(self):
+        data = {"values": [1e-7, 3.5e21, -0.0]}
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_indent_falls_back(self):
+        data = {"a": [1, 2]}
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False)
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        country = Country.objects.create(name="Albania")
+        LifeExpectancy.objects.bulk_create(
+            [LifeExpectancy(country=country, year=2000 + y, life_expectancy=70.0 + y, gdp=100.0 * y) for y in range(3)]
+        )
+        SuicideMortality.objects.create(country=country, year=2000, sex="Both sexes", rate=4.2)
+
+    def get_both(self, url):
+        """Response JSON plus captured SQL, for the fast and ModelSerializer paths."""
+        results = []
+        for fast in (True, False):
+            with override_settings(HEALTH_FAST_SERIALIZATION=fast), CaptureQueriesContext(connection) as ctx:
+                r = self.client.get(url)
+            results.append((r, " ".join(q["sql"] for q in ctx.captured_queries)))
+        self.assertEqual(results[0][0].content, results[1][0].content)
+        return results
+
+    def test_fields_trims_payload_and_columns(self):
+        for r, sql in self.get_both("/api/life-expectancy/?fields=country_name,year,life_expectancy,gdp"):
+            row = r.json()["results"][0]
+            self.assertEqual(row, {"country_name": "Albania", "year": 2000, "life_expectancy": 70.0, "gdp": 0.0})
+            self.assertNotIn('"schooling"', sql)
+            self.assertNotIn('"adult_mortality"', sql)
+
+    def test_exclude_drops_keys(self):
+        for r, _ in self.get_both("/api/suicide-mortality/?exclude=country,indicator,value_text"):
+            row = r.json()["results"][0]
+            self.assertNotIn("country", row)
+            self.assertNotIn("country_name", row)
+            self.assertEqual(row["rate"], 4.2)
+
+    def test_country_name_is_opt_in(self):
+        row = self.client.get("/api/life-expectancy/").json()["results"][0]
+        self.assertNotIn("country_name", row)
+        self.assertEqual(row["country"]["name"], "Albania")
+
+    def test_keyset_pages_with_sparse_fields(self):
+        r = self.client.get("/api/life-expectancy/?pagination=keyset&fields=year")
+        self.assertEqual(r.json(), {"next": None, "results": [{"year": 2000}, {"year": 2001}, {"year": 2002}]})
+
+    def test_unknown_field_is_rejected(self):
+        r = self.client.get("/api/life-expectancy/?fields=year,nope")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("nope", r.json()["fields"])
+
+    def test_retrieve_honours_fields(self):
+        pk = LifeExpectancy.objects.first().pk
+        r = self.client.get(f"/api/life-expectancy/{pk}/?fields=id,year")
+        self.assertEqual(r.json(), {"id": pk, "year": 2000})
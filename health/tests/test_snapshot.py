@@ -0,0 +1,165 @@
+"""Columnar snapshot tests: parity with the ORM path, version invalidation and the shared file."""
+
+import mmap
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from health.models import Country, LifeExpectancy, SuicideMortality
+from health.snapshot import build_snapshot, clear_snapshot, get_snapshot, open_snapshot_file, write_snapshot_file
+from health.versioning import bump_dataset_version, current_dataset_version
+
+from .test_loader import LIFE_CSV, SUICIDE_CSV
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False)
+class SnapshotTests(TestCase):
+    def setUp(self):
+        clear_snapshot()
+        self.client = APIClient()
+        sg = Country.objects.create(name="Singapore")
+        my = Country.objects.create(name="Malaysia")
+        th = Country.objects.create(name="Thailand")
+        for year in (2013, 2014, 2015):
+            LifeExpectancy.objects.create(country=sg, year=year, status="Developed", life_expectancy=80.0 + year % 10)
+            LifeExpectancy.objects.create(country=my, year=year, status="Developing", life_expectancy=55.0)
+            SuicideMortality.objects.create(country=sg, year=year, sex="Both sexes", rate=7.0, parent_location="Western Pacific")
+            SuicideMortality.objects.create(country=my, year=year, sex="Both sexes", rate=12.0, parent_location="Western Pacific")
+            SuicideMortality.objects.create(country=my, year=year, sex="Male", rate=18.0)
+        LifeExpectancy.objects.create(country=th, year=2015, status="Developing", life_expectancy=None)
+        SuicideMortality.objects.create(country=th, year=2015, sex="Both sexes", rate=15.0)
+
+    def assertSamePaths(self, url):
+        with override_settings(HEALTH_COLUMNAR_SNAPSHOT=False):
+            expected = self.client.get(url)
+        actual = self.client.get(url)
+        self.assertEqual(expected.status_code, actual.status_code)
+        self.assertEqual(expected.json(), actual.json())
+
+    def test_country_summary_parity(self):
+        self.assertSamePaths("/api/insights/country-summary/?country=singapore&year=2015")
+        self.assertSamePaths("/api/insights/country-summary/?country=Malaysia&year=2014&sex=male")
+        self.assertSamePaths("/api/insights/country-summary/?country=Thailand&year=2015")
+        self.assertSamePaths("/api/insights/country-summary/?country=Atlantis&year=2015")
+
+    def test_timeline_parity(self):
+        self.assertSamePaths("/api/insights/country-timeline/?country=Singapore&year_min=2012&year_max=2016")
+        self.assertSamePaths("/api/insights/country-timeline/?country=Malaysia&year_min=2013&year_max=2015&sex=Male")
+
+    def test_risk_flags_parity(self):
+        self.assertSamePaths("/api/insights/risk-flags/?year=2015&min_life=90&min_suicide=5")
+        self.assertSamePaths("/api/insights/risk-flags/?year=2014&min_life=60&min_suicide=10&sex=MALE")
+
+    def test_rebuilds_after_version_bump(self):
+        first = get_snapshot()
+        self.assertIs(get_snapshot(), first)
+        bump_dataset_version()
+        second = get_snapshot()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.resolve_country("  SINGAPORE "), Country.objects.get(name="Singapore").id)
+
+    def test_row_edit_invalidates_snapshot(self):
+        self.client.get("/api/insights/country-summary/?country=Singapore&year=2015")
+        LifeExpectancy.objects.filter(year=2015, country__name="Singapore").get().delete()
+        r = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015")
+        self.assertIsNone(r.json()["life_expectancy"])
+
+
+def _mapped(array):
+    """The array is a view on a mmap (np.frombuffer keeps it behind a memoryview)."""
+    base = array.base
+    return isinstance(base, memoryview) and isinstance(base.obj, mmap.mmap)
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_DATASET_VERSION_TTL=60)
+class SnapshotFileTests(TestCase):
+    def setUp(self):
+        clear_snapshot()
+        self.addCleanup(clear_snapshot)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        (self.dir / "life.csv").write_text(LIFE_CSV)
+        (self.dir / "suicide.csv").write_text(SUICIDE_CSV)
+        self.path = self.dir / "snapshot.bin"
+
+    def load(self):
+        with override_settings(HEALTH_SNAPSHOT_FILE=str(self.path)), self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "load_who_data", life=str(self.dir / "life.csv"), suicide=str(self.dir / "suicide.csv"), stdout=StringIO()
+            )
+
+    def test_file_is_written_after_commit(self):
+        with override_settings(HEALTH_SNAPSHOT_FILE=str(self.path)), self.captureOnCommitCallbacks() as callbacks:
+            call_command(
+                "load_who_data", life=str(self.dir / "life.csv"), suicide=str(self.dir / "suicide.csv"), stdout=StringIO()
+            )
+            self.assertFalse(self.path.exists())
+        self.assertEqual(len(callbacks), 1)
+        with override_settings(HEALTH_SNAPSHOT_FILE=str(self.path)):
+            callbacks[0]()
+        self.assertEqual(open_snapshot_file(self.path).version, current_dataset_version())
+
+    def test_round_trip_is_memory_mapped(self):
+        self.load()
+        built = build_snapshot(current_dataset_version())
+        mapped = open_snapshot_file(self.path)
+        self.assertEqual(mapped.version, built.version)
+        self.assertEqual(mapped.labels, built.labels)
+        self.assertEqual(mapped.country_names, built.country_names)
+        for table in ("life", "suicide"):
+            self.assertEqual(set(getattr(mapped, table)), set(getattr(built, table)))
+            for name, array in getattr(built, table).items():
+                with self.subTest(table=table, column=name):
+                    np.testing.assert_array_equal(getattr(mapped, table)[name], array)
+                    self.assertEqual(getattr(mapped, table)[name].dtype, array.dtype)
+                    self.assertTrue(_mapped(getattr(mapped, table)[name]))
+                    self.assertFalse(getattr(mapped, table)[name].flags.writeable)
+        country_ids = mapped.lookup_country("Singapore")
+        self.assertEqual(
+            mapped.country_summary(country_ids, 2015, "Both sexes"), built.country_summary(country_ids, 2015, "Both sexes")
+        )
+
+    def test_workers_use_the_file_without_queries(self):
+        self.load()
+        current_dataset_version()
+        clear_snapshot()
+        with override_settings(HEALTH_SNAPSHOT_FILE=str(self.path)), self.assertNumQueries(0):
+            snapshot = get_snapshot()
+        self.assertTrue(_mapped(snapshot.life["life_expectancy"]))
+        with override_settings(HEALTH_SNAPSHOT_FILE=str(self.path)):
+            r = self.client.get("/api/insights/country-summary/?country=Singapore&year=2015")
+        self.assertEqual(r.json()["life_expectancy"], 83.1)
+
+    def test_stale_missing_or_foreign_files_fall_back_to_the_database(self):
+        self.load()
+        bump_dataset_version()  # e.g. an admin edit after the load
+        clear_snapshot()
+        with override_settings(HEALTH_SNAPSHOT_FILE=str(self.path)):
+            self.assertFalse(_mapped(get_snapshot().life["year"]))
+        self.assertIsNone(open_snapshot_file(self.path, version=current_dataset_version()))
+        self.assertIsNone(open_snapshot_file(self.dir / "missing.bin"))
+        self.assertIsNone(open_snapshot_file(self.dir / "life.csv"))
+        (self.dir / "empty.bin").write_bytes(b"")
+        self.assertIsNone(open_snapshot_file(self.dir / "empty.bin"))
+
+    def test_replace_is_atomic_and_keeps_old_mappings_valid(self):
+        self.load()
+        old = open_snapshot_file(self.path)
+        years = old.life["year"].copy()
+        old_inode = self.path.stat().st_ino
+
+        LifeExpectancy.objects.filter(year=2015).delete()
+        new_version = bump_dataset_version()
+        write_snapshot_file(build_snapshot(new_version), self.path)
+
+        self.assertNotEqual(self.path.stat().st_ino, old_inode)  # renamed over, not rewritten in place
+        self.assertEqual(sorted(p.name for p in self.dir.iterdir()), ["life.csv", "snapshot.bin", "suicide.csv"])
+        np.testing.assert_array_equal(old.life["year"], years)
+        new = open_snapshot_file(self.path, version=new_version)
+        self.assertNotIn(2015, new.life["year"])
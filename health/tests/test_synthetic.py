@@ -0,0 +1,89 @@
+"""generate_synthetic_who command tests."""
+
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from health.ingest import LIFE_CSV_COLUMNS, clean_life_frame
+from health.models import Country, LifeExpectancy, SuicideMortality
+from health.synthetic import SUICIDE_COLUMNS
+
+DATA = Path(__file__).resolve().parents[2] / "data"
+LIFE_SOURCE = DATA / "life-expectancy-who.csv"
+SUICIDE_SOURCE = DATA / "suicide-rates-who-filtered.csv"
+
+
+class GenerateSyntheticWhoTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def generate(self, name="out", **options):
+        out = Path(self.tmp.name) / name
+        call_command(
+            "generate_synthetic_who",
+            output_dir=str(out),
+            life_source=str(LIFE_SOURCE),
+            suicide_source=str(SUICIDE_SOURCE),
+            stdout=StringIO(),
+            **options,
+        )
+        return out / "life-expectancy-synthetic.csv", out / "suicide-rates-synthetic.csv"
+
+    def test_schemas_and_shape(self):
+        life, suicide = self.generate(countries=200, years=4, sexes=2, chunk_rows=100)
+        life_df = pd.read_csv(life, dtype=str)
+        suicide_df = pd.read_csv(suicide, dtype=str)
+        self.assertEqual(tuple(life_df.columns), LIFE_CSV_COLUMNS)
+        self.assertEqual(tuple(suicide_df.columns), SUICIDE_COLUMNS)
+        self.assertEqual(tuple(pd.read_csv(SUICIDE_SOURCE, nrows=0).columns), SUICIDE_COLUMNS)
+        self.assertEqual(len(life_df), 200 * 4)
+        self.assertEqual(len(suicide_df), 200 * 4 * 2)
+        self.assertEqual(life_df["country"].nunique(), 200)
+        self.assertEqual(set(life_df["year"]), {"2012", "2013", "2014", "2015"})
+        self.assertEqual(set(suicide_df["Dim1"]), {"Both sexes", "Male"})
+        self.assertEqual(set(suicide_df["Location"]), set(life_df["country"]))
+        self.assertTrue((suicide_df.loc[suicide_df["Period"] == "2015", "IsLatestYear"] == "True").all())
+        # Names past the real pool (~185 locations) repeat with a suffix.
+        self.assertIn("Antigua and Barbuda 2", set(life_df["country"]))
+
+    def test_distributions_follow_the_real_file(self):
+        life, _ = self.generate(countries=600, years=16)
+        real = clean_life_frame(pd.read_csv(LIFE_SOURCE, dtype=str))
+        fake = clean_life_frame(pd.read_csv(life, dtype=str))
+        for column in ("hepatitis_b", "population", "gdp", "life_expectancy"):
+            with self.subTest(column=column):
+                self.assertAlmostEqual(fake[column].isna().mean(), real[column].isna().mean(), delta=0.03)
+        self.assertAlmostEqual(fake["life_expectancy"].median(), real["life_expectancy"].median(), delta=2.0)
+        self.assertGreaterEqual(fake["life_expectancy"].min(), real["life_expectancy"].min())
+        self.assertLessEqual(fake["life_expectancy"].max(), real["life_expectancy"].max())
+        # Cross-column structure survives: schooling rises with life expectancy, HIV falls.
+        corr = fake[["life_expectancy", "schooling", "hiv_aids"]].corr(method="spearman")["life_expectancy"]
+        self.assertGreater(corr["schooling"], 0.5)
+        self.assertLess(corr["hiv_aids"], -0.5)
+
+    def test_seeded_output_is_reproducible(self):
+        first = [p.read_bytes() for p in self.generate("a", countries=30, years=3, seed=7)]
+        second = [p.read_bytes() for p in self.generate("b", countries=30, years=3, seed=7)]
+        third = [p.read_bytes() for p in self.generate("c", countries=30, years=3, seed=8)]
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+
+    def test_output_loads(self):
+        life, suicide = self.generate(countries=20, years=3, sexes=3)
+        call_command("load_who_data", life=[str(life)], suicide=[str(suicide)], stdout=StringIO())
+        self.assertEqual(Country.objects.count(), 20)
+        self.assertEqual(LifeExpectancy.objects.count(), 60)
+        self.assertEqual(SuicideMortality.objects.count(), 180)
+        self.assertEqual(Country.objects.exclude(iso3="").count(), 20)
+
+    def test_rejects_bad_arguments(self):
+        with self.assertRaises(CommandError):
+            self.generate(countries=0)
+        with self.assertRaisesMessage(CommandError, "not found"):
+            call_command("generate_synthetic_who", life_source="nope.csv", stdout=StringIO())
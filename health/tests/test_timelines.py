@@ -0,0 +1,95 @@
+"""Batch country-timeline endpoint tests."""
+
+import json
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework.test import APIClient
+
+from health.models import Country, LifeExpectancy, SuicideMortality
+from health.versioning import bump_dataset_version
+
+URL = "/api/insights/country-timelines/"
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False)
+class CountryTimelineBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.names = [f"Country {i:02d}" for i in range(6)]
+        countries = Country.objects.bulk_create([Country(name=n) for n in self.names])
+        LifeExpectancy.objects.bulk_create(
+            [LifeExpectancy(country=c, year=y, life_expectancy=50.0 + i + y % 10) for i, c in enumerate(countries) for y in range(2010, 2016) if y != 2012]
+        )
+        SuicideMortality.objects.bulk_create(
+            [
+                SuicideMortality(country=c, year=y, sex=sex, rate=float(i) + (sex == "Male"))
+                for i, c in enumerate(countries)
+                for y in range(2011, 2016)
+                for sex in ("Both sexes", "Male")
+            ]
+        )
+        bump_dataset_version()  # bulk_create skips the signals, as in load_who_data
+
+    def single(self, name, query):
+        return self.client.get(f"/api/insights/country-timeline/?country={name}&{query}").json()
+
+    def test_matches_single_endpoint_on_both_paths(self):
+        query = "year_min=2009&year_max=2015&sex=male"
+        for snapshot in (True, False):
+            with self.subTest(snapshot=snapshot), override_settings(HEALTH_COLUMNAR_SNAPSHOT=snapshot):
+                body = self.client.get(f"{URL}?countries=country 03,Country 01,Atlantis&{query}").json()
+                self.assertEqual(body["count"], 2)
+                self.assertEqual(body["not_found"], ["Atlantis"])
+                self.assertEqual(body["results"], [self.single("Country 03", query), self.single("Country 01", query)])
+
+    def test_orm_path_uses_three_queries(self):
+        with override_settings(HEALTH_COLUMNAR_SNAPSHOT=False), CaptureQueriesContext(connection) as ctx:
+            r = self.client.get(f"{URL}?countries={','.join(self.names)}")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(r.json()["results"]), 6)
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_post_body_and_duplicates(self):
+        r = self.client.post(URL, {"countries": ["Country 02", "country 02", "Country 05"], "year_min": 2014}, format="json")
+        self.assertEqual(r.status_code, 200)
+        body = r.json()
+        self.assertEqual([item["country"] for item in body["results"]], ["Country 02", "Country 05"])
+        self.assertEqual([p["year"] for p in body["results"][0]["results"]], [2014, 2015])
+
+    @override_settings(HEALTH_TIMELINE_BATCH_MAX=3)
+    def test_batch_cap_and_missing_param(self):
+        self.assertEqual(self.client.get(f"{URL}?countries={','.join(self.names)}").status_code, 400)
+        self.assertEqual(self.client.get(URL).status_code, 400)
+
+    def test_bad_params_are_rejected(self):
+        for query in ("year_min=abc", "year_min=2015&year_max=2010", f"year_max={10**8}"):
+            with self.subTest(query=query):
+                r = self.client.get(f"{URL}?countries=Country 01&{query}")
+                self.assertEqual(r.status_code, 400)
+                self.assertIn("error", r.json())
+        for body in ({"countries": 5}, {"countries": ["Country 01"], "year_min": "x"}, {"countries": ["Country 01"], "sex": 1}, {"countries": [1]}):
+            with self.subTest(body=body):
+                self.assertEqual(self.client.post(URL, body, format="json").status_code, 400)
+        self.assertEqual(self.client.get(f"{URL}?countries=Country 01&sex=&year_min=").status_code, 200)
+
+    @override_settings(HEALTH_TIMELINE_STREAM_MIN=2)
+    def test_large_batches_are_streamed(self):
+        expected = self.client.get(f"{URL}?countries=Country 00").json()
+        r = self.client.get(f"{URL}?countries={','.join(self.names)}")
+        self.assertTrue(r.streaming)
+        body = json.loads(b"".join(r.streaming_content))
+        self.assertEqual(body["count"], 6)
+        self.assertEqual(body["results"][0], expected["results"][0])
+        self.assertEqual(list(body), ["year_min", "year_max", "sex", "count", "not_found", "results"])
+
+
+class CountryTimelineBatchSchemaTests(SimpleTestCase):
+    def test_post_body_is_documented(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        body = schema["paths"]["/api/insights/country-timelines/"]["post"]["requestBody"]
+        ref = body["content"]["application/json"]["schema"]["$ref"]
+        properties = schema["components"]["schemas"][ref.rsplit("/", 1)[1]]["properties"]
+        self.assertEqual(set(properties), {"countries", "year_min", "year_max", "sex"})
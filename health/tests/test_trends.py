@@ -0,0 +1,92 @@
+"""Trends endpoint tests (matrix statistics against pandas, ranking, both data paths)."""
+
+import numpy as np
+import pandas as pd
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from health.models import Country, LifeExpectancy, SuicideMortality
+
+YEARS = range(2008, 2016)
+
+
+@override_settings(HEALTH_RESPONSE_CACHE_ENABLED=False, HEALTH_DATASET_VERSION_TTL=60)
+class TrendsTests(TestCase):
+    url = "/api/insights/trends/?year_min=2008&year_max=2015"
+
+    def setUp(self):
+        self.client = APIClient()
+        rng = np.random.default_rng(3)
+        self.life = {}
+        for i, name in enumerate(["Rising", "Flat", "Falling", "Gappy", "Noisy"]):
+            country = Country.objects.create(name=name)
+            slope = {"Rising": 0.8, "Flat": 0.0, "Falling": -0.5}.get(name, 0.2)
+            for year in YEARS:
+                if name == "Gappy" and year in (2010, 2011, 2013):
+                    continue
+                value = 60.0 + i + slope * (year - 2008) + (rng.normal() if name == "Noisy" else 0.0)
+                self.life[name, year] = value
+                LifeExpectancy.objects.create(country=country, year=year, life_expectancy=value)
+                SuicideMortality.objects.create(country=country, year=year, sex="Both sexes", rate=10.0 - slope * (year - 2008))
+        # Only two years in range: no slope, ranked last.
+        sparse = Country.objects.create(name="Sparse")
+        for year in (2014, 2015):
+            LifeExpectancy.objects.create(country=sparse, year=year, life_expectancy=70.0)
+
+    def get(self, query=""):
+        r = self.client.get(f"{self.url}&{query}")
+        self.assertEqual(r.status_code, 200, r.content)
+        return r.json()
+
+    def test_statistics_match_pandas(self):
+        data = self.get("window=3")
+        self.assertEqual(data["years"], list(YEARS))
+        frame = pd.Series(self.life).unstack().reindex(columns=list(YEARS))
+        for row in data["results"]:
+            if row["country"] == "Sparse":
+                continue
+            with self.subTest(country=row["country"]):
+                series = frame.loc[row["country"]]
+                expected = series.diff()
+                np.testing.assert_allclose(np.array(row["yoy"], dtype=float), expected, atol=1e-6)
+                rolling = series.rolling(3, min_periods=1).mean()
+                np.testing.assert_allclose(np.array(row["rolling_mean"], dtype=float), rolling, atol=1e-6)
+                present = series.dropna()
+                self.assertAlmostEqual(row["slope"], np.polyfit(present.index, present.to_numpy(), 1)[0], places=6)
+                self.assertEqual(row["points"], len(present))
+        gappy = next(r for r in data["results"] if r["country"] == "Gappy")
+        self.assertIsNone(gappy["values"][2])
+        self.assertIsNone(gappy["yoy"][3])  # 2011 - 2010, both missing
+
+    def test_ranking_by_direction(self):
+        data = self.get()
+        self.assertFalse(data["lower_is_better"])
+        names = [r["country"] for r in data["results"]]
+        self.assertEqual(names[0], "Rising")
+        self.assertEqual(names[-2:], ["Falling", "Sparse"])
+        self.assertEqual([r["rank"] for r in data["results"]], [1, 2, 3, 4, 5, None])
+
+        declining = self.get("order=declining&limit=2")
+        self.assertEqual([r["country"] for r in declining["results"]], ["Falling", "Flat"])
+        self.assertEqual(declining["count"], 2)
+
+        # Suicide rates: a falling rate is the improvement.
+        rates = self.get("metric=rate")
+        self.assertTrue(rates["lower_is_better"])
+        self.assertEqual(rates["results"][0]["country"], "Rising")
+        self.assertAlmostEqual(rates["results"][0]["slope"], -0.8)
+        self.assertEqual(self.get("metric=rate&sex=Male")["count"], 0)
+
+    def test_snapshot_and_database_paths_agree(self):
+        queries = ("", "metric=rate&window=2&order=declining")
+        snapshot = [self.get(q) for q in queries]
+        with override_settings(HEALTH_COLUMNAR_SNAPSHOT=False):
+            self.get()  # warm the country name resolver
+            with self.assertNumQueries(1):
+                self.assertEqual(self.get(queries[0]), snapshot[0])
+            self.assertEqual(self.get(queries[1]), snapshot[1])
+
+    def test_rejects_bad_parameters(self):
+        for query in ("metric=year", "window=0", "limit=0", "order=sideways", "year_min=2015&year_max=2000", "window=x"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/api/insights/trends/?{query}").status_code, 400)
@@ -1,8 +1,10 @@
 """API URLs."""
 
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .metrics import metrics
 from .views import (
     CountryViewSet,
     LifeExpectancyViewSet,
@@ -10,10 +12,28 @@ from .views import (
     NoteViewSet,
     CountrySummary,
     CountryTimeline,
+    CountryTimelineBatch,
     RiskFlags,
     Correlation,
+    CorrelationMatrix,
+    Trends,
+    Regions,
+    AsyncCountrySummary,
+    AsyncCountryTimeline,
+    AsyncRiskFlags,
+    AsyncCorrelation,
+    export_dataset,
 )
 
+# Under ASGI the insights endpoints are served by their async variants.
+if settings.HEALTH_ASYNC_VIEWS:
+    CountrySummary, CountryTimeline, RiskFlags, Correlation = (
+        AsyncCountrySummary,
+        AsyncCountryTimeline,
+        AsyncRiskFlags,
+        AsyncCorrelation,
+    )
+
 router = DefaultRouter()
 router.register(r"countries", CountryViewSet, basename="countries")
 router.register(r"life-expectancy", LifeExpectancyViewSet, basename="life-expectancy")
@@ -27,6 +47,16 @@ urlpatterns = [
     # Custom "interesting" endpoints
     path("insights/country-summary/", CountrySummary.as_view(), name="country-summary"),
     path("insights/country-timeline/", CountryTimeline.as_view(), name="country-timeline"),
+    path("insights/country-timelines/", CountryTimelineBatch.as_view(), name="country-timelines"),
     path("insights/risk-flags/", RiskFlags.as_view(), name="risk-flags"),
     path("insights/correlation/", Correlation.as_view(), name="correlation"),
+    path("insights/correlation-matrix/", CorrelationMatrix.as_view(), name="correlation-matrix"),
+    path("insights/trends/", Trends.as_view(), name="trends"),
+    path("insights/regions/", Regions.as_view(), name="regions"),
+
+    # Prometheus metrics (see health/metrics.py)
+    path("metrics/", metrics, name="metrics"),
+
+    # Bulk export (streamed)
+    path("export/<str:dataset>/", export_dataset, name="export"),
 ]
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Dataset version stamp.
+
+The WHO data only changes when ``load_who_data`` runs (or an admin edits a
+row), so derived in-process structures can be cached until the stamp in
+``DatasetVersion`` changes. Reading the stamp is itself cached for
+``HEALTH_DATASET_VERSION_TTL`` seconds so hot paths do not hit the database
+on every request.
+
+The same row records which version each derived table (CountryYearFact,
+LifeExpectancyRank, RegionYearAggregate) was built from; any edit bumps the token, so they count
+as stale until rebuilt.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+
+from .models import DatasetVersion
+
+INITIAL_VERSION = "initial"
+
+# Derived table -> DatasetVersion column holding the token it was built from.
+DERIVED_TABLES = {"facts": "facts_version", "ranks": "ranks_version", "regions": "regions_version"}
+
+_lock = threading.Lock()
+_cached_token: Optional[str] = None
+_cached_updated_at: Optional[datetime] = None
+_cached_derived: dict[str, str] = {}
+_checked_at = 0.0
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "HEALTH_DATASET_VERSION_TTL", 1.0))
+
+
+def _remember(token: str, updated_at: Optional[datetime], derived: dict[str, str]) -> None:
+    global _cached_token, _cached_updated_at, _cached_derived, _checked_at
+    with _lock:
+        _cached_token = token
+        _cached_updated_at = updated_at
+        _cached_derived = derived
+        _checked_at = time.monotonic()
+
+
+def _refresh() -> None:
+    columns = list(DERIVED_TABLES.values())
+    row = DatasetVersion.objects.filter(pk=1).values_list("token", "updated_at", *columns).first()
+    if row is None:
+        _remember(INITIAL_VERSION, None, {})
+    else:
+        _remember(row[0], row[1], dict(zip(DERIVED_TABLES, row[2:])))
+
+
+def _ensure_fresh() -> None:
+    if _cached_token is None or time.monotonic() - _checked_at >= _ttl():
+        _refresh()
+
+
+def current_dataset_version() -> str:
+    """Return the current dataset token (at most one cheap query per TTL window)."""
+    _ensure_fresh()
+    return _cached_token or INITIAL_VERSION
+
+
+def dataset_updated_at() -> Optional[datetime]:
+    """When the dataset token last changed (None before the first load)."""
+    _ensure_fresh()
+    return _cached_updated_at
+
+
+def derived_current(name: str) -> bool:
+    """Whether derived table ``name`` (see DERIVED_TABLES) was built from the current version."""
+    _ensure_fresh()
+    return _cached_token is not None and _cached_derived.get(name) == _cached_token
+
+
+def bump_dataset_version() -> str:
+    """Write a new dataset token and make this process see it immediately."""
+    token = uuid.uuid4().hex
+    obj, _ = DatasetVersion.objects.update_or_create(pk=1, defaults={"token": token})
+    _remember(token, obj.updated_at, {name: getattr(obj, column) for name, column in DERIVED_TABLES.items()})
+    return token
+
+
+def mark_derived_built(name: str, token: str) -> None:
+    """Record that derived table ``name`` now reflects dataset version ``token``."""
+    DatasetVersion.objects.filter(pk=1).update(**{DERIVED_TABLES[name]: token})
+    reset_dataset_version_cache()
+
+
+def reset_dataset_version_cache() -> None:
+    """Forget the cached token so the next read goes to the database."""
+    global _cached_token, _cached_updated_at, _cached_derived
+    with _lock:
+        _cached_token = None
+        _cached_updated_at = None
+        _cached_derived = {}
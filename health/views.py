@@ -7,15 +7,20 @@
 
 from __future__ import annotations
 
+import asyncio
 import platform
 import sys
+from functools import lru_cache
 from importlib.metadata import PackageNotFoundError, version
-from typing import Any
+from typing import Any, Iterator, Optional, Sequence
 
 import numpy as np
-from django.http import HttpRequest, HttpResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.views import View
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action, api_view
 from rest_framework.request import Request
@@ -24,9 +29,36 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from drf_spectacular.utils import extend_schema
 
+from .analytics import (
+    LIFE_METRICS,
+    LOWER_IS_BETTER,
+    acountry_means,
+    correlate_pairs,
+    correlation_matrix,
+    country_means,
+    dataset_means,
+    outer_align,
+    metric_rows,
+    parse_matrix_metrics,
+    parse_metric,
+    parse_metric_pairs,
+    rank_trends,
+    trend_stats,
+    year_matrix,
+)
+from .bootstrap import Resampling, parse_resampling, resample_correlations
+from .caching import AsyncCachedResponseMixin, CachedResponseMixin
+from .countries import get_resolver, group_row, group_years
+from .export import ARROW_FORMATS, CONTENT_TYPES, DATASETS, arrow_available, export_rows, stream_export
+from .facts import fact_country_means, fact_risk_flags, fact_summary, fact_timeline, facts_enabled
+from .fastpath import FastListMixin
 from .filters import LifeExpectancyFilter, SuicideMortalityFilter
 from .forms import NoteForm
 from .models import Country, LifeExpectancy, SuicideMortality, Note
+from .pagination import KeysetOrPageNumberPagination
+from .ranks import country_rank, top_n
+from .regions import region_aggregates
+from .renderers import ORJSONRenderer
 from .serializers import (
     CountrySerializer,
     LifeExpectancySerializer,
@@ -34,9 +66,16 @@ from .serializers import (
     NoteSerializer,
     CountrySummaryResponseSerializer,
     CountryTimelineResponseSerializer,
+    CountryTimelineBatchRequestSerializer,
+    CountryTimelineBatchResponseSerializer,
     RiskFlagsResponseSerializer,
     CorrelationResponseSerializer,
+    CorrelationMatrixResponseSerializer,
+    TrendsResponseSerializer,
+    RegionsResponseSerializer,
 )
+from .snapshot import get_snapshot, snapshot_enabled
+from .versioning import current_dataset_version
 
 def _pkg_ver(name: str) -> str:
     try:
@@ -66,6 +105,16 @@ def index(request: HttpRequest) -> HttpResponse:
             "url": abs_url("/api/life-expectancy/top/?year=2015&n=10"),
             "desc": "Top-N life expectancy for a year",
         },
+        {
+            "method": "GET",
+            "url": abs_url("/api/life-expectancy/top/?year=2015&metric=schooling&order=bottom"),
+            "desc": "Bottom-N for any life-expectancy metric (precomputed ranks)",
+        },
+        {
+            "method": "GET",
+            "url": abs_url("/api/life-expectancy/top/?year=2015&country=Japan"),
+            "desc": "Rank and percentile of one country",
+        },
         {
             "method": "GET",
             "url": abs_url("/api/suicide-mortality/?country=Singapore&sex=Both%20sexes&year_min=2000&year_max=2015"),
@@ -81,6 +130,11 @@ def index(request: HttpRequest) -> HttpResponse:
             "url": abs_url("/api/insights/country-timeline/?country=Singapore&year_min=2000&year_max=2015"),
             "desc": "Country timeline (trend series)",
         },
+        {
+            "method": "GET",
+            "url": abs_url("/api/insights/country-timelines/?countries=Singapore,Malaysia,Thailand"),
+            "desc": "Batch country timelines (many countries, one request; POST also accepted)",
+        },
         {
             "method": "GET",
             "url": abs_url("/api/insights/risk-flags/?year=2015&min_life=60&min_suicide=10"),
@@ -91,6 +145,26 @@ def index(request: HttpRequest) -> HttpResponse:
             "url": abs_url("/api/insights/correlation/?year_min=2000&year_max=2015"),
             "desc": "Correlation analysis (advanced query endpoint)",
         },
+        {
+            "method": "GET",
+            "url": abs_url("/api/insights/correlation-matrix/?year_min=2000&year_max=2015"),
+            "desc": "Pearson and Spearman matrix over every numeric indicator",
+        },
+        {
+            "method": "GET",
+            "url": abs_url("/api/insights/trends/?metric=life_expectancy&year_min=2000&year_max=2015"),
+            "desc": "Year-over-year change, rolling mean and slope for every country, ranked",
+        },
+        {
+            "method": "GET",
+            "url": abs_url("/api/insights/regions/?metric=rate&year_min=2010&year_max=2015"),
+            "desc": "Per-WHO-region yearly mean, median, population-weighted mean and extremes",
+        },
+        {
+            "method": "GET",
+            "url": abs_url("/api/export/life-expectancy/?format=csv"),
+            "desc": "Streamed bulk export (csv, ndjson, parquet, arrow; same filters as the list endpoints)",
+        },
         {"method": "POST", "url": abs_url("/api/notes/"), "desc": "Create a note (POST JSON)"},
         {"method": "HTML", "url": abs_url("/notes/new/"), "desc": "Create a note using a Django Form"},
         {"method": "DOCS", "url": abs_url("/api/docs/"), "desc": "Swagger UI (OpenAPI via drf-spectacular)"},
@@ -130,45 +204,76 @@ def favicon(request: HttpRequest) -> HttpResponse:
     """Return an empty favicon response to avoid 404 noise in demo logs."""
     return HttpResponse(status=204)
 
+def export_dataset(request: HttpRequest, dataset: str) -> HttpResponse:
+    """Stream a dataset (same filters as the list endpoints) as CSV, NDJSON, Parquet or Arrow."""
+    if dataset not in DATASETS:
+        return JsonResponse({"error": "unknown dataset"}, status=404)
+
+    fmt = (request.GET.get("format") or "csv").lower()
+    if fmt not in CONTENT_TYPES:
+        return JsonResponse({"error": f"format must be one of: {', '.join(CONTENT_TYPES)}"}, status=400)
+    if fmt in ARROW_FORMATS and not arrow_available():
+        return JsonResponse({"error": f"{fmt} output requires pyarrow"}, status=400)
 
-class CountryViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    chunk_size = getattr(settings, "HEALTH_EXPORT_CHUNK_SIZE", 2000)
+    errors, columns, rows = export_rows(dataset, request.GET, chunk_size)
+    if errors:
+        return JsonResponse({"error": errors}, status=400)
+
+    response = StreamingHttpResponse(stream_export(fmt, dataset, columns, rows, chunk_size), content_type=CONTENT_TYPES[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
+
+
+class CountryViewSet(CachedResponseMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     queryset = Country.objects.all().order_by("name")
     serializer_class = CountrySerializer
     search_fields = ["name"]
 
-class LifeExpectancyViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+class LifeExpectancyViewSet(CachedResponseMixin, FastListMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     queryset = LifeExpectancy.objects.select_related("country").all().order_by("country__name", "year")
     serializer_class = LifeExpectancySerializer
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ("country_id", "year", "id")
     filterset_class = LifeExpectancyFilter
     search_fields = ["country__name", "status"]
     ordering_fields = ["year", "life_expectancy"]
 
     @action(detail=False, methods=["get"], url_path="top")
     def top(self, request: Request) -> Response:
-        """Top-N countries by life expectancy for a given year (optional: status filter)."""
+        """Top-N (or ``order=bottom``) countries by a LifeExpectancy metric for a year.
+
+        Optional: ``status`` ranks within that status, ``metric`` picks any float
+        column (default life_expectancy), ``country`` returns that country's
+        ranks and percentile instead of a list. Served from the precomputed
+        rank table when it is current.
+        """
         year = int(request.query_params.get("year", "2015"))
         n = int(request.query_params.get("n", "10"))
         status_filter = request.query_params.get("status")
-
-        qs = self.get_queryset().filter(year=year).exclude(life_expectancy__isnull=True)
-        if status_filter:
-            qs = qs.filter(status__iexact=status_filter)
-        qs = qs.order_by("-life_expectancy")[: max(1, min(n, 50))]
-
-        data = [
-            {
-                "country": row.country.name,
-                "year": row.year,
-                "status": row.status,
-                "life_expectancy": row.life_expectancy,
-            }
-            for row in qs
-        ]
-        return Response({"year": year, "count": len(data), "results": data})
-
-class SuicideMortalityViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+        metric = request.query_params.get("metric", "life_expectancy")
+        order = request.query_params.get("order", "top")
+        if metric not in LIFE_METRICS:
+            return Response({"detail": f"Unknown metric: {metric}"}, status=status.HTTP_400_BAD_REQUEST)
+        if order not in ("top", "bottom"):
+            return Response({"detail": "order must be 'top' or 'bottom'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        country = request.query_params.get("country")
+        if country:
+            ranked = (country_rank(cid, year, metric) for cid in get_resolver().lookup(country))
+            item = next((item for item in ranked if item is not None), None)
+            if item is None:
+                return Response({"detail": "No value for that country and year."}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"metric": metric, **item})
+
+        data = top_n(year, metric, max(1, min(n, 50)), status_filter, bottom=order == "bottom")
+        return Response({"year": year, "metric": metric, "order": order, "count": len(data), "results": data})
+
+class SuicideMortalityViewSet(CachedResponseMixin, FastListMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     queryset = SuicideMortality.objects.select_related("country").all().order_by("country__name", "year")
     serializer_class = SuicideMortalitySerializer
+    pagination_class = KeysetOrPageNumberPagination
+    keyset_ordering = ("country_id", "year", "sex", "id")
     filterset_class = SuicideMortalityFilter
     search_fields = ["country__name", "sex", "parent_location"]
     ordering_fields = ["year", "rate"]
@@ -180,8 +285,11 @@ class NoteViewSet(viewsets.ModelViewSet):
     search_fields = ["title", "body", "country__name"]
     ordering_fields = ["created_at", "title"]
 
-class CountrySummary(APIView):
-    """Join both datasets for a single country-year."""
+class CountrySummary(CachedResponseMixin, APIView):
+    """Join both datasets for a single country-year.
+
+    Served from the columnar snapshot unless HEALTH_COLUMNAR_SNAPSHOT is off.
+    """
 
     @extend_schema(responses=CountrySummaryResponseSerializer)
     def get(self, request: Request) -> Response:
@@ -192,26 +300,51 @@ class CountrySummary(APIView):
         if not country_name:
             return Response({"error": "country param is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        country = Country.objects.filter(name__iexact=country_name).first()
-        if not country:
-            return Response({"error": "country not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        life = LifeExpectancy.objects.filter(country=country, year=year).first()
-        suicide = SuicideMortality.objects.filter(country=country, year=year, sex__iexact=sex).first()
+        if snapshot_enabled():
+            snap = get_snapshot()
+            country_ids = snap.lookup_country(country_name)
+            if not country_ids:
+                return Response({"error": "country not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response(snap.country_summary(country_ids, year, sex))
 
-        return Response(
-            {
-                "country": country.name,
-                "year": year,
-                "life_expectancy": None if not life else life.life_expectancy,
-                "status": "" if not life else life.status,
-                "suicide_rate": None if not suicide else suicide.rate,
-                "sex": sex,
-                "parent_location": "" if not suicide else suicide.parent_location,
-            }
-        )
+        resolver = get_resolver()
+        country_ids = resolver.lookup(country_name)
+        if not country_ids:
+            return Response({"error": "country not found"}, status=status.HTTP_404_NOT_FOUND)
+        if facts_enabled():
+            return Response(fact_summary(country_ids, year, sex))
+
+        life_qs, suicide_qs = _summary_querysets(country_ids, year, sex)
+        life, suicide = group_row(country_ids, life_qs), group_row(country_ids, suicide_qs)
+        return Response(_summary(resolver.names[country_ids[0]], year, sex, life, suicide))
+
+
+def _summary_querysets(country_ids: Sequence[int], year: int, sex: str):
+    """(country_id, value, label) rows of an alias group, for ``group_row``."""
+    return (
+        LifeExpectancy.objects.filter(country_id__in=country_ids, year=year).values_list(
+            "country_id", "life_expectancy", "status"
+        ),
+        SuicideMortality.objects.filter(country_id__in=country_ids, year=year, sex__iexact=sex).values_list(
+            "country_id", "rate", "parent_location"
+        ),
+    )
+
+
+def _summary(name: str, year: int, sex: str, life: Optional[tuple], suicide: Optional[tuple]) -> dict[str, Any]:
+    life_value, life_status = life or (None, "")
+    rate, parent_location = suicide or (None, "")
+    return {
+        "country": name,
+        "year": year,
+        "life_expectancy": life_value,
+        "status": life_status,
+        "suicide_rate": rate,
+        "sex": sex,
+        "parent_location": parent_location,
+    }
 
-class CountryTimeline(APIView):
+class CountryTimeline(CachedResponseMixin, APIView):
     """Return a timeline (year series) for a country, merging both datasets."""
 
     @extend_schema(responses=CountryTimelineResponseSerializer)
@@ -224,29 +357,156 @@ class CountryTimeline(APIView):
         if not country_name:
             return Response({"error": "country param is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        country = Country.objects.filter(name__iexact=country_name).first()
-        if not country:
+        if snapshot_enabled():
+            snap = get_snapshot()
+            country_ids = snap.lookup_country(country_name)
+            if not country_ids:
+                return Response({"error": "country not found"}, status=status.HTTP_404_NOT_FOUND)
+            results = snap.timeline(country_ids, year_min, year_max, sex)
+            return Response({"country": snap.country_names[country_ids[0]], "sex": sex, "results": results})
+
+        resolver = get_resolver()
+        country_ids = resolver.lookup(country_name)
+        if not country_ids:
             return Response({"error": "country not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        years = list(range(year_min, year_max + 1))
-        life_map = {r.year: r for r in LifeExpectancy.objects.filter(country=country, year__gte=year_min, year__lte=year_max)}
-        sui_map = {r.year: r for r in SuicideMortality.objects.filter(country=country, year__gte=year_min, year__lte=year_max, sex__iexact=sex)}
-
-        results = []
-        for y in years:
-            life = life_map.get(y)
-            sui = sui_map.get(y)
-            results.append(
-                {
-                    "year": y,
-                    "life_expectancy": None if not life else life.life_expectancy,
-                    "suicide_rate": None if not sui else sui.rate,
-                }
-            )
+        if facts_enabled():
+            life_map, sui_map = fact_timeline(country_ids, year_min, year_max, sex)
+        else:
+            life_qs, sui_qs = _timeline_querysets(country_ids, year_min, year_max, sex)
+            life_map, sui_map = group_years(country_ids, life_qs), group_years(country_ids, sui_qs)
+        results = _merge_timeline(year_min, year_max, life_map, sui_map)
 
-        return Response({"country": country.name, "sex": sex, "results": results})
+        return Response({"country": resolver.names[country_ids[0]], "sex": sex, "results": results})
 
-class RiskFlags(APIView):
+
+def _timeline_querysets(country_ids: Sequence[int], year_min: int, year_max: int, sex: str):
+    """(country_id, year, value) rows of an alias group, for ``group_years``."""
+    years = {"country_id__in": country_ids, "year__gte": year_min, "year__lte": year_max}
+    return (
+        LifeExpectancy.objects.filter(**years).values_list("country_id", "year", "life_expectancy"),
+        SuicideMortality.objects.filter(**years, sex__iexact=sex).values_list("country_id", "year", "rate"),
+    )
+
+
+def _merge_timeline(year_min: int, year_max: int, life_map: dict, sui_map: dict) -> list[dict[str, Any]]:
+    return [
+        {"year": y, "life_expectancy": life_map.get(y), "suicide_rate": sui_map.get(y)}
+        for y in range(year_min, year_max + 1)
+    ]
+
+
+def _error_text(errors: dict[str, Any]) -> str:
+    """Flatten serializer errors into one message ("field: problem; ...")."""
+    parts = []
+    for field, messages in errors.items():
+        if isinstance(messages, dict):  # ListField errors are keyed by item index
+            messages = [m for item in messages.values() for m in item]
+        text = "; ".join(str(m) for m in messages)
+        parts.append(text if field == "non_field_errors" else f"{field}: {text}")
+    return "; ".join(parts)
+
+
+def _country_list(raw: Any) -> list[str]:
+    """Names from a comma-separated string or a JSON list, deduplicated in order."""
+    items = raw.split(",") if isinstance(raw, str) else list(raw or [])
+    names: dict[str, str] = {}
+    for item in items:
+        name = str(item).strip()
+        if name:
+            names.setdefault(name.casefold(), name)
+    return list(names.values())
+
+
+class CountryTimelineBatch(CachedResponseMixin, APIView):
+    """Timelines for many countries at once (same per-country structure as country-timeline).
+
+    GET ``?countries=A,B,C`` or POST ``{"countries": [...], "year_min": .., "year_max": .., "sex": ..}``.
+    Names are resolved in memory (``health.countries``) and both datasets are
+    fetched with one ``country_id__in`` range query each. Batches are capped at
+    ``HEALTH_TIMELINE_BATCH_MAX`` countries; above ``HEALTH_TIMELINE_STREAM_MIN``
+    the JSON body is streamed one country at a time.
+    """
+
+    @extend_schema(responses=CountryTimelineBatchResponseSerializer)
+    def get(self, request: Request) -> HttpResponse:
+        return self.timelines(request.query_params)
+
+    @extend_schema(request=CountryTimelineBatchRequestSerializer, responses=CountryTimelineBatchResponseSerializer)
+    def post(self, request: Request) -> HttpResponse:
+        return self.timelines(request.data)
+
+    def timelines(self, params: Any) -> HttpResponse:
+        if hasattr(params, "getlist"):  # query string: countries is one comma-separated value
+            params = {key: params[key] for key in params if params[key] != ""}
+            if "countries" in params:
+                params["countries"] = params["countries"].split(",")
+        serializer = CountryTimelineBatchRequestSerializer(data=params)
+        if not serializer.is_valid():
+            return Response({"error": _error_text(serializer.errors)}, status=status.HTTP_400_BAD_REQUEST)
+        names = _country_list(serializer.validated_data["countries"])
+        year_min = serializer.validated_data["year_min"]
+        year_max = serializer.validated_data["year_max"]
+        sex = serializer.validated_data["sex"] or "Both sexes"
+        limit = getattr(settings, "HEALTH_TIMELINE_BATCH_MAX", 200)
+
+        if not names:
+            return Response({"error": "countries param is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(names) > limit:
+            return Response({"error": f"at most {limit} countries per request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        found, not_found = self.resolve(names)
+        head = {"year_min": year_min, "year_max": year_max, "sex": sex, "count": len(found), "not_found": not_found}
+        items = self.items(found, year_min, year_max, sex)
+
+        if len(found) < getattr(settings, "HEALTH_TIMELINE_STREAM_MIN", 50):
+            return Response({**head, "results": list(items)})
+        return StreamingHttpResponse(_stream_json(head, "results", items), content_type="application/json")
+
+    def resolve(self, names: list[str]) -> tuple[list[tuple[list[int], str]], list[str]]:
+        """(alias group ids, canonical name) for known names in request order, plus unknown names."""
+        resolver = get_resolver()
+        ids = {n: resolver.lookup(n) for n in names}
+        found: dict[int, tuple[list[int], str]] = {}
+        for n in names:
+            if ids[n]:
+                found.setdefault(ids[n][0], (ids[n], resolver.names[ids[n][0]]))
+        return list(found.values()), [n for n in names if not ids[n]]
+
+    def items(self, found: list[tuple[list[int], str]], year_min: int, year_max: int, sex: str) -> Iterator[dict]:
+        if snapshot_enabled():
+            snap = get_snapshot()
+            for country_ids, name in found:
+                yield {"country": name, "sex": sex, "results": snap.timeline(country_ids, year_min, year_max, sex)}
+            return
+
+        ids = sorted({cid for country_ids, _ in found for cid in country_ids})
+        life: dict[int, list] = {i: [] for i in ids}
+        sui: dict[int, list] = {i: [] for i in ids}
+        for row in LifeExpectancy.objects.filter(
+            country_id__in=ids, year__gte=year_min, year__lte=year_max
+        ).values_list("country_id", "year", "life_expectancy"):
+            life[row[0]].append(row)
+        for row in SuicideMortality.objects.filter(
+            country_id__in=ids, year__gte=year_min, year__lte=year_max, sex__iexact=sex
+        ).values_list("country_id", "year", "rate"):
+            sui[row[0]].append(row)
+
+        for country_ids, name in found:
+            life_map = group_years(country_ids, [row for cid in country_ids for row in life[cid]])
+            sui_map = group_years(country_ids, [row for cid in country_ids for row in sui[cid]])
+            yield {"country": name, "sex": sex, "results": _merge_timeline(year_min, year_max, life_map, sui_map)}
+
+
+def _stream_json(head: dict, key: str, items: Iterator[dict]) -> Iterator[bytes]:
+    """Encode ``{**head, key: [*items]}`` incrementally, one item per chunk."""
+    renderer = ORJSONRenderer()
+    yield renderer.render(head)[:-1] + b',"' + key.encode() + b'":['
+    for i, item in enumerate(items):
+        yield (b"," if i else b"") + renderer.render(item)
+    yield b"]}"
+
+class RiskFlags(CachedResponseMixin, APIView):
     """Compound query: low life expectancy AND high suicide rate for a year."""
 
     @extend_schema(responses=RiskFlagsResponseSerializer)
@@ -256,34 +516,55 @@ class RiskFlags(APIView):
         min_suicide = float(request.query_params.get("min_suicide", "10"))
         sex = request.query_params.get("sex") or "Both sexes"
 
-        life_qs = LifeExpectancy.objects.select_related("country").filter(year=year, life_expectancy__lte=min_life).exclude(life_expectancy__isnull=True)
-        sui_qs = SuicideMortality.objects.select_related("country").filter(year=year, sex__iexact=sex, rate__gte=min_suicide).exclude(rate__isnull=True)
-
-        life_countries = {r.country_id: r for r in life_qs}
-        results = []
-        for s in sui_qs:
-            life = life_countries.get(s.country_id)
-            if not life:
-                continue
-            results.append(
-                {
-                    "country": s.country.name,
-                    "year": year,
-                    "life_expectancy": life.life_expectancy,
-                    "suicide_rate": s.rate,
-                }
-            )
+        if snapshot_enabled():
+            results = get_snapshot().risk_flags(year, min_life, min_suicide, sex)
+            return Response({"year": year, "sex": sex, "count": len(results), "results": results})
+        if facts_enabled():
+            results = fact_risk_flags(year, min_life, min_suicide, sex)
+            return Response({"year": year, "sex": sex, "count": len(results), "results": results})
 
-        results.sort(key=lambda x: (x["life_expectancy"] if x["life_expectancy"] is not None else 9999, -(x["suicide_rate"] or 0)))
+        life_qs, sui_qs = _risk_querysets(year, min_life, min_suicide, sex)
+        results = _risk_results(year, list(life_qs), list(sui_qs))
         return Response({"year": year, "sex": sex, "count": len(results), "results": results})
 
-class Correlation(APIView):
+
+def _risk_querysets(year: int, min_life: float, min_suicide: float, sex: str):
+    return (
+        LifeExpectancy.objects.filter(year=year, life_expectancy__lte=min_life)
+        .exclude(life_expectancy__isnull=True)
+        .values_list("country_id", "life_expectancy"),
+        SuicideMortality.objects.filter(year=year, sex__iexact=sex, rate__gte=min_suicide)
+        .exclude(rate__isnull=True)
+        .values_list("country_id", "country__name", "rate"),
+    )
+
+
+def _risk_results(year: int, life_rows: list[tuple], sui_rows: list[tuple]) -> list[dict[str, Any]]:
+    life_countries = dict(life_rows)
+    results = [
+        {"country": name, "year": year, "life_expectancy": life_countries[cid], "suicide_rate": rate}
+        for cid, name, rate in sui_rows
+        if cid in life_countries
+    ]
+    results.sort(key=lambda x: (x["life_expectancy"] if x["life_expectancy"] is not None else 9999, -(x["suicide_rate"] or 0)))
+    return results
+
+class Correlation(CachedResponseMixin, APIView):
     """Compute Pearson correlation between life expectancy and suicide rate over a year range.
 
     For each country:
       - life = average life expectancy in range
       - suicide = average suicide rate in range (sex filter)
     Then correlate across countries (advanced technique).
+
+    Optional ``pairs=life_expectancy:rate,gdp:rate_high`` correlates several
+    (LifeExpectancy column, suicide rate column) pairs in one request. The
+    per-country averages come from the columnar snapshot, or from one grouped
+    query on the fact table (one per dataset for columns it does not hold)
+    when the snapshot is disabled.
+
+    ``ci=0.95`` and/or ``n_boot=2000`` (``seed=0``) add a bootstrap interval
+    and a permutation test to each pair, see ``health.bootstrap``.
     """
 
     @extend_schema(responses=CorrelationResponseSerializer)
@@ -292,45 +573,356 @@ class Correlation(APIView):
         year_max = int(request.query_params.get("year_max", "2015"))
         sex = request.query_params.get("sex") or "Both sexes"
 
-        # Aggregate per country in python for clarity (dataset is small).
-        pairs: list[tuple[float, float]] = []
-        countries = Country.objects.all()
+        try:
+            pairs = parse_metric_pairs(request.query_params.get("pairs"))
+            resampling = parse_resampling(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        life_columns = sorted({p[0] for p in pairs})
+        suicide_columns = sorted({p[1] for p in pairs})
+        if snapshot_enabled():
+            means = get_snapshot().country_means(year_min, year_max, sex, life_columns, suicide_columns)
+        else:
+            means = facts_enabled() and fact_country_means(year_min, year_max, sex, life_columns, suicide_columns)
+            means = means or country_means(year_min, year_max, sex, life_columns, suicide_columns)
+        _, life_means, suicide_means = means
+        results = correlate_pairs(pairs, life_columns, suicide_columns, life_means, suicide_means)
+        meta = resampling and _resample(results, life_columns, suicide_columns, life_means, suicide_means, resampling)
+        return Response(_correlation(year_min, year_max, sex, results, meta))
+
+
+class CorrelationMatrix(CachedResponseMixin, APIView):
+    """Pairwise Pearson and Spearman correlation of every numeric indicator across countries.
+
+    Each country contributes its average of every LifeExpectancy indicator
+    and suicide rate column over the year range (``sex`` selects the suicide
+    rows). Nulls are handled pairwise, so a pair uses every country that has
+    both values. Optional ``metrics=gdp,schooling,rate`` restricts the matrix.
+    Matrices are memoised per (dataset version, year range, sex, metrics).
+    """
 
-        for c in countries:
-            life_vals = list(
-                LifeExpectancy.objects.filter(country=c, year__gte=year_min, year__lte=year_max)
-                .exclude(life_expectancy__isnull=True)
-                .values_list("life_expectancy", flat=True)
-            )
-            sui_vals = list(
-                SuicideMortality.objects.filter(country=c, year__gte=year_min, year__lte=year_max, sex__iexact=sex)
-                .exclude(rate__isnull=True)
-                .values_list("rate", flat=True)
-            )
+    @extend_schema(responses=CorrelationMatrixResponseSerializer)
+    def get(self, request: Request) -> Response:
+        params = request.query_params
+        try:
+            year_min = int(params.get("year_min", "2000"))
+            year_max = int(params.get("year_max", "2015"))
+            life_columns, suicide_columns = parse_matrix_metrics(params.get("metrics"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        sex = params.get("sex") or "Both sexes"
+
+        source = SNAPSHOT if snapshot_enabled() else BASE_TABLES
+        return Response(
+            _correlation_matrix(current_dataset_version(), source, year_min, year_max, sex, life_columns, suicide_columns)
+        )
 
-            if not life_vals or not sui_vals:
-                continue
 
-            life_avg = float(np.mean(life_vals))
-            sui_avg = float(np.mean(sui_vals))
-            pairs.append((life_avg, sui_avg))
+@lru_cache(maxsize=64)
+def _correlation_matrix(
+    version: str,
+    source: str,
+    year_min: int,
+    year_max: int,
+    sex: str,
+    life_columns: tuple[str, ...],
+    suicide_columns: tuple[str, ...],
+) -> dict[str, Any]:
+    args = (year_min, year_max, sex, list(life_columns), list(suicide_columns))
+    means = get_snapshot().dataset_means(*args) if source == SNAPSHOT else dataset_means(*args)
+    _, matrix = outer_align(*means)
+    result = correlation_matrix(matrix)
+
+    def rows(values):
+        return [[None if v != v else round(v, 6) for v in row] for row in values.tolist()]
+
+    return {
+        "year_min": year_min,
+        "year_max": year_max,
+        "sex": sex,
+        "countries": len(matrix),
+        "metrics": [*life_columns, *suicide_columns],
+        "pearson": rows(result["pearson"]),
+        "spearman": rows(result["spearman"]),
+        "n": result["n"].tolist(),
+    }
 
-        if len(pairs) < 3:
-            return Response(
-                {"year_min": year_min, "year_max": year_max, "sex": sex, "n": len(pairs), "correlation": None},
-                status=status.HTTP_200_OK,
-            )
 
-        xs = np.array([p[0] for p in pairs], dtype=float)
-        ys = np.array([p[1] for p in pairs], dtype=float)
-        corr = float(np.corrcoef(xs, ys)[0, 1])
+class Trends(CachedResponseMixin, APIView):
+    """Per-country trends of one metric, for every country at once, ranked by slope.
+
+    ``metric`` is any LifeExpectancy indicator or suicide rate column
+    (``sex`` selects the suicide rows). Rows are scattered into one
+    (countries x years) matrix and ``analytics.trend_stats`` derives the
+    year-over-year changes, ``window``-year rolling means and least-squares
+    slopes with array operations. ``order=improving`` (default) puts the
+    fastest improvement first, ``order=declining`` the fastest decline; for
+    mortality-type metrics improvement means a falling value. ``limit``
+    keeps the first N countries.
+    """
 
+    @extend_schema(responses=TrendsResponseSerializer)
+    def get(self, request: Request) -> Response:
+        params = request.query_params
+        try:
+            metric = parse_metric(params.get("metric"))
+            year_min = int(params.get("year_min", "2000"))
+            year_max = int(params.get("year_max", "2015"))
+            window = int(params.get("window", "3"))
+            limit = int(params["limit"]) if params.get("limit") else None
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        sex = params.get("sex") or "Both sexes"
+        order = params.get("order") or "improving"
+        if year_max < year_min or year_max - year_min > 200:
+            return Response({"error": "invalid year range"}, status=status.HTTP_400_BAD_REQUEST)
+        if window < 1 or (limit is not None and limit < 1):
+            return Response({"error": "window and limit must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+        if order not in ("improving", "declining"):
+            return Response({"error": "order must be improving or declining"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if snapshot_enabled():
+            snap = get_snapshot()
+            rows, names = snap.metric_rows(metric, year_min, year_max, sex), snap.country_names
+        else:
+            rows, names = metric_rows(metric, year_min, year_max, sex), get_resolver().names
+        country_ids, matrix = year_matrix(*rows, year_min, year_max)
+        stats = trend_stats(matrix, window)
+        order_idx = rank_trends(stats["slope"], metric, order)[:limit]
+
+        def cells(values: np.ndarray) -> list[list[Optional[float]]]:
+            return np.where(np.isnan(values), None, np.round(values, 6)).tolist()
+
+        values = cells(matrix[order_idx])
+        yoy = cells(stats["yoy"][order_idx])
+        rolling = cells(stats["rolling_mean"][order_idx])
+        slopes = cells(stats["slope"][order_idx])
+        ranked = int((~np.isnan(stats["slope"])).sum())
+        results = [
+            {
+                "country": names[int(country_ids[i])],
+                "rank": position + 1 if position < ranked else None,
+                "slope": slopes[position],
+                "points": int(stats["points"][i]),
+                "values": values[position],
+                "yoy": yoy[position],
+                "rolling_mean": rolling[position],
+            }
+            for position, i in enumerate(order_idx.tolist())
+        ]
         return Response(
             {
+                "metric": metric,
+                "sex": sex,
                 "year_min": year_min,
                 "year_max": year_max,
-                "sex": sex,
-                "n": len(pairs),
-                "correlation": corr,
+                "window": window,
+                "order": order,
+                "lower_is_better": metric in LOWER_IS_BETTER,
+                "years": list(range(year_min, year_max + 1)),
+                "count": len(results),
+                "results": results,
+            }
+        )
+
+
+class Regions(CachedResponseMixin, APIView):
+    """Per-year aggregates of one metric over the countries of each WHO region.
+
+    ``metric`` is any LifeExpectancy indicator or suicide rate column
+    (``sex`` selects the suicide rows); ``region`` keeps one region (code or
+    name). Each row has the country count, mean, median, population-weighted
+    mean and the min/max with their country. Served from the precomputed
+    RegionYearAggregate table when it is current (see ``health.regions``).
+    """
+
+    @extend_schema(responses=RegionsResponseSerializer)
+    def get(self, request: Request) -> Response:
+        params = request.query_params
+        try:
+            metric = parse_metric(params.get("metric"))
+            year_min = int(params.get("year_min", "2000"))
+            year_max = int(params.get("year_max", "2015"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        sex = params.get("sex") or "Both sexes"
+        region = (params.get("region") or "").strip() or None
+
+        results = region_aggregates(metric, year_min, year_max, sex, region)
+        return Response(
+            {
+                "metric": metric,
+                "sex": sex if metric not in LIFE_METRICS else None,
+                "year_min": year_min,
+                "year_max": year_max,
+                "count": len(results),
+                "results": results,
             }
         )
+
+
+def _resample(
+    results: list[dict],
+    life_columns: list[str],
+    suicide_columns: list[str],
+    life_means: np.ndarray,
+    suicide_means: np.ndarray,
+    resampling: Resampling,
+) -> dict[str, Any]:
+    """Add ``ci`` and ``permutation`` to each pair result; returns the run's metadata."""
+    samples = [
+        (life_means[:, life_columns.index(r["life_metric"])], suicide_means[:, suicide_columns.index(r["suicide_metric"])])
+        for r in results
+    ]
+    intervals, meta = resample_correlations(samples, resampling)
+    for result, extra in zip(results, intervals):
+        result.update(extra)
+    return meta
+
+
+def _correlation(
+    year_min: int, year_max: int, sex: str, results: list[dict], resampling: Optional[dict] = None
+) -> dict[str, Any]:
+    data = {
+        "year_min": year_min,
+        "year_max": year_max,
+        "sex": sex,
+        "n": results[0]["n"],
+        "correlation": results[0]["correlation"],
+    }
+    if resampling:
+        data.update(ci=results[0]["ci"], permutation=results[0]["permutation"], resampling=resampling)
+    data["results"] = results
+    return data
+
+
+# -- Async (ASGI) insights views ---------------------------------------------
+#
+# Same contract and bodies as the DRF views above, as plain async Django views
+# so an ASGI worker is not pinned while the queries run. The base-table path
+# awaits its life and suicide queries with asyncio.gather (async ORM); the
+# snapshot and fact-table paths are in-memory or single-query and run through
+# sync_to_async. config/urls.py mounts these when HEALTH_ASYNC_VIEWS is on
+# (config/asgi.py turns it on).
+
+SNAPSHOT, FACTS, BASE_TABLES = "snapshot", "facts", "base"
+
+
+def _json(data: Any, status_code: int = 200) -> HttpResponse:
+    return HttpResponse(ORJSONRenderer().render(data), content_type="application/json", status=status_code)
+
+
+def _source() -> str:
+    if snapshot_enabled():
+        return SNAPSHOT
+    return FACTS if facts_enabled() else BASE_TABLES
+
+
+@sync_to_async
+def _locate(country_name: str) -> tuple[str, list[int], Optional[str]]:
+    """(data source, alias group ids, canonical name) — touches the version stamp, so sync."""
+    source = _source()
+    resolver = get_resolver()
+    country_ids = resolver.lookup(country_name)
+    return source, country_ids, resolver.names[country_ids[0]] if country_ids else None
+
+
+class AsyncCountrySummary(AsyncCachedResponseMixin, View):
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        country_name = (request.GET.get("country") or "").strip()
+        year = int(request.GET.get("year", "2015"))
+        sex = request.GET.get("sex") or "Both sexes"
+        if not country_name:
+            return _json({"error": "country param is required"}, status.HTTP_400_BAD_REQUEST)
+
+        source, country_ids, name = await _locate(country_name)
+        if not country_ids:
+            return _json({"error": "country not found"}, status.HTTP_404_NOT_FOUND)
+        if source == SNAPSHOT:
+            return _json(await sync_to_async(lambda: get_snapshot().country_summary(country_ids, year, sex))())
+        if source == FACTS:
+            return _json(await sync_to_async(fact_summary)(country_ids, year, sex))
+
+        life_rows, suicide_rows = await asyncio.gather(
+            *(_alist(qs) for qs in _summary_querysets(country_ids, year, sex))
+        )
+        return _json(_summary(name, year, sex, group_row(country_ids, life_rows), group_row(country_ids, suicide_rows)))
+
+
+class AsyncCountryTimeline(AsyncCachedResponseMixin, View):
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        country_name = (request.GET.get("country") or "").strip()
+        year_min = int(request.GET.get("year_min", "2000"))
+        year_max = int(request.GET.get("year_max", "2015"))
+        sex = request.GET.get("sex") or "Both sexes"
+        if not country_name:
+            return _json({"error": "country param is required"}, status.HTTP_400_BAD_REQUEST)
+
+        source, country_ids, name = await _locate(country_name)
+        if not country_ids:
+            return _json({"error": "country not found"}, status.HTTP_404_NOT_FOUND)
+        if source == SNAPSHOT:
+            results = await sync_to_async(lambda: get_snapshot().timeline(country_ids, year_min, year_max, sex))()
+            return _json({"country": name, "sex": sex, "results": results})
+
+        if source == FACTS:
+            life_map, sui_map = await sync_to_async(fact_timeline)(country_ids, year_min, year_max, sex)
+        else:
+            life_rows, sui_rows = await asyncio.gather(
+                *(_alist(qs) for qs in _timeline_querysets(country_ids, year_min, year_max, sex))
+            )
+            life_map, sui_map = group_years(country_ids, life_rows), group_years(country_ids, sui_rows)
+        return _json({"country": name, "sex": sex, "results": _merge_timeline(year_min, year_max, life_map, sui_map)})
+
+
+async def _alist(qs) -> list:
+    return [row async for row in qs]
+
+
+class AsyncRiskFlags(AsyncCachedResponseMixin, View):
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        year = int(request.GET.get("year", "2015"))
+        min_life = float(request.GET.get("min_life", "60"))
+        min_suicide = float(request.GET.get("min_suicide", "10"))
+        sex = request.GET.get("sex") or "Both sexes"
+
+        source = await sync_to_async(_source)()
+        if source == SNAPSHOT:
+            results = await sync_to_async(lambda: get_snapshot().risk_flags(year, min_life, min_suicide, sex))()
+        elif source == FACTS:
+            results = await sync_to_async(fact_risk_flags)(year, min_life, min_suicide, sex)
+        else:
+            life_rows, sui_rows = await asyncio.gather(
+                *(_alist(qs) for qs in _risk_querysets(year, min_life, min_suicide, sex))
+            )
+            results = _risk_results(year, life_rows, sui_rows)
+        return _json({"year": year, "sex": sex, "count": len(results), "results": results})
+
+
+class AsyncCorrelation(AsyncCachedResponseMixin, View):
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        year_min = int(request.GET.get("year_min", "2000"))
+        year_max = int(request.GET.get("year_max", "2015"))
+        sex = request.GET.get("sex") or "Both sexes"
+        try:
+            pairs = parse_metric_pairs(request.GET.get("pairs"))
+            resampling = parse_resampling(request.GET)
+        except ValueError as exc:
+            return _json({"error": str(exc)}, status.HTTP_400_BAD_REQUEST)
+
+        life_columns = sorted({p[0] for p in pairs})
+        suicide_columns = sorted({p[1] for p in pairs})
+        args = (year_min, year_max, sex, life_columns, suicide_columns)
+        source = await sync_to_async(_source)()
+        if source == SNAPSHOT:
+            means = await sync_to_async(lambda: get_snapshot().country_means(*args))()
+        else:
+            means = source == FACTS and await sync_to_async(fact_country_means)(*args)
+            means = means or await acountry_means(*args)
+        _, life_means, suicide_means = means
+        results = correlate_pairs(pairs, life_columns, suicide_columns, life_means, suicide_means)
+        meta = resampling and await sync_to_async(_resample)(
+            results, life_columns, suicide_columns, life_means, suicide_means, resampling
+        )
+        return _json(_correlation(year_min, year_max, sex, results, meta))